@@ -0,0 +1,410 @@
+"""
+benchmarks.py: Benchmark suite for network_handler, integrity_verification and sucatalog
+
+Each case runs in a fresh process against a local BenchmarkServer, recording:
+    - MB/s (payload bytes over wall time)
+    - CPU time (user + system, all threads of the benchmark process)
+    - Peak RSS
+
+Results are written as JSON so runs can be compared across commits.
+"""
+
+import sys
+import json
+import time
+import shutil
+import plistlib
+import resource
+import platform
+import tempfile
+import datetime
+import subprocess
+import multiprocessing
+
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from .server import BenchmarkServer, SyntheticFile, synthetic_catalog
+
+
+DEFAULT_FILE_SIZE:        int   = 1024 * 1024 * 1024 * 2  # 2 GB
+DEFAULT_CATALOG_PRODUCTS: int   = 200
+DEFAULT_METADATA_LATENCY: float = 0.02
+DEFAULT_CATALOG_UPDATES:  int   = 20000
+LATEST_INSTALLER_COUNTS:  list  = [10000, 20000, 40000]  # Products per latest-installers run, to show scaling
+MAX_DOWNLOAD_ATTEMPTS:    int   = 50
+
+
+def _run_download(url: str, destination: str, connections: int = 1, chunklist_url: str = None) -> dict:
+    """
+    Download a synthetic file, resuming after dropped connections
+    """
+
+    import requests
+    from opencore_legacy_patcher.support import network_handler
+
+    chunklist = requests.get(chunklist_url).content if chunklist_url else None
+
+    attempts = 0
+    download_obj = None
+    while attempts < MAX_DOWNLOAD_ATTEMPTS:
+        attempts += 1
+        download_obj = network_handler.DownloadObject(url, destination, connections=connections, use_cache=False, chunklist=chunklist)
+        download_obj.download(spawn_thread=False)
+        if download_obj.download_complete:
+            break
+
+    return {
+        "Bytes": Path(destination).stat().st_size if Path(destination).exists() else 0,
+        "Extra": {
+            "Attempts": attempts,
+            "Complete": download_obj.download_complete,
+            "Error":    download_obj.error_msg,
+        },
+    }
+
+
+def _run_chunklist(file_path: str, chunklist_path: str, engine: str) -> dict:
+    """
+    Validate a file against its chunklist
+    """
+
+    from opencore_legacy_patcher.support import integrity_verification
+
+    chunk_obj = integrity_verification.ChunklistVerification(file_path, chunklist_path, engine=integrity_verification.ChunklistEngine[engine])
+    chunk_obj._validate()
+
+    return {
+        "Bytes": Path(file_path).stat().st_size,
+        "Extra": {
+            "Chunks": chunk_obj.total_chunks,
+            "Status": chunk_obj.status.name,
+        },
+    }
+
+
+def _run_sucatalog(base_url: str) -> dict:
+    """
+    Fetch and parse a synthetic Software Update Catalog
+    """
+
+    import plistlib
+    from opencore_legacy_patcher.support import network_handler
+    from opencore_legacy_patcher.sucatalog import CatalogProducts
+
+    content = network_handler.NetworkUtilities().get(f"{base_url}/catalog.sucatalog").content
+    products_obj = CatalogProducts(plistlib.loads(content))
+
+    return {
+        "Bytes": 0,
+        "Extra": {
+            "CatalogSize": len(content),
+            "Products":    len(products_obj.products),
+            "Latest":      len(products_obj.latest_products),
+        },
+    }
+
+
+def _run_appledb(base_url: str) -> dict:
+    """
+    Fetch and parse a synthetic AppleDB response, including link validation
+    """
+
+    from opencore_legacy_patcher import constants
+    from opencore_legacy_patcher.sucatalog import products_appledb
+
+    products_appledb.APPLEDB_API_URL = f"{base_url}/appledb/main.json"
+    products_obj = products_appledb.AppleDBProducts(constants.Constants())
+
+    return {
+        "Bytes": 0,
+        "Extra": {
+            "Products": len(products_obj.products),
+            "Latest":   len(products_obj.latest_products),
+        },
+    }
+
+
+def _write_catalog(catalog_path: str, product_count: int, update_count: int) -> None:
+    """
+    Write a full-size synthetic catalog, called in a separate process so its memory
+    isn't inherited by the parse cases' peak RSS
+    """
+
+    catalog, _ = synthetic_catalog("http://127.0.0.1", product_count, update_count=update_count)
+    Path(catalog_path).write_bytes(plistlib.dumps(catalog))
+
+
+def _run_catalog_parse(catalog_path: str, engine: str) -> dict:
+    """
+    Parse a full-size synthetic catalog from disk, with plistlib or CatalogReader
+    """
+
+    import plistlib
+    from opencore_legacy_patcher.sucatalog.catalog_reader import CatalogReader, READ_SIZE
+
+    with open(catalog_path, "rb") as file:
+        if engine == "PLISTLIB":
+            catalog = plistlib.load(file)
+            products = [product for product in catalog["Products"].values() if "SharedSupport" in product.get("ExtendedMetaInfo", {}).get("InstallAssistantPackageIdentifiers", {})]
+        else:
+            products = list(CatalogReader().iter_products(iter(lambda: file.read(READ_SIZE), b"")))
+
+    return {
+        "Bytes": Path(catalog_path).stat().st_size,
+        "Extra": {
+            "Products": len(products),
+        },
+    }
+
+
+def _run_latest_installers(product_counts: list) -> dict:
+    """
+    Select the latest installers from synthetic product listings of increasing size
+    """
+
+    import random
+    import packaging.version
+
+    from opencore_legacy_patcher.datasets.os_data import os_data
+    from opencore_legacy_patcher.sucatalog import CatalogProducts, AppleDBProducts, SeedType
+
+    versions = {"10.15": 19, "11": 20, "12": 21, "13": 22, "14": 23, "15": 24}
+    seeds = [SeedType.PublicRelease, SeedType.PublicRelease, SeedType.PublicRelease, SeedType.DeveloperSeed, SeedType.CustomerSeed, SeedType.PublicSeed]
+
+    # Listings are built without fetching, only selection is measured
+    catalog_obj = CatalogProducts(None)
+    appledb_obj = AppleDBProducts.__new__(AppleDBProducts)
+    appledb_obj.max_ia = os_data.sequoia
+
+    timings = {}
+    for count in product_counts:
+        rng = random.Random(count)
+        catalog_products = []
+        appledb_products = []
+        for index in range(count):
+            major = rng.choice(list(versions))
+            version = f"{major}.{rng.randint(0, 7)}.{rng.randint(0, 3)}"
+            seed = rng.choice(seeds)
+            catalog_products.append({"ProductID": f"{index:09d}", "Version": version, "Build": f"{versions[major]}A{index}", "Catalog": seed})
+            appledb_products.append({"RawVersion": version, "Build": f"{versions[major]}A{index}", "Beta": seed != SeedType.PublicRelease, "InstallAssistant": {"XNUMajor": versions[major]}})
+
+        catalog_products.sort(key=lambda x: packaging.version.parse(x["Version"]))
+
+        start = time.perf_counter()
+        catalog_latest = catalog_obj._list_latest_installers_only(catalog_products)
+        catalog_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        appledb_latest = appledb_obj._list_latest_installers_only(appledb_products)
+        appledb_seconds = time.perf_counter() - start
+
+        timings[str(count)] = {
+            "CatalogProducts": round(catalog_seconds, 4),
+            "AppleDBProducts": round(appledb_seconds, 4),
+            "Latest":          len(catalog_latest) + len(appledb_latest),
+        }
+
+    return {
+        "Bytes": 0,
+        "Extra": timings,
+    }
+
+
+def _measure(function, kwargs: dict) -> dict:
+    """
+    Run a benchmark function, called in a fresh process
+    """
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+
+    result = function(**kwargs)
+
+    seconds = time.perf_counter() - wall_start
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != "darwin":
+        # Linux reports kilobytes, macOS bytes
+        peak_rss *= 1024
+
+    result.update({
+        "Seconds":    round(seconds, 4),
+        "CPUSeconds": round(time.process_time() - cpu_start, 4),
+        "PeakRSS":    peak_rss,
+        "MBps":       round(result["Bytes"] / seconds / 1024 / 1024, 2) if result["Bytes"] else None,
+    })
+    return result
+
+
+class BenchmarkSuite:
+    """
+    Run the benchmark suite and write JSON results
+
+    Parameters:
+        file_size        (int):   Size of synthetic download files in bytes
+        catalog_products (int):   Products in the synthetic catalogs
+        metadata_latency (float): Latency of per-product metadata requests
+        cases            (list):  Case names to run, defaults to all
+
+    Usage:
+        >>> results = BenchmarkSuite(file_size=1024 ** 3).run()
+        >>> BenchmarkSuite.write(results, "benchmark.json")
+        >>> BenchmarkSuite.compare(results, BenchmarkSuite.load("previous.json"))
+    """
+
+    def __init__(self, file_size: int = DEFAULT_FILE_SIZE, catalog_products: int = DEFAULT_CATALOG_PRODUCTS, metadata_latency: float = DEFAULT_METADATA_LATENCY, cases: list = None) -> None:
+        self.file_size:        int   = file_size
+        self.catalog_products: int   = catalog_products
+        self.metadata_latency: float = metadata_latency
+        self.cases:            list  = cases
+
+        self._work_dir: Path = None
+
+
+    def _download_files(self) -> dict:
+        """
+        Synthetic files and DownloadObject arguments per download case
+        """
+
+        size = self.file_size
+        return {
+            "download-single":      (SyntheticFile(size),                                                    {"connections": 1}),
+            "download-segmented":   (SyntheticFile(size),                                                    {"connections": 4}),
+            "download-constrained": (SyntheticFile(size // 8, latency=0.05, bandwidth=1024 * 1024 * 50),     {"connections": 4}),
+            "download-no-ranges":   (SyntheticFile(size, ranges=False),                                      {"connections": 4}),
+            "download-no-length":   (SyntheticFile(size, content_length=False),                              {"connections": 1}),
+            "download-drops":       (SyntheticFile(size, drop_after=max(size // 5, 1024 * 1024)),           {"connections": 1}),
+            "download-chunklist":   (SyntheticFile(size),                                                    {"connections": 4, "chunklist": True}),
+        }
+
+
+    def available_cases(self) -> list:
+        return list(self._download_files()) + ["chunklist-sequential", "chunklist-parallel", "catalog-parse-plistlib", "catalog-parse-reader", "latest-installers", "sucatalog", "appledb"]
+
+
+    def _selected(self, name: str) -> bool:
+        return self.cases is None or name in self.cases
+
+
+    def _run_case(self, name: str, function, kwargs: dict) -> dict:
+        print(f"- Running {name}")
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+            try:
+                result = executor.submit(_measure, function, kwargs).result()
+            except Exception as e:
+                result = {"Error": str(e)}
+
+        if "MBps" in result and result["MBps"] is not None:
+            print(f"  {result['MBps']} MB/s, {result['CPUSeconds']}s CPU, {result['PeakRSS'] / 1024 / 1024:.1f} MB peak RSS")
+        elif "Seconds" in result:
+            print(f"  {result['Seconds']}s, {result['CPUSeconds']}s CPU, {result['PeakRSS'] / 1024 / 1024:.1f} MB peak RSS")
+        else:
+            print(f"  Failed: {result['Error']}")
+        return result
+
+
+    def run(self) -> dict:
+        """
+        Run selected cases
+
+        Returns:
+            dict: Results document
+        """
+
+        results = {}
+        self._work_dir = Path(tempfile.mkdtemp(prefix="oclp-benchmark-"))
+        try:
+            download_files = {name: spec for name, spec in self._download_files().items() if self._selected(name)}
+            files = {f"{name}.bin": spec[0] for name, spec in download_files.items()}
+
+            with BenchmarkServer(files, catalog_products=self.catalog_products, appledb_firmwares=self.catalog_products, metadata_latency=self.metadata_latency) as server:
+                for name, (_, arguments) in download_files.items():
+                    kwargs = {
+                        "url":           server.url(f"{name}.bin"),
+                        "destination":   str(self._work_dir / f"{name}.bin"),
+                        "connections":   arguments["connections"],
+                        "chunklist_url": f"{server.url(f'{name}.bin')}.integrityDataV1" if arguments.get("chunklist") else None,
+                    }
+                    results[name] = self._run_case(name, _run_download, kwargs)
+                    for file in self._work_dir.glob(f"{name}.bin*"):
+                        file.unlink()
+
+                if self._selected("sucatalog"):
+                    results["sucatalog"] = self._run_case("sucatalog", _run_sucatalog, {"base_url": server.base_url})
+                if self._selected("appledb"):
+                    results["appledb"] = self._run_case("appledb", _run_appledb, {"base_url": server.base_url})
+
+            engines = [engine for engine in ["SEQUENTIAL", "PARALLEL"] if self._selected(f"chunklist-{engine.lower()}")]
+            if engines:
+                file = SyntheticFile(self.file_size)
+                file_path = self._work_dir / "chunklist.bin"
+                chunklist_path = self._work_dir / "chunklist.bin.integrityDataV1"
+                file.write_to(file_path)
+                chunklist_path.write_bytes(file.chunklist())
+                for engine in engines:
+                    name = f"chunklist-{engine.lower()}"
+                    results[name] = self._run_case(name, _run_chunklist, {"file_path": str(file_path), "chunklist_path": str(chunklist_path), "engine": engine})
+
+            engines = [engine for engine in ["PLISTLIB", "READER"] if self._selected(f"catalog-parse-{engine.lower()}")]
+            if engines:
+                # Full-size merged catalog, mostly non-InstallAssistant updates
+                catalog_path = self._work_dir / "catalog.sucatalog"
+                with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+                    executor.submit(_write_catalog, str(catalog_path), self.catalog_products, DEFAULT_CATALOG_UPDATES).result()
+                for engine in engines:
+                    name = f"catalog-parse-{engine.lower()}"
+                    results[name] = self._run_case(name, _run_catalog_parse, {"catalog_path": str(catalog_path), "engine": engine})
+
+            if self._selected("latest-installers"):
+                results["latest-installers"] = self._run_case("latest-installers", _run_latest_installers, {"product_counts": LATEST_INSTALLER_COUNTS})
+        finally:
+            shutil.rmtree(self._work_dir, ignore_errors=True)
+
+        return {
+            "Commit":   self._git_commit(),
+            "Date":     datetime.datetime.now().isoformat(timespec="seconds"),
+            "Platform": platform.platform(),
+            "Machine":  platform.machine(),
+            "Python":   platform.python_version(),
+            "Settings": {
+                "FileSize":        self.file_size,
+                "CatalogProducts": self.catalog_products,
+                "MetadataLatency": self.metadata_latency,
+            },
+            "Results": results,
+        }
+
+
+    @staticmethod
+    def _git_commit() -> str:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        return result.stdout.decode().strip() if result.returncode == 0 else "Unknown"
+
+
+    @staticmethod
+    def write(results: dict, path: Path) -> None:
+        Path(path).write_text(json.dumps(results, indent=4))
+
+
+    @staticmethod
+    def load(path: Path) -> dict:
+        return json.loads(Path(path).read_text())
+
+
+    @staticmethod
+    def compare(results: dict, baseline: dict) -> None:
+        """
+        Print the change in wall time, CPU time and peak RSS against a baseline run
+        """
+
+        print(f"Comparing {results['Commit']} against {baseline['Commit']}:")
+        for name, result in results["Results"].items():
+            previous = baseline["Results"].get(name)
+            if previous is None or "Seconds" not in result or "Seconds" not in previous:
+                continue
+
+            deltas = []
+            for key in ["Seconds", "CPUSeconds", "PeakRSS"]:
+                if previous[key]:
+                    deltas.append(f"{key} {((result[key] - previous[key]) / previous[key]) * 100:+.1f}%")
+            print(f"- {name}: {', '.join(deltas)}")
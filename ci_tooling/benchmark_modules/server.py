@@ -0,0 +1,448 @@
+"""
+server.py: Local HTTP server for benchmarking network_handler without external CDNs
+
+Serves deterministic synthetic files of any size (generated on the fly, never held
+in memory), Apple-style integrityDataV1 chunklists for them, and synthetic
+Software Update Catalog and AppleDB responses.
+
+Each file can simulate:
+    - Latency before the first byte
+    - Bandwidth limits
+    - Servers without Range support
+    - Connections dropped after a number of bytes
+    - Responses without Content-Length
+
+The server runs in its own process, so its CPU time doesn't skew client measurements.
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import hashlib
+import plistlib
+import datetime
+import http.server
+import multiprocessing
+
+from pathlib import Path
+
+
+BLOCK_SIZE: int = 1024 * 1024       # Synthetic data is built from 1 MiB blocks
+CHUNK_SIZE: int = 1024 * 1024 * 10  # Chunklist chunk size, matches Apple's InstallAssistant.pkg chunklists
+SEND_SIZE:  int = 1024 * 64         # Bytes per socket write when throttling
+
+XNU_MAJORS: dict = {"12": 21, "13": 22, "14": 23, "15": 24}
+
+
+class SyntheticFile:
+    """
+    Deterministic synthetic file
+
+    Every 1 MiB block is the same random block stamped with its index,
+    so misplaced data is detected while generation stays memcpy-fast.
+
+    Parameters:
+        size           (int):   File size in bytes
+        latency        (float): Seconds to wait before responding
+        bandwidth      (int):   Bytes per second per connection, 0 for unlimited
+        ranges         (bool):  Honour Range requests
+        drop_after     (int):   Close the connection after sending this many bytes, 0 to never drop
+        content_length (bool):  Send Content-Length, otherwise the body is delimited by closing the connection
+        seed           (int):   Seed for the random block
+    """
+
+    def __init__(self, size: int, latency: float = 0.0, bandwidth: int = 0, ranges: bool = True, drop_after: int = 0, content_length: bool = True, seed: int = 0) -> None:
+        self.size:           int   = size
+        self.latency:        float = latency
+        self.bandwidth:      int   = bandwidth
+        self.ranges:         bool  = ranges
+        self.drop_after:     int   = drop_after
+        self.content_length: bool  = content_length
+        self.seed:           int   = seed
+
+        self._block:     bytes = None
+        self._chunklist: bytes = None
+
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.seed:x}-{self.size:x}"'
+
+
+    def read(self, offset: int, length: int) -> bytes:
+        """
+        Generate the bytes at [offset, offset + length)
+        """
+
+        if self._block is None:
+            self._block = random.Random(self.seed).randbytes(BLOCK_SIZE)
+
+        length = max(0, min(length, self.size - offset))
+        data = bytearray()
+        while length > 0:
+            index, start = divmod(offset, BLOCK_SIZE)
+            block = bytearray(self._block)
+            block[:8] = index.to_bytes(8, "little")
+            piece = block[start:start + length]
+            data += piece
+            offset += len(piece)
+            length -= len(piece)
+        return bytes(data)
+
+
+    def iter_range(self, start: int, stop: int):
+        """
+        Yield the bytes at [start, stop) in block-sized pieces
+        """
+
+        while start < stop:
+            piece = self.read(start, min(BLOCK_SIZE - start % BLOCK_SIZE, stop - start))
+            yield piece
+            start += len(piece)
+
+
+    def write_to(self, path: Path) -> None:
+        """
+        Materialise the file on disk
+        """
+
+        with Path(path).open("wb") as f:
+            for piece in self.iter_range(0, self.size):
+                f.write(piece)
+
+
+    def chunklist(self) -> bytes:
+        """
+        Generate an integrityDataV1 chunklist for the file
+
+        Ref: https://github.com/apple-oss-distributions/xnu/blob/xnu-8020.101.4/bsd/kern/chunklist.h
+        """
+
+        if self._chunklist:
+            return self._chunklist
+
+        chunks = []
+        for offset in range(0, self.size, CHUNK_SIZE):
+            length = min(CHUNK_SIZE, self.size - offset)
+            digest = hashlib.sha256()
+            for piece in self.iter_range(offset, offset + length):
+                digest.update(piece)
+            chunks.append(length.to_bytes(4, "little") + digest.digest())
+
+        header = b"".join([
+            b"CNKL",
+            (0x24).to_bytes(4, "little"),    # Header length
+            bytes([1, 1, 0, 0]),             # File version, chunk method (SHA-256), no signature, padding
+            len(chunks).to_bytes(8, "little"),
+            (0x24).to_bytes(8, "little"),    # Chunk offset
+            (0).to_bytes(8, "little"),       # Signature offset
+        ])
+        self._chunklist = header + b"".join(chunks)
+        return self._chunklist
+
+
+def synthetic_catalog(base_url: str, product_count: int, seed: int = 0, update_count: int = 0) -> tuple:
+    """
+    Generate a synthetic Software Update Catalog of InstallAssistant products
+
+    'update_count' non-InstallAssistant products are interleaved, as in Apple's merged
+    catalogs where they make up the vast majority of the file
+
+    Returns:
+        tuple: (catalog dict, {product ID: Info.plist dict})
+    """
+
+    rng = random.Random(seed)
+    products = {}
+    info_plists = {}
+    for index in range(product_count):
+        major = rng.choice(list(XNU_MAJORS))
+        version = f"{major}.{rng.randint(0, 7)}.{rng.randint(0, 3)}"
+        build = f"{XNU_MAJORS[major]}{chr(ord('A') + rng.randint(0, 7))}{rng.randint(10, 999)}{rng.choice(['', 'a'])}"
+        product_id = f"{index // 1000:03d}-{index % 1000:05d}"
+        catalog_url = rng.choice(["", "", "", "https://swscan.apple.com/content/catalogs/others/index-seed.sucatalog"])
+
+        products[product_id] = {
+            "PostDate": datetime.datetime(2020, 1, 1) + datetime.timedelta(hours=index),
+            "ExtendedMetaInfo": {"InstallAssistantPackageIdentifiers": {"SharedSupport": "com.apple.pkg.InstallAssistant.macOS"}},
+            "ServerMetadataURL": f"{base_url}/catalog/{product_id}/InstallAssistant.smd",
+            "Distributions": {"English": f"{base_url}/catalog/{product_id}/{product_id}.English.dist"},
+            "Packages": [
+                {
+                    "URL":               f"{base_url}/catalog/{product_id}/InstallAssistant.pkg",
+                    "Size":              rng.randint(12, 15) * 1024 * 1024 * 1024,
+                    "IntegrityDataURL":  f"{base_url}/catalog/{product_id}/InstallAssistant.pkg.integrityDataV1",
+                    "IntegrityDataSize": 42008,
+                },
+                {
+                    "URL":  f"{base_url}/catalog/{product_id}/Info.plist",
+                    "Size": 2048,
+                },
+            ],
+        }
+        info_plists[product_id] = {
+            "MobileAssetProperties": {
+                "SupportedDeviceModels": ["VMM-x86_64", "Mac-27AD2F918AE68F61"],
+                "OSVersion": version,
+                "Build": build,
+                "BridgeVersionInfo": {"CatalogURL": catalog_url},
+            }
+        }
+
+    for index in range(update_count):
+        product_id = f"{index // 1000 + 100:03d}-{index % 1000:05d}"
+        products[product_id] = {
+            "PostDate": datetime.datetime(2015, 1, 1) + datetime.timedelta(hours=index),
+            "ServerMetadataURL": f"{base_url}/updates/{product_id}/Update.smd",
+            "Distributions": {language: f"{base_url}/updates/{product_id}/{product_id}.{language}.dist" for language in ["English", "French", "German", "Japanese", "Spanish", "Italian", "Dutch", "zh_CN"]},
+            "Packages": [
+                {
+                    "URL":         f"{base_url}/updates/{product_id}/Update{package}.pkg",
+                    "MetadataURL": f"{base_url}/updates/{product_id}/Update{package}.pkm",
+                    "Digest":      hashlib.sha1(f"{product_id}{package}".encode()).hexdigest(),
+                    "Size":        rng.randint(1, 1024) * 1024 * 1024,
+                }
+                for package in range(rng.randint(1, 4))
+            ],
+            "State": "ramped",
+        }
+
+    # Interleave updates with InstallAssistants, sorted by product ID like Apple's catalogs
+    products = dict(sorted(products.items()))
+
+    return {"CatalogVersion": 2, "ApplePostURL": "", "IndexDate": datetime.datetime(2024, 1, 1), "Products": products}, info_plists
+
+
+def synthetic_appledb(base_url: str, firmware_count: int, seed: int = 0) -> list:
+    """
+    Generate a synthetic AppleDB macOS main.json
+    """
+
+    rng = random.Random(seed)
+    firmwares = []
+    for index in range(firmware_count):
+        major = rng.choice(list(XNU_MAJORS))
+        version = f"{major}.{rng.randint(0, 7)}.{rng.randint(0, 3)}"
+        beta = rng.random() < 0.3
+        firmwares.append({
+            "osStr":    "macOS",
+            "version":  f"{version} beta {rng.randint(1, 5)}" if beta else version,
+            "build":    f"{XNU_MAJORS[major]}{chr(ord('A') + rng.randint(0, 7))}{index}",
+            "released": (datetime.date(2020, 1, 1) + datetime.timedelta(days=index % 2000)).isoformat(),
+            "beta":     beta,
+            "rc":       False,
+            "deviceMap": ["MacPro7,1"],
+            "sources": [{
+                "type":      "installassistant",
+                "deviceMap": ["MacPro7,1"],
+                "size":      rng.randint(12, 15) * 1024 * 1024 * 1024,
+                "hashes":    {"sha2-256": hashlib.sha256(str(index).encode()).hexdigest()},
+                "links": [
+                    {"url": f"{base_url}/appledb/{index}/dead/InstallAssistant.pkg",  "active": True},
+                    {"url": f"{base_url}/appledb/{index}/alive/InstallAssistant.pkg", "active": True},
+                ],
+            }],
+        })
+    return firmwares
+
+
+class _BenchmarkRequestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    files:            dict  = {}
+    catalog:          bytes = b""
+    info_plists:      dict  = {}
+    appledb:          bytes = b""
+    metadata_latency: float = 0.0
+
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+    def do_HEAD(self) -> None:
+        self._respond(send_body=False)
+
+
+    def do_GET(self) -> None:
+        self._respond(send_body=True)
+
+
+    def _respond(self, send_body: bool) -> None:
+        path = self.path.split("?")[0]
+
+        if path.startswith("/files/"):
+            name = path[len("/files/"):]
+            if name.endswith(".integrityDataV1") and name[:-len(".integrityDataV1")] in self.files:
+                self._send_bytes(self.files[name[:-len(".integrityDataV1")]].chunklist(), send_body)
+                return
+            if name in self.files:
+                self._send_file(self.files[name], send_body)
+                return
+
+        elif path == "/catalog.sucatalog":
+            self._send_bytes(self.catalog, send_body)
+            return
+
+        elif path.startswith("/catalog/"):
+            time.sleep(self.metadata_latency)
+            product_id = path.split("/")[2]
+            if path.endswith("/Info.plist") and product_id in self.info_plists:
+                self._send_bytes(plistlib.dumps(self.info_plists[product_id]), send_body)
+                return
+            if path.endswith(".pkg"):
+                self._send_bytes(b"", send_body)
+                return
+
+        elif path == "/appledb/main.json":
+            self._send_bytes(self.appledb, send_body)
+            return
+
+        elif path.startswith("/appledb/"):
+            time.sleep(self.metadata_latency)
+            if "/alive/" in path:
+                self._send_bytes(b"", send_body)
+                return
+
+        self.send_response(404)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+    def _send_bytes(self, data: bytes, send_body: bool) -> None:
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(data)
+
+
+    def _send_file(self, file: SyntheticFile, send_body: bool) -> None:
+        time.sleep(file.latency)
+
+        start, stop = 0, file.size
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if match and file.ranges:
+            start = int(match.group(1))
+            stop = min(int(match.group(2)) + 1, file.size) if match.group(2) else file.size
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{stop - 1}/{file.size}")
+        else:
+            self.send_response(200)
+
+        self.send_header("ETag", file.etag)
+        if file.ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        if file.content_length:
+            self.send_header("Content-Length", str(stop - start))
+        else:
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+
+        if not send_body:
+            return
+
+        sent = 0
+        began = time.perf_counter()
+        for piece in file.iter_range(start, stop):
+            for offset in range(0, len(piece), SEND_SIZE if file.bandwidth else len(piece)):
+                data = piece[offset:offset + (SEND_SIZE if file.bandwidth else len(piece))]
+                if file.drop_after and sent + len(data) > file.drop_after:
+                    self.wfile.write(data[:file.drop_after - sent])
+                    self.close_connection = True
+                    return
+                self.wfile.write(data)
+                sent += len(data)
+                if file.bandwidth:
+                    delay = sent / file.bandwidth - (time.perf_counter() - began)
+                    if delay > 0:
+                        time.sleep(delay)
+
+
+class _BenchmarkHTTPServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address) -> None:
+        # Clients hanging up mid-transfer (ie. mirror switches, stopped downloads) are expected
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+
+def _serve(files: dict, catalog_products: int, appledb_firmwares: int, metadata_latency: float, port_queue) -> None:
+    """
+    Server process entry point
+    """
+
+    server = _BenchmarkHTTPServer(("127.0.0.1", 0), _BenchmarkRequestHandler)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    catalog, info_plists = synthetic_catalog(base_url, catalog_products)
+    _BenchmarkRequestHandler.files            = files
+    _BenchmarkRequestHandler.catalog          = plistlib.dumps(catalog)
+    _BenchmarkRequestHandler.info_plists      = info_plists
+    _BenchmarkRequestHandler.appledb          = json.dumps(synthetic_appledb(base_url, appledb_firmwares)).encode()
+    _BenchmarkRequestHandler.metadata_latency = metadata_latency
+
+    port_queue.put(server.server_port)
+    server.serve_forever()
+
+
+class BenchmarkServer:
+    """
+    Local benchmark server running in a separate process
+
+    Parameters:
+        files             (dict):  {name: SyntheticFile}, served at /files/<name>
+        catalog_products  (int):   Products in /catalog.sucatalog
+        appledb_firmwares (int):   Firmwares in /appledb/main.json
+        metadata_latency  (float): Seconds of latency for per-product metadata requests
+
+    Usage:
+        >>> with BenchmarkServer({"1GB.bin": SyntheticFile(1024 ** 3, bandwidth=100 * 1024 ** 2)}) as server:
+        ...     download_obj = network_handler.DownloadObject(server.url("1GB.bin"), path)
+    """
+
+    def __init__(self, files: dict = None, catalog_products: int = 0, appledb_firmwares: int = 0, metadata_latency: float = 0.0) -> None:
+        self.files:             dict  = files or {}
+        self.catalog_products:  int   = catalog_products
+        self.appledb_firmwares: int   = appledb_firmwares
+        self.metadata_latency:  float = metadata_latency
+
+        self.port:    int = None
+        self._process: multiprocessing.Process = None
+
+
+    def __enter__(self) -> "BenchmarkServer":
+        self.start()
+        return self
+
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+
+    def url(self, name: str) -> str:
+        return f"{self.base_url}/files/{name}"
+
+
+    def start(self) -> None:
+        context = multiprocessing.get_context("spawn")
+        port_queue = context.Queue()
+        self._process = context.Process(target=_serve, args=(self.files, self.catalog_products, self.appledb_firmwares, self.metadata_latency, port_queue), daemon=True)
+        self._process.start()
+        self.port = port_queue.get(timeout=60)
+
+
+    def stop(self) -> None:
+        if self._process and self._process.is_alive():
+            self._process.terminate()
+            self._process.join()
@@ -25,7 +25,8 @@ from .support import (
     reroute_payloads,
     commit_info,
     logging_handler,
-    analytics_handler
+    analytics_handler,
+    download_handler
 )
 
 
@@ -114,6 +115,7 @@ class OpenCoreLegacyPatcher:
 
         # Generate defaults
         defaults.GenerateDefaults(self.computer.real_model, True, self.constants)
+        download_handler.MANAGER.set_bandwidth_limit(self.constants.download_bandwidth_limit * 1024 * 1024)
         threading.Thread(target=analytics_handler.Analytics(self.constants).send_analytics).start()
 
         if utilities.check_cli_args() is None:
@@ -131,6 +131,7 @@ class Constants:
         self.current_path:  Path = Path(__file__).parent.parent.resolve()
         self.original_path: Path = Path(__file__).parent.parent.resolve()
         self.payload_path:  Path = self.current_path / Path("payloads")
+        self.build_path_override: Path = None  # Isolated build folder (ie. batch builds), defaults to Build-Folder
 
 
         # Patcher Settings
@@ -149,6 +150,7 @@ class Constants:
         self.needs_to_open_preferences: bool = False  # Determine if preferences need to be opened
         self.host_is_hackintosh:        bool = False  # Determine if host is Hackintosh
         self.should_nuke_kdks:          bool = True  #  Determine if KDKs should be nuked if unused in /L*/D*/KDKs
+        self.download_bandwidth_limit:   int = 0  #     Combined download speed limit in MB/s, 0 for unlimited (see download_handler.py)
         self.launcher_binary:            str = None  #  Determine launch binary path (ie. Python vs PyInstaller)
         self.launcher_script:            str = None  #  Determine launch file path   (None if PyInstaller)
         self.booted_oc_disk:             str = None  #  Determine current disk OCLP booted from
@@ -647,6 +649,8 @@ class Constants:
     # Build Location
     @property
     def build_path(self):
+        if self.build_path_override:
+            return Path(self.build_path_override)
         return self.current_path / Path("Build-Folder/")
 
     @property
@@ -654,8 +658,8 @@ class Constants:
         return self.build_path / Path(f"OpenCore-Build")
 
     @property
-    def opencore_zip_copied(self):
-        return self.build_path / Path(f"OpenCore-{'DEBUG' if self.opencore_debug is True else 'RELEASE'}.zip")
+    def build_manifest_path(self):
+        return self.build_path / Path("Build-Manifest.plist")
 
     @property
     def oc_folder(self):
@@ -0,0 +1,222 @@
+"""
+batch.py: Process-parallel batch builds of OpenCore configurations
+
+Each job builds with its own copy of Constants into an isolated build folder, so
+jobs can run concurrently on a process pool. Results and failures of every job are
+collected into a single report.
+
+Usage:
+    >>> batch = BatchBuild(global_constants)
+    >>> for model in model_array.SupportedSMBIOS:
+    ...     batch.add(model, model)
+    >>> report = batch.run()
+    >>> report["Failed"]
+    0
+"""
+
+import os
+import sys
+import copy
+import time
+import shutil
+import logging
+import plistlib
+import tempfile
+import multiprocessing
+
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .. import constants
+
+from ..support import cache_handler
+
+from . import (
+    build,
+    validator
+)
+
+
+class _ListHandler(logging.Handler):
+    """
+    Collect a job's log lines, returned with its result
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.lines: list = []
+
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.lines.append(self.format(record))
+
+
+def _run_job(job: dict) -> dict:
+    """
+    Build and validate a single configuration, called in a worker process
+
+    Parameters:
+        job (dict): Job from BatchBuild.add()
+
+    Returns:
+        dict: Job result
+    """
+
+    handler = _ListHandler()
+    logger = logging.getLogger()
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+    global_constants: constants.Constants = job["Constants"]
+    result = {
+        "Name":     job["Name"],
+        "Model":    job["Model"],
+        "Success":  False,
+        "Error":    "",
+        "Duration": 0.0,
+        "Log":      "",
+    }
+
+    start = time.time()
+    try:
+        build.BuildOpenCore(job["Model"], global_constants)
+
+        if job["Validate"] is True:
+            # Re-check the config.plist as written, including EFIs reused from a previous build
+            errors = validator.ConfigValidator(plistlib.loads(Path(global_constants.plist_path).read_bytes()), global_constants).validate()
+            if errors:
+                raise Exception("Validation failed:\n" + "\n".join(errors))
+
+        result["Success"] = True
+    except Exception as e:
+        result["Error"] = str(e)
+        result["Log"] = "\n".join(handler.lines)
+    finally:
+        result["Duration"] = round(time.time() - start, 3)
+        logger.removeHandler(handler)
+        if job["Cleanup"] is True:
+            shutil.rmtree(global_constants.build_path, ignore_errors=True)
+
+    return result
+
+
+class BatchBuild:
+    """
+    Build many OpenCore configurations in parallel
+
+    Parameters:
+        global_constants (Constants): Base settings, copied for each job when added
+        workers          (int):       Worker processes, defaults to the number of cores
+        build_root       (Path):      Folder holding each job's build folder, defaults to a temporary folder
+        validate         (bool):      Validate each saved config.plist, see validator.ConfigValidator
+        keep_builds      (bool):      Keep each job's build folder once complete
+    """
+
+    def __init__(self, global_constants: constants.Constants, workers: int = None, build_root: Path = None, validate: bool = True, keep_builds: bool = False) -> None:
+        self.constants:   constants.Constants = global_constants
+        self.workers:     int  = workers or os.cpu_count() or 1
+        self.build_root:  Path = Path(build_root) if build_root else None
+        self.validate:    bool = validate
+        self.keep_builds: bool = keep_builds
+
+        self._jobs: list = []
+
+
+    def add(self, name: str, model: str, computer=None) -> None:
+        """
+        Queue a build, snapshotting the current settings of global_constants
+
+        Parameters:
+            name     (str):      Unique job name, used for its build folder
+            model    (str):      Model to build for
+            computer (Computer): Hardware dump to build against (built on target), None to build for an external model
+        """
+
+        job_constants = copy.deepcopy(self.constants)
+        if computer is None:
+            job_constants.custom_model = model
+        else:
+            job_constants.custom_model = ""
+            job_constants.computer = copy.deepcopy(computer)
+            # IORegistry entries can't be pickled to the worker
+            job_constants.computer.ioregistry = None
+
+        self._jobs.append({
+            "Name":      name,
+            "Model":     model,
+            "Constants": job_constants,
+            "Validate":  self.validate,
+            "Cleanup":   not self.keep_builds,
+        })
+
+
+    def run(self) -> dict:
+        """
+        Run all queued builds
+
+        Returns:
+            dict: Report with per-job results, in the order jobs were added
+        """
+
+        build_root = self.build_root or Path(tempfile.mkdtemp(prefix="oclp-batch-"))
+        build_root.mkdir(parents=True, exist_ok=True)
+        for index, job in enumerate(self._jobs):
+            job["Constants"].build_path_override = build_root / f"{index:03d}-{job['Name'].replace('/', '_').replace(' ', '_')}"
+
+        # Extract payloads once up front, rather than in each worker
+        cache_handler.PayloadStore().prepare([self.constants.payload_kexts_path, self.constants.payload_path / "OpenCore", self.constants.payload_path / "Icon"])
+
+        logging.info(f"- Building {len(self._jobs)} configurations with {self.workers} workers")
+
+        start = time.time()
+        results = {}
+        try:
+            if self.workers == 1 or getattr(sys, "frozen", False):
+                # Frozen builds can't spawn fresh interpreters
+                for index, job in enumerate(self._jobs):
+                    results[index] = _run_job(job)
+                    self._log_result(len(results), results[index])
+            else:
+                with ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+                    futures = {executor.submit(_run_job, job): index for index, job in enumerate(self._jobs)}
+                    for future in as_completed(futures):
+                        index = futures[future]
+                        try:
+                            results[index] = future.result()
+                        except Exception as e:
+                            # Worker process died
+                            results[index] = {"Name": self._jobs[index]["Name"], "Model": self._jobs[index]["Model"], "Success": False, "Error": str(e), "Duration": 0.0, "Log": ""}
+                        self._log_result(len(results), results[index])
+        finally:
+            if self.build_root is None and self.keep_builds is False:
+                shutil.rmtree(build_root, ignore_errors=True)
+
+        ordered = [results[index] for index in range(len(self._jobs))]
+        return {
+            "Jobs":      len(ordered),
+            "Succeeded": len([result for result in ordered if result["Success"]]),
+            "Failed":    len([result for result in ordered if not result["Success"]]),
+            "Workers":   self.workers,
+            "Duration":  round(time.time() - start, 3),
+            "BuildRoot": str(build_root),
+            "Results":   ordered,
+        }
+
+
+    def _log_result(self, completed: int, result: dict) -> None:
+        logging.info(f"- [{completed}/{len(self._jobs)}] {result['Name']}: {'Succeeded' if result['Success'] else 'Failed'} ({result['Duration']}s)")
+
+
+    @staticmethod
+    def log_report(report: dict) -> None:
+        """
+        Log a report's summary and each failure's details
+        """
+
+        logging.info(f"Built {report['Jobs']} configurations in {report['Duration']}s: {report['Succeeded']} succeeded, {report['Failed']} failed")
+        for result in report["Results"]:
+            if result["Success"]:
+                continue
+            logging.info(f"- {result['Name']} ({result['Model']}): {result['Error']}")
+            if result["Log"]:
+                logging.info(result["Log"])
@@ -6,7 +6,6 @@ import copy
 import pickle
 import shutil
 import logging
-import zipfile
 import plistlib
 
 from pathlib import Path
@@ -28,16 +27,12 @@ from . import (
     storage,
     smbios,
     security,
-    misc
+    misc,
+    incremental,
+    validator
 )
 
 
-def rmtree_handler(func, path, exc_info) -> None:
-    if exc_info[0] == FileNotFoundError:
-        return
-    raise  # pylint: disable=misplaced-bare-raise
-
-
 class BuildOpenCore:
     """
     Core Build Library for generating and validating OpenCore EFI Configurations
@@ -48,6 +43,7 @@ class BuildOpenCore:
         self.model: str = model
         self.config: dict = None
         self.constants: constants.Constants = global_constants
+        self.manifest: incremental.BuildManifest = None
 
         self._build_opencore()
 
@@ -101,22 +97,16 @@ class BuildOpenCore:
         else:
             logging.info("Build folder already present, skipping")
 
-        if Path(self.constants.opencore_zip_copied).exists():
-            logging.info("Deleting old copy of OpenCore zip")
-            Path(self.constants.opencore_zip_copied).unlink()
-        if Path(self.constants.opencore_release_folder).exists():
-            logging.info("Deleting old copy of OpenCore folder")
-            shutil.rmtree(self.constants.opencore_release_folder, onerror=rmtree_handler, ignore_errors=True)
+        self.manifest.reset()
 
         logging.info("")
         logging.info(f"- Adding OpenCore v{self.constants.opencore_version} {'DEBUG' if self.constants.opencore_debug is True else 'RELEASE'}")
-        shutil.copy(self.constants.opencore_zip_source, self.constants.build_path)
-        zipfile.ZipFile(self.constants.opencore_zip_copied).extractall(self.constants.build_path)
+        support.BuildSupport(self.model, self.constants, self.config).extract_payload(self.constants.opencore_zip_source, self.constants.build_path)
 
         # Setup config.plist for editing
         logging.info("- Adding config.plist for OpenCore")
         shutil.copy(self.constants.plist_template, self.constants.oc_folder)
-        self.config = plistlib.load(Path(self.constants.plist_path).open("rb"))
+        self.config = incremental.load_plist(self.constants.plist_path)
 
 
     def _set_revision(self) -> None:
@@ -138,6 +128,24 @@ class BuildOpenCore:
         self.config["NVRAM"]["Add"]["4D1FDA02-38C7-4A6A-9CC6-4BCCA8B30102"]["OCLP-Model"] = self.model
 
 
+    def _validate_config(self) -> None:
+        """
+        Validate generated config.plist
+
+        Errors only fail validation builds (CI, BatchBuild), other builds log them
+        """
+
+        logging.info("- Validating config.plist")
+        errors = validator.ConfigValidator(self.config, self.constants).validate()
+        if not errors:
+            return
+
+        for error in errors:
+            logging.info(f"- {error}")
+        if self.constants.validate is True:
+            raise Exception(f"Generated config.plist is invalid: {errors[0]}")
+
+
     def _save_config(self) -> None:
         """
         Save config.plist to disk
@@ -151,22 +159,33 @@ class BuildOpenCore:
         Kick off the build process
 
         This is the main function:
-        - Generates the OpenCore configuration
+        - Reuses the previous EFI if nothing changed
+        - Generates the OpenCore configuration, relinking only changed payload files
+        - Removes payload files no longer used
+        - Validates generated config.plist
         - Cleans working directory
         - Signs files
         - Validates generated EFI
         """
 
-        # Generate OpenCore Configuration
-        self._build_efi()
-        if self.constants.allow_oc_everywhere is False or self.constants.allow_native_spoofs is True or (self.constants.custom_serial_number != "" and self.constants.custom_board_serial_number != ""):
-            smbios.BuildSMBIOS(self.model, self.constants, self.config).set_smbios()
-        support.BuildSupport(self.model, self.constants, self.config).cleanup()
-        self._save_config()
-
-        # Post-build handling
-        support.BuildSupport(self.model, self.constants, self.config).sign_files()
-        support.BuildSupport(self.model, self.constants, self.config).validate_pathing()
+        self.manifest = incremental.BuildManifest(self.model, self.constants)
+        if self.manifest.is_current():
+            logging.info(f"Configuration for {self.model} unchanged since last build, reusing EFI")
+            self.config = plistlib.load(Path(self.constants.plist_path).open("rb"))
+        else:
+            # Generate OpenCore Configuration
+            self._build_efi()
+            if self.constants.allow_oc_everywhere is False or self.constants.allow_native_spoofs is True or (self.constants.custom_serial_number != "" and self.constants.custom_board_serial_number != ""):
+                smbios.BuildSMBIOS(self.model, self.constants, self.config).set_smbios()
+            self.manifest.sweep()
+            self._validate_config()
+            support.BuildSupport(self.model, self.constants, self.config).cleanup()
+            self._save_config()
+
+            # Post-build handling
+            support.BuildSupport(self.model, self.constants, self.config).sign_files()
+            support.BuildSupport(self.model, self.constants, self.config).validate_pathing()
+            self.manifest.save()
 
         logging.info("")
         logging.info(f"Your OpenCore EFI for {self.model} has been built at:")
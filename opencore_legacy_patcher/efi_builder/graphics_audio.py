@@ -220,7 +220,7 @@ class BuildGraphicsAudio:
                 "name": binascii.unhexlify("23646973706C6179"),
                 "class-code": binascii.unhexlify("FFFFFFFF"),
             }
-        shutil.copy(self.constants.backlight_injector_path, self.constants.kexts_path)
+        support.BuildSupport(self.model, self.constants, self.config).extract_payload(self.constants.backlight_injector_path, self.constants.kexts_path)
         support.BuildSupport(self.model, self.constants, self.config).get_kext_by_bundle_path("BacklightInjector.kext")["Enabled"] = True
         self.config["UEFI"]["Quirks"]["ForgeUefiSupport"] = True
         self.config["UEFI"]["Quirks"]["ReloadOptionRoms"] = True
@@ -0,0 +1,302 @@
+"""
+incremental.py: Incremental EFI builds, reusing a build folder's previous output
+
+Each build stores a fingerprint of its inputs (model, build settings, hardware dump,
+payloads and config template) alongside a listing of the EFI it produced. Rebuilding
+with an unchanged fingerprint reuses the previous EFI as-is. Otherwise the configuration
+is regenerated, while payload files the previous build hardlinked from the payload store
+are kept in place: only missing or changed files are linked again, and files this build
+no longer uses are swept.
+
+Usage:
+    >>> manifest = BuildManifest(model, global_constants)
+    >>> if manifest.is_current():
+    ...     return
+    >>> manifest.reset()
+    >>> ...  # BuildSupport.extract_payload() calls claim()
+    >>> manifest.sweep()
+    >>> ...
+    >>> manifest.save()
+"""
+
+import os
+import copy
+import enum
+import stat
+import pickle
+import hashlib
+import plistlib
+
+from typing import Optional
+from pathlib import Path
+from datetime import date
+
+from .. import constants
+
+
+BUILD_MANIFEST_VERSION: int = 1  # Bump when the manifest format changes
+
+# Settings with no effect on the generated EFI, changing them keeps the previous build
+_IGNORED_SETTINGS: list = [
+    # Runtime state
+    "gui_mode",
+    "cli_mode",
+    "has_checked_updates",
+    "root_patcher_succeeded",
+    "start_build_install",
+    "needs_to_open_preferences",
+    "unpack_thread",
+    "update_stage",
+    "log_filepath",
+    "thread_sleep_interval",
+    "build_path_override",
+    "launcher_binary",
+    "launcher_script",
+    "booted_oc_disk",
+    "commit_info",
+    "host_is_non_metal",
+    "host_is_hackintosh",
+
+    # App settings
+    "ignore_updates",
+    "should_nuke_kdks",
+    "download_bandwidth_limit",
+
+    # Root patching settings
+    "allow_ts2_accel",
+    "force_latest_psp",
+]
+
+# Payload folders copied into the EFI
+_PAYLOAD_FOLDERS: list = ["ACPI", "Config", "Drivers", "Icon", "Kexts", "OpenCore"]
+
+# Build folder -> files and folders placed from the payload store by the build in progress
+_CLAIMED: dict = {}
+
+_PARSED_PLISTS: dict = {}  # SHA-256 of a plist -> parsed plist, unchanged plists are parsed once per session
+
+
+def claim(build_path: Path, paths: list) -> None:
+    """
+    Record payload store files placed in a build folder, so sweep() keeps them
+
+    Parameters:
+        build_path (Path): Build folder
+        paths      (list): Files and folders placed
+    """
+
+    claimed = _CLAIMED.get(str(build_path))
+    if claimed is not None:
+        claimed.update(str(path) for path in paths)
+
+
+def load_plist(path: Path) -> dict:
+    """
+    Parse a plist, reusing the result if a plist with identical contents was parsed before
+
+    Parameters:
+        path (Path): Plist to parse
+
+    Returns:
+        dict: Parsed plist, safe to modify
+    """
+
+    data = Path(path).read_bytes()
+    key = hashlib.sha256(data).hexdigest()
+    if key not in _PARSED_PLISTS:
+        _PARSED_PLISTS[key] = plistlib.loads(data)
+    return copy.deepcopy(_PARSED_PLISTS[key])
+
+
+class BuildManifest:
+    """
+    Tracks a build folder's inputs and output between builds
+
+    Output files are tracked by size and modification date, relative to the build folder
+
+    Parameters:
+        model            (str):       Model being built
+        global_constants (Constants): Build settings
+    """
+
+    def __init__(self, model: str, global_constants: constants.Constants) -> None:
+        self.model:     str = model
+        self.constants: constants.Constants = global_constants
+
+        self.fingerprint: Optional[str] = self._fingerprint()
+
+        self._previous: dict = self._load()
+
+
+    def _load(self) -> dict:
+        path = Path(self.constants.build_manifest_path)
+        if not path.exists():
+            return {}
+
+        try:
+            manifest = plistlib.loads(path.read_bytes())
+        except Exception:
+            return {}
+
+        if manifest.get("Version") != BUILD_MANIFEST_VERSION:
+            return {}
+        return manifest
+
+
+    @classmethod
+    def _encode(cls, value) -> str:
+        """
+        Stable representation of a build setting
+
+        Raises an exception if the value can't be represented
+        """
+
+        if isinstance(value, enum.Enum):
+            return f"{type(value).__name__}.{value.name}"
+        if value is None or isinstance(value, (str, bool, int, float, Path)):
+            return repr(value)
+        if isinstance(value, (list, tuple)):
+            return f"{type(value).__name__}[{','.join(cls._encode(item) for item in value)}]"
+        if isinstance(value, (set, frozenset)):
+            return f"set[{','.join(sorted(cls._encode(item) for item in value))}]"
+        if isinstance(value, dict):
+            return f"dict[{','.join(sorted(f'{cls._encode(key)}:{cls._encode(item)}' for key, item in value.items()))}]"
+        return f"{type(value).__name__}({pickle.dumps(value).hex()})"
+
+
+    def _fingerprint(self) -> Optional[str]:
+        """
+        Hash every input of the build
+
+        Returns:
+            str: Fingerprint, None if a setting can't be represented (never reused)
+        """
+
+        hasher = hashlib.sha256()
+
+        # Build-Version in config.plist holds the build date
+        hasher.update(f"{self.model}|{date.today()}|".encode())
+
+        for key, value in sorted(vars(self.constants).items()):
+            if key in _IGNORED_SETTINGS or key == "computer":
+                continue
+            try:
+                hasher.update(f"{key}={self._encode(value)}|".encode())
+            except Exception:
+                return None
+
+        if self.constants.computer is not None:
+            computer_copy = copy.copy(self.constants.computer)
+            computer_copy.ioregistry = None
+            try:
+                hasher.update(pickle.dumps(computer_copy))
+            except Exception:
+                return None
+
+        # Payloads are only compared by size and modification date, hashing them would cost more than the build
+        for folder in _PAYLOAD_FOLDERS:
+            hasher.update(repr(sorted(self._scan(self.constants.payload_path / folder, self.constants.payload_path).items())).encode())
+
+        hasher.update(Path(self.constants.plist_template).read_bytes())
+
+        return hasher.hexdigest()
+
+
+    @staticmethod
+    def _scan(folder: Path, root: Path) -> dict:
+        """
+        Size and modification date of every file in a folder
+
+        Returns:
+            dict: Path relative to root -> [size, modification date (ns)]
+        """
+
+        files = {}
+        for path, _, filenames in os.walk(folder):
+            for filename in filenames:
+                stat = os.lstat(os.path.join(path, filename))
+                files[Path(path, filename).relative_to(root).as_posix()] = [stat.st_size, stat.st_mtime_ns]
+        return files
+
+
+    def is_current(self) -> bool:
+        """
+        Whether the previous build used identical inputs and its output is unmodified
+        """
+
+        if self.fingerprint is None or self._previous.get("Fingerprint") != self.fingerprint:
+            return False
+        if not Path(self.constants.plist_path).exists():
+            return False
+        return self._previous.get("Tree") == self._scan(self.constants.opencore_release_folder, self.constants.build_path)
+
+
+    def reset(self) -> None:
+        """
+        Prepare the OpenCore folder for a new build
+
+        Files hardlinked from the payload store are kept for PayloadStore.materialise() to
+        reuse, everything else (config.plist, copied or modified files) is removed
+        """
+
+        # Invalid from here on, until save()
+        Path(self.constants.build_manifest_path).unlink(missing_ok=True)
+
+        _CLAIMED[str(self.constants.build_path)] = set()
+
+        release_folder = Path(self.constants.opencore_release_folder)
+        if not release_folder.exists():
+            return
+
+        for path, folders, filenames in os.walk(release_folder, topdown=False):
+            for filename in filenames:
+                file = Path(path, filename)
+                st = os.lstat(file)
+                if not (stat.S_ISREG(st.st_mode) and st.st_nlink > 1):
+                    file.unlink()
+            for folder in folders:
+                folder = Path(path, folder)
+                if folder.is_symlink():
+                    folder.unlink()
+                elif not any(folder.iterdir()):
+                    folder.rmdir()
+
+
+    def sweep(self) -> None:
+        """
+        Remove files kept by reset() that this build didn't place again
+
+        Call once every payload has been placed
+        """
+
+        claimed = _CLAIMED.pop(str(self.constants.build_path), set())
+        release_folder = Path(self.constants.opencore_release_folder)
+
+        for path, _, filenames in os.walk(release_folder, topdown=False):
+            for filename in filenames:
+                file = Path(path, filename)
+                if str(file) in claimed:
+                    continue
+                st = os.lstat(file)
+                if not (stat.S_ISREG(st.st_mode) and st.st_nlink > 1):
+                    # Created by this build
+                    continue
+
+                file.unlink()
+                # Drop folders left empty, unless this build placed them
+                parent = file.parent
+                while parent != release_folder and str(parent) not in claimed and not any(parent.iterdir()):
+                    parent.rmdir()
+                    parent = parent.parent
+
+
+    def save(self) -> None:
+        """
+        Record the completed build
+        """
+
+        Path(self.constants.build_manifest_path).write_bytes(plistlib.dumps({
+            "Version":     BUILD_MANIFEST_VERSION,
+            "Fingerprint": self.fingerprint,
+            "Tree":        self._scan(self.constants.opencore_release_folder, self.constants.build_path),
+        }, fmt=plistlib.FMT_BINARY))
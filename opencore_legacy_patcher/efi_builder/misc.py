@@ -323,7 +323,7 @@ xw
             self.model in ["MacPro4,1", "MacPro5,1", "Xserve3,1"]
         ):
             logging.info("- Adding UHCI/OHCI USB support")
-            shutil.copy(self.constants.apple_usb_11_injector_path, self.constants.kexts_path)
+            support.BuildSupport(self.model, self.constants, self.config).extract_payload(self.constants.apple_usb_11_injector_path, self.constants.kexts_path)
             support.BuildSupport(self.model, self.constants, self.config).get_kext_by_bundle_path("USB1.1-Injector.kext/Contents/PlugIns/AppleUSBOHCI.kext")["Enabled"] = True
             support.BuildSupport(self.model, self.constants, self.config).get_kext_by_bundle_path("USB1.1-Injector.kext/Contents/PlugIns/AppleUSBOHCIPCI.kext")["Enabled"] = True
             support.BuildSupport(self.model, self.constants, self.config).get_kext_by_bundle_path("USB1.1-Injector.kext/Contents/PlugIns/AppleUSBUHCI.kext")["Enabled"] = True
@@ -359,7 +359,7 @@ xw
         """
 
         logging.info("- Adding OpenCanopy GUI")
-        shutil.copy(self.constants.gui_path, self.constants.oc_folder)
+        support.BuildSupport(self.model, self.constants, self.config).extract_payload(self.constants.gui_path, self.constants.oc_folder)
         support.BuildSupport(self.model, self.constants, self.config).get_efi_binary_by_path("OpenCanopy.efi", "UEFI", "Drivers")["Enabled"] = True
         support.BuildSupport(self.model, self.constants, self.config).get_efi_binary_by_path("OpenRuntime.efi", "UEFI", "Drivers")["Enabled"] = True
         support.BuildSupport(self.model, self.constants, self.config).get_efi_binary_by_path("OpenLinuxBoot.efi", "UEFI", "Drivers")["Enabled"] = True
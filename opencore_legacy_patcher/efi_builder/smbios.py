@@ -11,7 +11,10 @@ import subprocess
 
 from pathlib import Path
 
-from . import support
+from . import (
+    support,
+    incremental
+)
 
 from .. import constants
 
@@ -142,7 +145,7 @@ class BuildSMBIOS:
             and ((self.model in model_array.Missing_USB_Map or self.model in model_array.Missing_USB_Map_Ventura) or self.constants.serial_settings in ["Moderate", "Advanced"])
         ):
             new_map_ls = Path(self.constants.map_contents_folder) / Path("Info.plist")
-            map_config = plistlib.load(Path(new_map_ls).open("rb"))
+            map_config = incremental.load_plist(new_map_ls)
             # Strip unused USB maps
             for entry in list(map_config["IOKitPersonalities_x86_64"]):
                 if not entry.startswith(self.model):
@@ -163,7 +166,7 @@ class BuildSMBIOS:
         if self.constants.allow_oc_everywhere is False and self.model not in ["iMac7,1", "Xserve2,1", "Dortania1,1"] and self.constants.disallow_cpufriend is False and self.constants.serial_settings != "None":
             # Adjust CPU Friend Data to correct SMBIOS
             new_cpu_ls = Path(self.constants.pp_contents_folder) / Path("Info.plist")
-            cpu_config = plistlib.load(Path(new_cpu_ls).open("rb"))
+            cpu_config = incremental.load_plist(new_cpu_ls)
             string_stuff = str(cpu_config["IOKitPersonalities"]["CPUFriendDataProvider"]["cf-frequency-data"])
             string_stuff = string_stuff.replace(self.model, self.spoofed_model)
             string_stuff = ast.literal_eval(string_stuff)
@@ -173,7 +176,7 @@ class BuildSMBIOS:
         if self.constants.allow_oc_everywhere is False and self.constants.serial_settings != "None":
             if self.model == "MacBookPro9,1":
                 new_amc_ls = Path(self.constants.amc_contents_folder) / Path("Info.plist")
-                amc_config = plistlib.load(Path(new_amc_ls).open("rb"))
+                amc_config = incremental.load_plist(new_amc_ls)
                 amc_config["IOKitPersonalities"]["AppleMuxControl"]["ConfigMap"][self.spoofed_board] = amc_config["IOKitPersonalities"]["AppleMuxControl"]["ConfigMap"].pop(self.model)
                 for entry in list(amc_config["IOKitPersonalities"]["AppleMuxControl"]["ConfigMap"]):
                     if not entry.startswith(self.spoofed_board):
@@ -181,7 +184,7 @@ class BuildSMBIOS:
                 plistlib.dump(amc_config, Path(new_amc_ls).open("wb"), sort_keys=True)
             if self.model not in model_array.NoAGPMSupport:
                 new_agpm_ls = Path(self.constants.agpm_contents_folder) / Path("Info.plist")
-                agpm_config = plistlib.load(Path(new_agpm_ls).open("rb"))
+                agpm_config = incremental.load_plist(new_agpm_ls)
                 agpm_config["IOKitPersonalities"]["AGPM"]["Machines"][self.spoofed_board] = agpm_config["IOKitPersonalities"]["AGPM"]["Machines"].pop(self.model)
                 if self.model == "MacBookPro6,2":
                     # Force G State to not exceed moderate state
@@ -198,7 +201,7 @@ class BuildSMBIOS:
                 plistlib.dump(agpm_config, Path(new_agpm_ls).open("wb"), sort_keys=True)
             if self.model in model_array.AGDPSupport:
                 new_agdp_ls = Path(self.constants.agdp_contents_folder) / Path("Info.plist")
-                agdp_config = plistlib.load(Path(new_agdp_ls).open("rb"))
+                agdp_config = incremental.load_plist(new_agdp_ls)
                 agdp_config["IOKitPersonalities"]["AppleGraphicsDevicePolicy"]["ConfigMap"][self.spoofed_board] = agdp_config["IOKitPersonalities"]["AppleGraphicsDevicePolicy"]["ConfigMap"].pop(
                     self.model
                 )
@@ -6,13 +6,84 @@ import shutil
 import typing
 import logging
 import plistlib
-import zipfile
 import subprocess
 
 from pathlib import Path
 
 from .. import constants
 
+from ..support import cache_handler
+
+from . import incremental
+
+
+class ConfigIndex:
+    """
+    Hash indexes over a config.plist's entry lists (ie. Kernel.Add by BundlePath)
+
+    Lists are indexed on first lookup and shared by every BuildSupport of the config being built.
+    Hits are checked against the list and misses re-index it, so entries added, removed or
+    renamed directly through the config are always found.
+
+    Parameters:
+        config (dict): config.plist being built
+    """
+
+    _current: "ConfigIndex" = None
+
+    def __init__(self, config: dict) -> None:
+        self.config: dict = config
+
+        self._indexes: dict = {}  # (list id, key) -> (list, length, {value: (position, item)})
+
+
+    @classmethod
+    def for_config(cls, config: dict) -> "ConfigIndex":
+        """
+        Gets the index of a config, only the most recent config's index is kept
+        """
+
+        if cls._current is None or cls._current.config is not config:
+            cls._current = cls(config)
+        return cls._current
+
+
+    def _index(self, iterable: list, key: str) -> dict:
+        entries = {}
+        for position, item in enumerate(iterable):
+            # Entries without the key can't match, ie. Booter.Patch has no Base
+            if key not in item:
+                continue
+            # First match wins, ie. Kernel.Patch entries sharing an Identifier
+            entries.setdefault(item[key], (position, item))
+
+        self._indexes[(id(iterable), key)] = (iterable, len(iterable), entries)
+        return entries
+
+
+    def lookup(self, iterable: list, key: str, value: typing.Any) -> dict:
+        """
+        Gets the first item of a list of dicts with a matching key and value
+
+        Parameters:
+            iterable (list): List of dicts
+            key       (str): Key to search for
+            value     (any): Value to search for
+
+        Returns:
+            dict: Item, None if not found
+        """
+
+        cached = self._indexes.get((id(iterable), key))
+        if cached is not None and cached[0] is iterable and cached[1] == len(iterable) and value in cached[2]:
+            position, item = cached[2][value]
+            if iterable[position] is item and item.get(key) == value:
+                return item
+
+        # Not indexed yet, or entries were changed since
+        entries = self._index(iterable, key)
+        return entries[value][1] if value in entries else None
+
 
 class BuildSupport:
     """
@@ -25,8 +96,7 @@ class BuildSupport:
         self.constants: constants.Constants = global_constants
 
 
-    @staticmethod
-    def get_item_by_kv(iterable: dict, key: str, value: typing.Any) -> dict:
+    def get_item_by_kv(self, iterable: list, key: str, value: typing.Any) -> dict:
         """
         Gets an item from a list of dicts by key and value
 
@@ -37,12 +107,7 @@ class BuildSupport:
 
         """
 
-        item = None
-        for i in iterable:
-            if i[key] == value:
-                item = i
-                break
-        return item
+        return ConfigIndex.for_config(self.config).lookup(iterable, key, value)
 
 
     def get_kext_by_bundle_path(self, bundle_path: str) -> dict:
@@ -97,10 +162,22 @@ class BuildSupport:
             return
 
         logging.info(f"- Adding {kext_name} {kext_version}")
-        shutil.copy(kext_path, self.constants.kexts_path)
+        self.extract_payload(kext_path, self.constants.kexts_path)
         kext["Enabled"] = True
 
 
+    def extract_payload(self, archive: Path, destination: Path) -> None:
+        """
+        Adds a payload archive's contents to the EFI, from the payload store
+
+        Parameters:
+            archive     (Path): Zip archive in payloads
+            destination (Path): Folder to extract to
+        """
+
+        incremental.claim(self.constants.build_path, cache_handler.PayloadStore().materialise(archive, destination))
+
+
     def sign_files(self) -> None:
         """
         Signs files for on OpenCorePkg's Vault system
@@ -109,6 +186,11 @@ class BuildSupport:
         if self.constants.vault is False:
             return
 
+        # OpenCore.efi is patched in place, break its hardlink to the payload store first
+        oc_binary = self.constants.oc_folder / Path("OpenCore.efi")
+        shutil.copyfile(oc_binary, oc_binary.with_suffix(".tmp"))
+        oc_binary.with_suffix(".tmp").replace(oc_binary)
+
         logging.info("- Vaulting EFI\n=========================================")
         popen = subprocess.Popen([str(self.constants.vault_path), f"{self.constants.oc_folder}/"], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
         for stdout_line in iter(popen.stdout.readline, ""):
@@ -160,13 +242,15 @@ class BuildSupport:
 
         # Validating local files
         # Report if they have no associated config.plist entry (i.e. they're not being used)
+        tool_paths = {x["Path"] for x in config_plist["Misc"]["Tools"]}
         for tool_files in Path(self.constants.opencore_release_folder / Path("EFI/OC/Tools")).glob("*"):
-            if tool_files.name not in [x["Path"] for x in config_plist["Misc"]["Tools"]]:
+            if tool_files.name not in tool_paths:
                 logging.info(f"- Missing tool from config: {tool_files.name}")
                 raise Exception(f"Missing tool from config: {tool_files.name}")
 
+        driver_paths = {x["Path"] for x in config_plist["UEFI"]["Drivers"]}
         for driver_file in Path(self.constants.opencore_release_folder / Path("EFI/OC/Drivers")).glob("*"):
-            if driver_file.name not in [x["Path"] for x in config_plist["UEFI"]["Drivers"]]:
+            if driver_file.name not in driver_paths:
                 logging.info(f"- Found extra driver: {driver_file.name}")
                 raise Exception(f"Found extra driver: {driver_file.name}")
 
@@ -181,7 +265,7 @@ class BuildSupport:
             if not Path(kext_folder / Path("Contents/Info.plist")).exists():
                 continue
 
-            kext_data = plistlib.load(Path(kext_folder / Path("Contents/Info.plist")).open("rb"))
+            kext_data = incremental.load_plist(kext_folder / Path("Contents/Info.plist"))
             if "CFBundleExecutable" in kext_data:
                 expected_executable = Path(kext_folder / Path("Contents/MacOS") / Path(kext_data["CFBundleExecutable"]))
                 if not expected_executable.exists():
@@ -213,21 +297,6 @@ class BuildSupport:
                     if item["Enabled"] is False:
                         self.config[entry][sub_entry].remove(item)
 
-        for kext in self.constants.kexts_path.rglob("*.zip"):
-            with zipfile.ZipFile(kext) as zip_file:
-                zip_file.extractall(self.constants.kexts_path)
-            kext.unlink()
-
-        for item in self.constants.oc_folder.rglob("*.zip"):
-            with zipfile.ZipFile(item) as zip_file:
-                zip_file.extractall(self.constants.oc_folder)
-            item.unlink()
-
-        if not self.constants.recovery_status:
-            # Crashes in RecoveryOS for unknown reason
-            for i in self.constants.build_path.rglob("__MACOSX"):
-                shutil.rmtree(i)
-
         # Remove unused plugins inside of kexts
         # Following plugins are sometimes unused as there's different variants machines need
         known_unused_plugins = [
@@ -247,6 +316,4 @@ class BuildSupport:
                 if should_remove:
                     if plugin.name not in known_unused_plugins:
                         raise Exception(f" - Unknown plugin found: {plugin.name}")
-                    shutil.rmtree(plugin)
-
-        Path(self.constants.opencore_zip_copied).unlink()
\ No newline at end of file
+                    shutil.rmtree(plugin)
\ No newline at end of file
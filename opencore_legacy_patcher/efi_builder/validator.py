@@ -0,0 +1,403 @@
+"""
+validator.py: In-process validation of generated OpenCore configurations
+
+Covers the checks OCLP relied on ocvalidate for, without needing macOS:
+- Required keys and types, against the config.plist template
+- Enabled entry consistency (ie. patch sizes, duplicate entries, supported values)
+- Kernel.Add ordering and dependencies, from each kext's Info.plist
+- File references in the EFI
+
+Usage:
+    >>> errors = ConfigValidator(config, global_constants).validate()
+    >>> if errors:
+    ...     raise Exception(errors[0])
+"""
+
+import os
+import re
+import plistlib
+
+from pathlib import Path
+
+from .. import constants
+
+
+# Sections whose keys are user-defined, mapped to the type of their values
+_FREEFORM_SECTIONS: dict = {
+    "DeviceProperties.Add":    dict,
+    "DeviceProperties.Delete": list,
+    "NVRAM.Add":               dict,
+    "NVRAM.Delete":            list,
+    "NVRAM.LegacySchema":      list,
+}
+
+# Keys of each entry in a config.plist list
+_ENTRY_SCHEMAS: dict = {
+    "ACPI.Add": {
+        "Comment": str, "Enabled": bool, "Path": str,
+    },
+    "ACPI.Delete": {
+        "All": bool, "Comment": str, "Enabled": bool, "OemTableId": bytes, "TableLength": int, "TableSignature": bytes,
+    },
+    "ACPI.Patch": {
+        "Base": str, "BaseSkip": int, "Comment": str, "Count": int, "Enabled": bool, "Find": bytes, "Limit": int, "Mask": bytes,
+        "OemTableId": bytes, "Replace": bytes, "ReplaceMask": bytes, "Skip": int, "TableLength": int, "TableSignature": bytes,
+    },
+    "Booter.MmioWhitelist": {
+        "Address": int, "Comment": str, "Enabled": bool,
+    },
+    "Booter.Patch": {
+        "Arch": str, "Comment": str, "Count": int, "Enabled": bool, "Find": bytes, "Identifier": str, "Limit": int, "Mask": bytes,
+        "Replace": bytes, "ReplaceMask": bytes, "Skip": int,
+    },
+    "Kernel.Add": {
+        "Arch": str, "BundlePath": str, "Comment": str, "Enabled": bool, "ExecutablePath": str, "MaxKernel": str, "MinKernel": str, "PlistPath": str,
+    },
+    "Kernel.Block": {
+        "Arch": str, "Comment": str, "Enabled": bool, "Identifier": str, "MaxKernel": str, "MinKernel": str, "Strategy": str,
+    },
+    "Kernel.Force": {
+        "Arch": str, "BundlePath": str, "Comment": str, "Enabled": bool, "ExecutablePath": str, "Identifier": str, "MaxKernel": str, "MinKernel": str, "PlistPath": str,
+    },
+    "Kernel.Patch": {
+        "Arch": str, "Base": str, "Comment": str, "Count": int, "Enabled": bool, "Find": bytes, "Identifier": str, "Limit": int, "Mask": bytes,
+        "MaxKernel": str, "MinKernel": str, "Replace": bytes, "ReplaceMask": bytes, "Skip": int,
+    },
+    "Misc.BlessOverride": str,
+    "Misc.Entries": {
+        "Arguments": str, "Auxiliary": bool, "Comment": str, "Enabled": bool, "Flavour": str, "FullNvramAccess": bool, "Name": str, "Path": str, "TextMode": bool,
+    },
+    "Misc.Tools": {
+        "Arguments": str, "Auxiliary": bool, "Comment": str, "Enabled": bool, "Flavour": str, "FullNvramAccess": bool, "Name": str, "Path": str,
+        "RealPath": bool, "TextMode": bool,
+    },
+    "UEFI.Drivers": {
+        "Arguments": str, "Comment": str, "Enabled": bool, "LoadEarly": bool, "Path": str,
+    },
+    "UEFI.ReservedMemory": {
+        "Address": int, "Comment": str, "Enabled": bool, "Size": int, "Type": str,
+    },
+    "UEFI.Unload": str,
+}
+
+# Supported values of string settings
+_SUPPORTED_VALUES: dict = {
+    "Kernel.Scheme.KernelArch":                ["Auto", "i386", "i386-user32", "x86_64"],
+    "Kernel.Scheme.KernelCache":               ["Auto", "Cacheless", "Mkext", "Prelinked"],
+    "Misc.Boot.HibernateMode":                 ["None", "Auto", "RTC", "NVRAM"],
+    "Misc.Boot.LauncherOption":                ["Disabled", "Full", "Short", "System"],
+    "Misc.Boot.PickerMode":                    ["Builtin", "External", "Apple"],
+    "Misc.Security.DmgLoading":                ["Disabled", "Signed", "Any"],
+    "Misc.Security.Vault":                     ["Optional", "Basic", "Secure"],
+    "PlatformInfo.UpdateSMBIOSMode":           ["TryOverwrite", "Create", "Overwrite", "Custom"],
+    "PlatformInfo.Generic.SystemMemoryStatus": ["Auto", "Upgradable", "Soldered"],
+    "UEFI.AppleInput.AppleEvent":              ["Auto", "Builtin", "OEM"],
+    "UEFI.Audio.PlayChime":                    ["Auto", "Enabled", "Disabled"],
+    "UEFI.Input.KeySupportMode":               ["Auto", "V1", "V2", "AMI"],
+    "UEFI.Output.GopPassThrough":              ["Enabled", "Disabled", "Apple"],
+    "UEFI.Output.TextRenderer":                ["BuiltinGraphics", "BuiltinText", "SystemGraphics", "SystemText", "SystemGeneric"],
+}
+
+_SUPPORTED_ARCHS:      list = ["Any", "i386", "x86_64"]
+_SUPPORTED_STRATEGIES: list = ["Disable", "Exclude"]
+
+_KERNEL_VERSION = re.compile(r"^(\d+(\.\d+){0,2})?$")
+
+_TEMPLATES: dict = {}  # Template path -> parsed template
+_KEXT_INFO: dict = {}  # (device, inode, size, modification date) of Info.plist -> (identifier, executable, libraries), kexts are parsed once per session
+
+
+class ConfigValidator:
+    """
+    Validate an OpenCore configuration and the EFI it's built into
+
+    Only enabled entries are checked beyond their keys and types, so configs can be
+    validated before disabled entries are cleaned up.
+
+    Parameters:
+        config           (dict):      config.plist to validate
+        global_constants (Constants): Build settings, for the template and EFI location
+    """
+
+    def __init__(self, config: dict, global_constants: constants.Constants) -> None:
+        self.config:    dict = config
+        self.constants: constants.Constants = global_constants
+
+        self._errors: list = []
+
+
+    def validate(self) -> list:
+        """
+        Run all checks
+
+        Returns:
+            list: Errors found, empty if valid
+        """
+
+        self._errors = []
+
+        self._validate_schema(self.config, self._load_template(), "")
+        for section, schema in _ENTRY_SCHEMAS.items():
+            entries = self._get(section)
+            if isinstance(entries, list):
+                self._validate_entries(section, entries, schema)
+
+        # Remaining checks rely on the layout checked above
+        if self._errors:
+            return self._errors
+
+        self._validate_settings()
+        self._validate_patches()
+        self._validate_kexts()
+        self._validate_files()
+
+        return self._errors
+
+
+    def _load_template(self) -> dict:
+        path = str(self.constants.plist_template)
+        if path not in _TEMPLATES:
+            _TEMPLATES[path] = plistlib.loads(Path(path).read_bytes())
+        return _TEMPLATES[path]
+
+
+    def _get(self, path: str):
+        value = self.config
+        for key in path.split("."):
+            value = value.get(key) if isinstance(value, dict) else None
+        return value
+
+
+    def _enabled(self, section: str) -> list:
+        """
+        Enabled entries of a section, with their index
+        """
+
+        return [(index, entry) for index, entry in enumerate(self._get(section)) if entry["Enabled"] is True]
+
+
+    def _error(self, message: str) -> None:
+        self._errors.append(message)
+
+
+    def _validate_schema(self, config: dict, template: dict, path: str) -> None:
+        """
+        Check keys and types against the template, keys starting with '#' are comments
+        """
+
+        for key, expected in template.items():
+            if key.startswith("#"):
+                continue
+            if key not in config:
+                self._error(f"{path}{key}: Missing")
+                continue
+            if type(config[key]) is not type(expected):
+                self._error(f"{path}{key}: Expected {type(expected).__name__}, found {type(config[key]).__name__}")
+                continue
+
+            key_path = f"{path}{key}"
+            if key_path in _FREEFORM_SECTIONS:
+                for child, value in config[key].items():
+                    if not isinstance(value, _FREEFORM_SECTIONS[key_path]):
+                        self._error(f"{key_path}.{child}: Expected {_FREEFORM_SECTIONS[key_path].__name__}, found {type(value).__name__}")
+            elif isinstance(expected, dict):
+                self._validate_schema(config[key], expected, f"{key_path}.")
+
+        for key in config:
+            if key not in template and not key.startswith("#"):
+                self._error(f"{path}{key}: Unknown key")
+
+
+    def _validate_entries(self, section: str, entries: list, schema) -> None:
+        for index, entry in enumerate(entries):
+            if not isinstance(schema, dict):
+                if type(entry) is not schema:
+                    self._error(f"{section}[{index}]: Expected {schema.__name__}, found {type(entry).__name__}")
+                continue
+
+            if not isinstance(entry, dict):
+                self._error(f"{section}[{index}]: Expected dict, found {type(entry).__name__}")
+                continue
+            for key, expected in schema.items():
+                if key not in entry:
+                    self._error(f"{section}[{index}]->{key}: Missing")
+                elif type(entry[key]) is not expected:
+                    self._error(f"{section}[{index}]->{key}: Expected {expected.__name__}, found {type(entry[key]).__name__}")
+            for key in entry:
+                if key not in schema and not key.startswith("#"):
+                    self._error(f"{section}[{index}]->{key}: Unknown key")
+
+
+    def _validate_settings(self) -> None:
+        """
+        Check supported values of settings and conflicting settings
+        """
+
+        for path, supported in _SUPPORTED_VALUES.items():
+            if self._get(path) not in supported:
+                self._error(f"{path}: Unsupported value '{self._get(path)}'")
+
+        if self._get("Misc.Security.SecureBootModel") != "Disabled" and self._get("Misc.Security.DmgLoading") == "Any":
+            self._error("Misc.Security.DmgLoading: Cannot be 'Any' with SecureBootModel enabled")
+
+        drivers = [entry["Path"] for _, entry in self._enabled("UEFI.Drivers")]
+        if "OpenCanopy.efi" in drivers and self._get("Misc.Boot.PickerMode") != "External":
+            self._error("Misc.Boot.PickerMode: Must be 'External' when OpenCanopy.efi is loaded")
+
+        for section, extension in [("ACPI.Add", (".aml", ".bin")), ("UEFI.Drivers", (".efi",)), ("Misc.Tools", (".efi",))]:
+            seen = set()
+            for index, entry in self._enabled(section):
+                if not entry["Path"].lower().endswith(extension):
+                    self._error(f"{section}[{index}]->Path: Unsupported file '{entry['Path']}'")
+                if entry["Path"] in seen:
+                    self._error(f"{section}[{index}]->Path: '{entry['Path']}' is duplicated")
+                seen.add(entry["Path"])
+
+
+    def _validate_patches(self) -> None:
+        """
+        Check patch sizes and kernel version ranges
+        """
+
+        for section in ["ACPI.Patch", "Booter.Patch", "Kernel.Patch"]:
+            for index, entry in self._enabled(section):
+                if entry["Find"] and len(entry["Find"]) != len(entry["Replace"]):
+                    self._error(f"{section}[{index}] ({entry['Comment']}): Find and Replace sizes differ")
+                # Booter.Patch has no Base
+                if not entry["Find"] and not entry.get("Base"):
+                    self._error(f"{section}[{index}] ({entry['Comment']}): Neither Find nor Base set")
+                if entry["Mask"] and len(entry["Mask"]) != len(entry["Find"]):
+                    self._error(f"{section}[{index}] ({entry['Comment']}): Mask and Find sizes differ")
+                if entry["ReplaceMask"] and len(entry["ReplaceMask"]) != len(entry["Replace"]):
+                    self._error(f"{section}[{index}] ({entry['Comment']}): ReplaceMask and Replace sizes differ")
+                if "Identifier" in entry and not entry["Identifier"]:
+                    self._error(f"{section}[{index}] ({entry['Comment']}): Missing Identifier")
+
+        for section in ["Booter.Patch", "Kernel.Add", "Kernel.Block", "Kernel.Force", "Kernel.Patch"]:
+            for index, entry in self._enabled(section):
+                if entry["Arch"] not in _SUPPORTED_ARCHS:
+                    self._error(f"{section}[{index}]->Arch: Unsupported value '{entry['Arch']}'")
+                for key in ["MinKernel", "MaxKernel"]:
+                    if key in entry and not _KERNEL_VERSION.match(entry[key]):
+                        self._error(f"{section}[{index}]->{key}: Invalid kernel version '{entry[key]}'")
+
+        for index, entry in self._enabled("Kernel.Block"):
+            if entry["Strategy"] not in _SUPPORTED_STRATEGIES:
+                self._error(f"Kernel.Block[{index}]->Strategy: Unsupported value '{entry['Strategy']}'")
+
+
+    @staticmethod
+    def _kernel_range(entry: dict) -> tuple:
+        """
+        Kernel versions an entry applies to, unset bounds are unlimited
+        """
+
+        def _parse(version: str, default: tuple) -> tuple:
+            if not version or not _KERNEL_VERSION.match(version):
+                return default
+            return tuple(int(part) for part in (version.split(".") + ["0", "0"])[:3])
+
+        return (_parse(entry["MinKernel"], (0, 0, 0)), _parse(entry["MaxKernel"], (999, 999, 999)))
+
+
+    @staticmethod
+    def _kext_info(plist_path: Path) -> tuple:
+        """
+        Identifier, executable and libraries of a kext
+
+        Returns:
+            tuple: (CFBundleIdentifier, CFBundleExecutable, OSBundleLibraries identifiers), None if unreadable
+        """
+
+        try:
+            stat = os.stat(plist_path)
+        except OSError:
+            return None
+
+        key = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if key not in _KEXT_INFO:
+            try:
+                info = plistlib.loads(Path(plist_path).read_bytes())
+            except Exception:
+                return None
+            _KEXT_INFO[key] = (info.get("CFBundleIdentifier", ""), info.get("CFBundleExecutable"), list(info.get("OSBundleLibraries", {})))
+        return _KEXT_INFO[key]
+
+
+    def _validate_kexts(self) -> None:
+        """
+        Check Kernel.Add entries against their kexts, and that dependencies load first
+        """
+
+        kexts_folder = Path(self.constants.oc_folder) / "Kexts"
+        enabled = self._enabled("Kernel.Add")
+
+        listed = {entry["BundlePath"] for entry in self._get("Kernel.Add")}
+        seen = {}
+        providers = {}  # Bundle identifier -> [(index, kernel range)]
+        kexts = []
+        for index, entry in enabled:
+            if not entry["BundlePath"].endswith(".kext"):
+                self._error(f"Kernel.Add[{index}]->BundlePath: Not a kext '{entry['BundlePath']}'")
+            if not entry["PlistPath"]:
+                self._error(f"Kernel.Add[{index}]->PlistPath: Missing for {entry['BundlePath']}")
+            if entry["BundlePath"] in seen:
+                self._error(f"Kernel.Add[{index}]->BundlePath: '{entry['BundlePath']}' is duplicated")
+            seen[entry["BundlePath"]] = index
+
+            # Plugins of a listed kext load with it, the parent must be injected first
+            # Parents only shipped as a container for their plugins (ie. USB1.1-Injector.kext) have no entry
+            if "/Contents/PlugIns/" in entry["BundlePath"]:
+                parent = entry["BundlePath"].split("/Contents/PlugIns/")[0]
+                if parent in listed and parent not in seen:
+                    self._error(f"Kernel.Add[{index}]: {entry['BundlePath']} is loaded before its parent {parent}, or its parent is not enabled")
+
+            info = self._kext_info(kexts_folder / entry["BundlePath"] / entry["PlistPath"])
+            if info is None:
+                # Reported with file references
+                continue
+
+            identifier, executable, libraries = info
+            expected_executable = f"Contents/MacOS/{executable}" if executable else ""
+            if entry["ExecutablePath"] != expected_executable:
+                self._error(f"Kernel.Add[{index}]->ExecutablePath: {entry['BundlePath']} expects '{expected_executable}', found '{entry['ExecutablePath']}'")
+
+            providers.setdefault(identifier, []).append((index, self._kernel_range(entry)))
+            kexts.append((index, entry, libraries))
+
+        for index, entry, libraries in kexts:
+            minimum, maximum = self._kernel_range(entry)
+            for library in libraries:
+                # Only libraries shipped in the EFI can be checked, the rest come from macOS
+                candidates = [
+                    provider for provider, (provider_min, provider_max) in providers.get(library, [])
+                    if provider != index and provider_min <= maximum and minimum <= provider_max
+                ]
+                if not candidates:
+                    if not library.startswith("com.apple."):
+                        self._error(f"Kernel.Add[{index}]: {entry['BundlePath']} depends on {library}, which is not enabled")
+                    continue
+                if min(candidates) > index:
+                    self._error(f"Kernel.Add[{index}]: {entry['BundlePath']} is loaded before its dependency {library} (Kernel.Add[{min(candidates)}])")
+
+
+    def _validate_files(self) -> None:
+        """
+        Check files referenced by enabled entries exist in the EFI
+        """
+
+        oc_folder = Path(self.constants.oc_folder)
+
+        for section, folder in [("ACPI.Add", "ACPI"), ("UEFI.Drivers", "Drivers"), ("Misc.Tools", "Tools")]:
+            for index, entry in self._enabled(section):
+                if not (oc_folder / folder / entry["Path"]).exists():
+                    self._error(f"{section}[{index}]->Path: Missing {folder}/{entry['Path']}")
+
+        for index, entry in self._enabled("Kernel.Add"):
+            kext_path = oc_folder / "Kexts" / entry["BundlePath"]
+            if not kext_path.exists():
+                self._error(f"Kernel.Add[{index}]->BundlePath: Missing Kexts/{entry['BundlePath']}")
+                continue
+            for key in ["ExecutablePath", "PlistPath"]:
+                if entry[key] and not (kext_path / entry[key]).exists():
+                    self._error(f"Kernel.Add[{index}]->{key}: Missing Kexts/{entry['BundlePath']}/{entry[key]}")
@@ -47,6 +47,42 @@ sucatalog: Python module for querying Apple's Software Update Catalog, supportin
     }
 ]
 
+### Parse Software Update Catalog - Cached
+
+`CatalogProducts.from_url()` fetches the catalog itself and persists parsed products, keyed by the catalog's ETag and each product's PostDate. An unchanged catalog is listed without parsing it or fetching product metadata.
+
+>>> import sucatalog
+
+>>> products = sucatalog.CatalogProducts.from_url(sucatalog.CatalogURL().url).products
+
+### Parse Software Update Catalog - Streaming
+
+`CatalogURL.install_assistants` parses the catalog as it downloads, keeping only InstallAssistant products. `CatalogReader` can be used directly with any iterable of bytes.
+
+>>> import sucatalog
+
+>>> catalog = sucatalog.CatalogURL().install_assistants
+>>> products = sucatalog.CatalogProducts(catalog).products
+
+>>> for product_id, product in sucatalog.CatalogReader().iter_products(response.iter_content(1024 * 1024)):
+...     print(product_id)
+
+### Installer index
+
+`InstallerIndex` merges CatalogProducts and AppleDBProducts listings, deduplicated by build, for fast installer queries. Snapshots can be shipped to offline machines.
+
+>>> import sucatalog
+
+>>> index = sucatalog.InstallerIndex()
+>>> index.add_catalog_products(sucatalog.CatalogProducts.from_url().products)
+>>> index.add_appledb_products(sucatalog.AppleDBProducts(constants).products)
+
+>>> index.query(xnu_major=23, min_version="14.4", beta=False, available=True)
+>>> index.query(latest=True)
+
+>>> snapshot = index.snapshot()
+>>> index = sucatalog.InstallerIndex.from_snapshot(snapshot)
+
 ### Parse Software Update Catalog - All products
 
 By default, `CatalogProducts` will only return InstallAssistants. To get all products, set `install_assistants_only=False`.
@@ -109,4 +145,6 @@ By default, `CatalogProducts` will only return InstallAssistants. To get all pro
 from .url       import CatalogURL
 from .constants import CatalogVersion, SeedType
 from .products  import CatalogProducts
-from .products_appledb import AppleDBProducts
\ No newline at end of file
+from .products_appledb import AppleDBProducts
+from .catalog_reader   import CatalogReader
+from .installer_index  import InstallerIndex
\ No newline at end of file
@@ -0,0 +1,164 @@
+"""
+catalog_reader.py: Incremental Software Update Catalog reader
+
+plistlib.loads() builds the entire merged catalog (tens of MB of XML, hundreds of
+thousands of nodes) before CatalogProducts discards nearly all of it. CatalogReader
+instead reads the catalog as it arrives, splitting it into one product at a time
+on <dict> boundaries, and only hands products worth keeping to plistlib. With
+install_assistants_only, products without InstallAssistantPackageIdentifiers.SharedSupport
+are skipped without being parsed.
+
+Usage:
+    >>> reader = CatalogReader()
+    >>> for product_id, product in reader.iter_products(response.iter_content(1024 * 1024)):
+    ...     print(product_id, product["PostDate"])
+
+    >>> # Same shape as plistlib.loads(), limited to InstallAssistant products
+    >>> catalog = CatalogReader().parse(response.iter_content(1024 * 1024))
+    >>> catalog["Products"]
+"""
+
+import re
+import plistlib
+
+from typing import Iterable, Iterator, Union
+from xml.sax.saxutils import unescape
+
+
+READ_SIZE: int = 1024 * 1024  # Bytes consumed at a time when reading from memory
+
+_PRODUCTS_START: re.Pattern = re.compile(rb"<key>Products</key>\s*<dict>")
+_PRODUCT_START:  re.Pattern = re.compile(rb"\s*(?:<key>([^<]*)</key>\s*(<dict/>|<dict>)|(</dict>))")
+_DICT_TAG:       re.Pattern = re.compile(rb"<dict>|</dict>|<dict/>")
+
+_PLIST_HEADER: bytes = b'<?xml version="1.0" encoding="UTF-8"?><plist version="1.0">'
+_PLIST_FOOTER: bytes = b"</plist>"
+
+
+class CatalogReader:
+    """
+    Streaming reader for Software Update Catalog plists
+
+    Only the current, incomplete product is buffered, so memory use doesn't grow with the catalog
+
+    Parameters:
+        install_assistants_only (bool): Only yield products with InstallAssistantPackageIdentifiers.SharedSupport
+    """
+
+    def __init__(self, install_assistants_only: bool = True) -> None:
+        self.ia_only: bool = install_assistants_only
+
+        self.total_products: int = 0  # Products seen, including those filtered out
+
+
+    def iter_products(self, chunks: Union[Iterable[bytes], bytes]) -> Iterator[tuple]:
+        """
+        Yield (product ID, product dict) as each product is read
+
+        Parameters:
+            chunks: Iterable of catalog bytes (ie. response.iter_content()), or the whole catalog
+
+        Returns:
+            Iterator of (str, dict) tuples, products are in plistlib.loads() form
+        """
+
+        if isinstance(chunks, (bytes, bytearray, memoryview)):
+            data = memoryview(chunks)
+            chunks = (data[offset:offset + READ_SIZE] for offset in range(0, len(data), READ_SIZE))
+
+        buffer = b""
+        in_products = False
+
+        for chunk in chunks:
+            buffer += bytes(chunk)
+
+            if in_products is False:
+                match = _PRODUCTS_START.search(buffer)
+                if match is None:
+                    # Keep enough to match the key across chunk boundaries
+                    buffer = buffer[-256:]
+                    continue
+                in_products = True
+                buffer = buffer[match.end():]
+
+            position = 0
+            while True:
+                entry = _PRODUCT_START.match(buffer, position)
+                if entry is None:
+                    break
+                if entry.group(3):
+                    # End of Products
+                    return
+
+                end = entry.end() if entry.group(2) == b"<dict/>" else self._dict_end(buffer, entry.end())
+                if end is None:
+                    # Product continues in the next chunk
+                    break
+
+                self.total_products += 1
+                product = self._load(entry.group(1), buffer[entry.start(2):end])
+                if product is not None:
+                    yield product
+
+                position = end
+
+            buffer = buffer[position:]
+
+        if in_products is False:
+            raise ValueError("Catalog has no Products")
+        raise ValueError("Catalog ended before Products was complete")
+
+
+    def parse(self, chunks: Union[Iterable[bytes], bytes]) -> dict:
+        """
+        Parse a catalog into plistlib.loads()'s shape, limited to the products kept
+
+        Parameters:
+            chunks: Iterable of catalog bytes, or the whole catalog
+
+        Returns:
+            dict: Catalog with a 'Products' dictionary
+        """
+
+        return {"Products": dict(self.iter_products(chunks))}
+
+
+    @staticmethod
+    def _dict_end(buffer: bytes, start: int) -> int:
+        """
+        Find the end of a <dict> whose opening tag ends at 'start'
+
+        Returns:
+            int: Offset after the matching </dict>, None if it isn't in the buffer yet
+        """
+
+        depth = 1
+        for tag in _DICT_TAG.finditer(buffer, start):
+            if tag.group() == b"<dict>":
+                depth += 1
+            elif tag.group() == b"</dict>":
+                depth -= 1
+                if depth == 0:
+                    return tag.end()
+        return None
+
+
+    def _load(self, product_id: bytes, fragment: bytes) -> tuple:
+        """
+        Parse a single product, if it's kept
+
+        Returns:
+            tuple: (product ID, product dict), None if filtered out
+        """
+
+        if self.ia_only and b"SharedSupport" not in fragment:
+            return None
+
+        product = plistlib.loads(_PLIST_HEADER + fragment + _PLIST_FOOTER)
+        if self.ia_only:
+            try:
+                product["ExtendedMetaInfo"]["InstallAssistantPackageIdentifiers"]["SharedSupport"]
+            except (KeyError, TypeError):
+                return None
+
+        return unescape(product_id.decode()), product
@@ -0,0 +1,308 @@
+"""
+installer_index.py: Merged index of macOS installers from all sources
+
+Ingests CatalogProducts and AppleDBProducts listings, deduplicating by build, and
+answers installer-picker queries from per-XNU major views sorted by version.
+
+Records share AppleDBProducts' product shape, with 'InstallAssistant' holding every
+known download link, alongside:
+    'Catalog' (SeedType): Seed the installer was published in, None if only known to AppleDB
+    'Sources' (list):     Sources listing the installer ("Catalog", "AppleDB")
+
+Usage:
+    >>> index = InstallerIndex()
+    >>> index.add_catalog_products(CatalogProducts.from_url().products)
+    >>> index.add_appledb_products(AppleDBProducts(constants).products)
+
+    >>> index.query(xnu_major=os_data.sonoma, min_version="14.4", beta=False, available=True)
+    >>> index.query(latest=True)
+
+    >>> # Offline machines
+    >>> Path("installers.plist").write_bytes(index.snapshot())
+    >>> index = InstallerIndex.from_snapshot(Path("installers.plist").read_bytes())
+"""
+
+import bisect
+import datetime
+import plistlib
+
+import packaging.version
+
+from .constants import SeedType
+
+from ..support import cache_handler
+
+
+INSTALLER_INDEX_VERSION: int = 1  # Bump when the snapshot format changes
+
+SOURCE_CATALOG: str = "Catalog"
+SOURCE_APPLEDB: str = "AppleDB"
+
+_BETA_SEEDS: list = [SeedType.CustomerSeed, SeedType.DeveloperSeed, SeedType.PublicSeed]
+
+
+class InstallerIndex:
+    """
+    Deduplicated, queryable index of macOS installers
+
+    When a build is listed more than once, the first listing's details are kept (Apple's
+    catalog is preferred when ingested first), and download links and checksums are merged
+
+    Parameters:
+        link_cache (LinkCache): Link validation results for availability queries, defaults to the shared cache
+    """
+
+    def __init__(self, link_cache: cache_handler.LinkCache = None) -> None:
+        self._link_cache: cache_handler.LinkCache = link_cache
+        self._records:  dict = {}    # Build -> record, in ingestion order
+        self._versions: dict = {}    # Build -> parsed version
+        self._views:    dict = None  # XNU major (None for all) -> (records, parsed versions) sorted by version, built on first query
+
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+    @staticmethod
+    def _parse_version(version: str) -> packaging.version.Version:
+        try:
+            return packaging.version.parse(version)
+        except (packaging.version.InvalidVersion, TypeError):
+            return packaging.version.parse("0.0.0")
+
+
+    @staticmethod
+    def _normalize_date(date: datetime.datetime) -> datetime.datetime:
+        # AppleDB dates are timezone-aware, catalog dates are naive UTC
+        if date is not None and date.tzinfo is not None:
+            return date.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        return date
+
+
+    def add_catalog_products(self, products: list) -> None:
+        """
+        Ingest CatalogProducts' InstallAssistant products
+
+        Parameters:
+            products (list): CatalogProducts.products or latest_products
+        """
+
+        for product in products:
+            if not product.get("Build") or "InstallAssistant" not in product:
+                continue
+
+            self._add({
+                "Title":      product["Title"],
+                "Build":      product["Build"],
+                "Version":    product["Version"],
+                "RawVersion": product["Version"],
+                "Beta":       product["Catalog"] in _BETA_SEEDS,
+                "Catalog":    product["Catalog"],
+                "PostDate":   self._normalize_date(product["PostDate"]),
+                "ProductID":  product["ProductID"],
+                "InstallAssistant": {
+                    "XNUMajor":          int(product["Build"][:2]),
+                    "URL":               product["InstallAssistant"]["URL"],
+                    "Size":              product["InstallAssistant"]["Size"],
+                    "IntegrityDataURL":  product["InstallAssistant"].get("IntegrityDataURL"),
+                    "IntegrityDataSize": product["InstallAssistant"].get("IntegrityDataSize"),
+                    "Checksum":          None,
+                    "Mirrors":           [product["InstallAssistant"]["URL"]],
+                },
+                "Sources": [SOURCE_CATALOG],
+            })
+
+
+    def add_appledb_products(self, products: list) -> None:
+        """
+        Ingest AppleDBProducts' products
+
+        Parameters:
+            products (list): AppleDBProducts.products or latest_products
+        """
+
+        for product in products:
+            if not product.get("Build") or "URL" not in product["InstallAssistant"]:
+                continue
+
+            self._add({
+                "Title":      product["Title"],
+                "Build":      product["Build"],
+                "Version":    product["Version"],
+                "RawVersion": product["RawVersion"],
+                "Beta":       bool(product["Beta"]),
+                "Catalog":    None,
+                "PostDate":   self._normalize_date(product["PostDate"]),
+                "ProductID":  None,
+                "InstallAssistant": {
+                    "XNUMajor":          product["InstallAssistant"]["XNUMajor"],
+                    "URL":               product["InstallAssistant"]["URL"],
+                    "Size":              product["InstallAssistant"]["Size"],
+                    "IntegrityDataURL":  None,
+                    "IntegrityDataSize": None,
+                    "Checksum":          product["InstallAssistant"].get("Checksum"),
+                    "Mirrors":           list(product["InstallAssistant"].get("Mirrors") or [product["InstallAssistant"]["URL"]]),
+                },
+                "Sources": [SOURCE_APPLEDB],
+            })
+
+
+    def _add(self, record: dict) -> None:
+        self._views = None
+
+        existing = self._records.get(record["Build"])
+        if existing is None:
+            self._records[record["Build"]] = record
+            self._versions[record["Build"]] = self._parse_version(record["RawVersion"])
+            return
+
+        # Same build from another listing, fill in what the first listing lacked
+        for key in ["Title", "Catalog", "PostDate", "ProductID"]:
+            if existing[key] is None:
+                existing[key] = record[key]
+        for key, value in record["InstallAssistant"].items():
+            if key == "Mirrors":
+                existing["InstallAssistant"]["Mirrors"] += [url for url in value if url not in existing["InstallAssistant"]["Mirrors"]]
+            elif existing["InstallAssistant"].get(key) is None:
+                existing["InstallAssistant"][key] = value
+        existing["Sources"] += [source for source in record["Sources"] if source not in existing["Sources"]]
+        # Released if any listing says so (ie. an RC later published as final)
+        existing["Beta"] = existing["Beta"] and record["Beta"]
+
+
+    def _build_views(self) -> None:
+        def _sort_key(record: dict) -> tuple:
+            return (self._versions[record["Build"]], record["Build"])
+
+        self._views = {None: ([], [])}
+        for record in sorted(self._records.values(), key=_sort_key):
+            for key in [None, record["InstallAssistant"]["XNUMajor"]]:
+                records, versions = self._views.setdefault(key, ([], []))
+                records.append(record)
+                versions.append(self._versions[record["Build"]])
+
+
+    def _is_available(self, record: dict) -> bool:
+        if self._link_cache is None:
+            self._link_cache = cache_handler.LinkCache()
+        return any(self._link_cache.lookup(url) is not False for url in record["InstallAssistant"]["Mirrors"])
+
+
+    def get(self, build: str) -> dict:
+        """
+        Look up an installer by build
+
+        Returns:
+            dict: Installer record, None if not indexed
+        """
+
+        return self._records.get(build)
+
+
+    def query(self,
+              xnu_major:   int      = None,
+              min_version: str      = None,
+              max_version: str      = None,
+              seed:        SeedType = None,
+              beta:        bool     = None,
+              min_size:    int      = None,
+              max_size:    int      = None,
+              available:   bool     = None,
+              latest:      bool     = False
+             ) -> list:
+        """
+        Find installers, sorted by version
+
+        Parameters:
+            xnu_major   (int):      Only this XNU major (ie. os_data.sonoma)
+            min_version (str):      Minimum version, inclusive
+            max_version (str):      Maximum version, inclusive
+            seed        (SeedType): Only installers published in this catalog seed
+            beta        (bool):     Only betas (True) or releases (False)
+            min_size    (int):      Minimum installer size in bytes
+            max_size    (int):      Maximum installer size in bytes
+            available   (bool):     Only installers with (True) or without (False) a link not known to be dead
+            latest      (bool):     Only the newest matching installer per XNU major
+
+        Returns:
+            list: Installer records
+        """
+
+        if self._views is None:
+            self._build_views()
+
+        records, versions = self._views.get(xnu_major, ([], []))
+
+        if min_version is not None or max_version is not None:
+            start = bisect.bisect_left(versions, self._parse_version(min_version)) if min_version is not None else 0
+            end = bisect.bisect_right(versions, self._parse_version(max_version)) if max_version is not None else len(records)
+            records = records[start:end]
+
+        results = [
+            record for record in records
+            if all([
+                seed      is None or record["Catalog"] == seed,
+                beta      is None or record["Beta"] == beta,
+                min_size  is None or (record["InstallAssistant"]["Size"] or 0) >= min_size,
+                max_size  is None or (record["InstallAssistant"]["Size"] or 0) <= max_size,
+                available is None or self._is_available(record) == available,
+            ])
+        ]
+
+        if latest:
+            # Sorted by version, so the last record per major is the newest
+            newest = {record["InstallAssistant"]["XNUMajor"]: record for record in results}
+            results = [record for record in results if newest[record["InstallAssistant"]["XNUMajor"]] is record]
+
+        return results
+
+
+    def snapshot(self) -> bytes:
+        """
+        Serialise the index as a binary plist
+
+        Returns:
+            bytes: Snapshot, loadable with InstallerIndex.from_snapshot()
+        """
+
+        def _encode(value):
+            # plist has no null, drop unset keys
+            if isinstance(value, dict):
+                return {key: _encode(item) for key, item in value.items() if item is not None}
+            if isinstance(value, list):
+                return [_encode(item) for item in value]
+            return value
+
+        return plistlib.dumps({
+            "Version":    INSTALLER_INDEX_VERSION,
+            "Created":    datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None),
+            "Installers": [_encode(record) for record in self._records.values()],
+        }, fmt=plistlib.FMT_BINARY)
+
+
+    @classmethod
+    def from_snapshot(cls, data: bytes) -> "InstallerIndex":
+        """
+        Load an index from InstallerIndex.snapshot()
+
+        Parameters:
+            data (bytes): Snapshot
+
+        Returns:
+            InstallerIndex: Index, empty if the snapshot is from an incompatible version
+        """
+
+        index = cls()
+
+        snapshot = plistlib.loads(data)
+        if snapshot.get("Version") != INSTALLER_INDEX_VERSION:
+            return index
+
+        for record in snapshot["Installers"]:
+            record = {"Title": None, "Catalog": None, "PostDate": None, "ProductID": None, **record}
+            record["InstallAssistant"] = {"IntegrityDataURL": None, "IntegrityDataSize": None, "Checksum": None, **record["InstallAssistant"]}
+            if record["Catalog"] is not None:
+                record["Catalog"] = SeedType(record["Catalog"])
+            index._add(record)
+
+        return index
@@ -3,6 +3,9 @@ products.py: Parse products from Software Update Catalog
 """
 
 import re
+import asyncio
+import hashlib
+import logging
 import plistlib
 
 import packaging.version
@@ -11,10 +14,12 @@ import xml.etree.ElementTree as ET
 from pathlib   import Path
 from functools import cached_property
 
-from .url       import CatalogURL
+from .url       import CatalogURL, CATALOG_CACHE_TTL
 from .constants import CatalogVersion, SeedType
+from .products_cache import ProductsCache
+from .catalog_reader import CatalogReader
 
-from ..support import network_handler
+from ..support import network_handler, async_network_handler
 
 
 class CatalogProducts:
@@ -24,19 +29,80 @@ class CatalogProducts:
         install_assistants_only       (bool): Only list InstallAssistant products
         only_vmm_install_assistants   (bool): Only list VMM-x86_64-compatible InstallAssistant products
         max_install_assistant_version (CatalogVersion): Maximum InstallAssistant version to list
+        catalog_url                   (str):  Catalog's URL, enables the persistent products cache
+        catalog_validator             (str):  Catalog's ETag (or Last-Modified), enables the persistent products cache
+
+    Prefer CatalogProducts.from_url(), which fetches the catalog and only parses it
+    if the cached products are stale
     """
     def __init__(self,
                  catalog: dict,
                  install_assistants_only: bool = True,
                  only_vmm_install_assistants: bool = True,
-                 max_install_assistant_version: CatalogVersion = CatalogVersion.SEQUOIA
+                 max_install_assistant_version: CatalogVersion = CatalogVersion.SEQUOIA,
+                 catalog_url: str = None,
+                 catalog_validator: str = None
                 ) -> None:
-        self.catalog:             dict = catalog
+        self._catalog:            dict = catalog
+        self._catalog_data:      bytes = None  # Raw catalog, parsed on first use
         self.ia_only:             bool = install_assistants_only
         self.vmm_only:            bool = only_vmm_install_assistants
         self.max_ia_version: packaging = packaging.version.parse(f"{max_install_assistant_version.value}.99.99")
         self.max_ia_catalog: CatalogVersion = max_install_assistant_version
 
+        self.catalog_validator: str = catalog_validator
+        self._cache: ProductsCache = None
+        if catalog_url:
+            self._cache = ProductsCache(catalog_url, {
+                "InstallAssistantsOnly":      install_assistants_only,
+                "OnlyVMMInstallAssistants":   only_vmm_install_assistants,
+                "MaxInstallAssistantVersion": max_install_assistant_version.value,
+            })
+
+        self._excluded:     dict = {}     # Product ID -> PostDate, deliberately left out of the listing
+        self._fetch_failed: bool = False  # Listing is incomplete, don't cache it against the catalog's validator
+
+
+    @classmethod
+    def from_url(cls, catalog_url: str = None, **kwargs) -> "CatalogProducts":
+        """
+        Fetch a catalog and build its CatalogProducts, backed by the persistent products cache
+
+        An unchanged catalog (same ETag) is listed from the cache without parsing it or
+        fetching any product metadata, including offline with a previously cached catalog
+
+        Parameters:
+            catalog_url (str): Catalog URL, defaults to CatalogURL().url
+            **kwargs: CatalogProducts arguments
+
+        Returns:
+            CatalogProducts: Products object, None if the catalog couldn't be fetched
+        """
+
+        catalog_url = catalog_url or CatalogURL().url
+        response = network_handler.NetworkUtilities().get(catalog_url, cache_ttl=CATALOG_CACHE_TTL)
+        if response.status_code != 200 or not response.content:
+            logging.error(f"Failed to fetch catalog: {catalog_url}")
+            return None
+
+        validator = response.headers.get("ETag") or response.headers.get("Last-Modified") or hashlib.sha256(response.content).hexdigest()
+
+        products_obj = cls(None, catalog_url=catalog_url, catalog_validator=validator, **kwargs)
+        products_obj._catalog_data = response.content
+        return products_obj
+
+
+    @property
+    def catalog(self) -> dict:
+        if self._catalog is None and self._catalog_data is not None:
+            if self.ia_only:
+                # Skip parsing the (vast majority of) products that would be discarded
+                self._catalog = CatalogReader().parse(self._catalog_data)
+            else:
+                self._catalog = plistlib.loads(self._catalog_data)
+            self._catalog_data = None
+        return self._catalog
+
 
     def _legacy_parse_info_plist(self, data: dict) -> dict:
         """
@@ -189,6 +255,9 @@ class CatalogProducts:
         List only the latest installers per macOS version
 
         macOS versions capped at n-3 (n being the latest macOS version)
+
+        Products are indexed per supported version in a single pass, parsing each
+        version once, so selection stays linear in the number of products
         """
 
         supported_versions = []
@@ -209,210 +278,248 @@ class CatalogProducts:
         # Invert the list
         supported_versions = supported_versions[::-1]
 
-        # Create duplicate product list
-        products_copy = products.copy()
+        # Index installers per supported version: [(position, parsed version, is beta), ...]
+        _no_version = packaging.version.parse("0.0.0")
+        installer_index = {version: [] for version in supported_versions}
+        latest_stable   = {version: _no_version for version in supported_versions}
+        removed = set()
 
-        # Remove all but the newest version
-        for version in supported_versions:
-            _latest_stable_version = packaging.version.parse("0.0.0")
+        for position, installer in enumerate(products):
+            if installer["Version"] is None:
+                continue
 
-            # First, determine largest stable version
-            for installer in products:
-                if installer["Version"] is None:
-                    continue
-                if not installer["Version"].startswith(version.value):
-                    continue
-                if installer["Catalog"] in [SeedType.CustomerSeed, SeedType.DeveloperSeed, SeedType.PublicSeed]:
-                    continue
-                try:
-                    if packaging.version.parse(installer["Version"]) > _latest_stable_version:
-                        _latest_stable_version = packaging.version.parse(installer["Version"])
-                except packaging.version.InvalidVersion:
-                    pass
+            # Remove EOL versions (older than n-3)
+            if installer["Version"].split(".")[0] < supported_versions[0].value:
+                removed.add(position)
 
-            # Next, remove all installers that are older than the largest stable version
-            for installer in products:
-                if installer["Version"] is None:
-                    continue
-                if not installer["Version"].startswith(version.value):
-                    continue
-                try:
-                    if packaging.version.parse(installer["Version"]) < _latest_stable_version:
-                        if installer in products_copy:
-                            products_copy.pop(products_copy.index(installer))
-                except packaging.version.InvalidVersion:
-                    pass
+            matches = [version for version in supported_versions if installer["Version"].startswith(version.value)]
+            if not matches:
+                continue
+
+            try:
+                parsed_version = packaging.version.parse(installer["Version"])
+            except packaging.version.InvalidVersion:
+                parsed_version = None
+            is_beta = installer["Catalog"] in [SeedType.CustomerSeed, SeedType.DeveloperSeed, SeedType.PublicSeed]
 
-                # If there is a largest stable version, remove all betas
+            for version in matches:
+                installer_index[version].append((position, parsed_version, is_beta))
+                if is_beta is False and parsed_version is not None and parsed_version > latest_stable[version]:
+                    latest_stable[version] = parsed_version
+
+        # Remove all but the newest version
+        for version, installers in installer_index.items():
+            if latest_stable[version] == _no_version:
+                continue
+            for position, parsed_version, is_beta in installers:
+                # Remove installers older than the largest stable version, and all betas
                 # This is to ensure that we only keep the latest stable version where it is available
                 # but ensure we have a beta if it is the only version available (ie. macOS X.0 betas)
-                if _latest_stable_version != packaging.version.parse("0.0.0"):
-                    if installer["Catalog"] in [SeedType.CustomerSeed, SeedType.DeveloperSeed, SeedType.PublicSeed]:
-                        if installer in products_copy:
-                            products_copy.pop(products_copy.index(installer))
+                if is_beta or (parsed_version is not None and parsed_version < latest_stable[version]):
+                    removed.add(position)
+
+        return [installer for position, installer in enumerate(products) if position not in removed]
+
 
+    async def _fetch(self, url: str) -> bytes:
+        """
+        Fetch product metadata over the shared async client
 
-        # Remove EOL versions (older than n-3)
-        for installer in products:
-            if installer["Version"].split(".")[0] < supported_versions[-4].value:
-                if installer in products_copy:
-                    products_copy.pop(products_copy.index(installer))
+        Returns:
+            bytes: Response body, None on error
+        """
 
-        return products_copy
+        response = await async_network_handler.AsyncNetworkUtilities().get(url)
+        if response.status_code is None:
+            # Async client doesn't honour system proxies, retry through requests
+            response = await asyncio.get_running_loop().run_in_executor(None, network_handler.NetworkUtilities().get, url)
+        if response.content is None:
+            self._fetch_failed = True
+        return response.content
 
 
-    @cached_property
-    def products(self) -> None:
+    async def _parse_product(self, product: str, entry: dict) -> dict:
         """
-        Returns a list of products from the sucatalog
+        Build a product's map, fetching its metadata
+
+        Parameters:
+            product (str):  Product ID
+            entry   (dict): Product's entry in the catalog
+
+        Returns:
+            dict: Product map, None if the product isn't listed
         """
 
-        catalog = self.catalog
+        # InstallAssistants.pkgs (macOS Installers) will have the following keys:
+        if self.ia_only:
+            if "ExtendedMetaInfo" not in entry:
+                return None
+            if "InstallAssistantPackageIdentifiers" not in entry["ExtendedMetaInfo"]:
+                return None
+            if "SharedSupport" not in entry["ExtendedMetaInfo"]["InstallAssistantPackageIdentifiers"]:
+                return None
 
-        _products = []
+        _product_map = {
+            "ProductID": product,
+            "PostDate":  entry["PostDate"],
+            "Title":     None,
+            "Build":     None,
+            "Version":   None,
+            "Catalog":   None,
+
+            # Optional keys if not InstallAssistant only:
+            # "Packages": None,
+
+            # Optional keys if InstallAssistant found:
+            # "InstallAssistant": {
+            #     "URL":       None,
+            #     "Size":      None,
+            #     "XNUMajor":  None,
+            #     "IntegrityDataURL":  None,
+            #     "IntegrityDataSize": None
+            # },
+        }
 
-        for product in catalog["Products"]:
+        # InstallAssistant logic
+        if "Packages" in entry:
+            # Add packages to product map if not InstallAssistant only
+            if self.ia_only is False:
+                _product_map["Packages"] = entry["Packages"]
+            for package in entry["Packages"]:
+                if "URL" in package:
+                    if Path(package["URL"]).name == "InstallAssistant.pkg":
+                        _product_map["InstallAssistant"] = {
+                            "URL":               package["URL"],
+                            "Size":              package["Size"],
+                            "IntegrityDataURL":  package["IntegrityDataURL"],
+                            "IntegrityDataSize": package["IntegrityDataSize"]
+                        }
+
+                    if Path(package["URL"]).name not in ["Info.plist", "com_apple_MobileAsset_MacSoftwareUpdate.plist"]:
+                        continue
+
+                    contents = await self._fetch(package["URL"])
+                    if contents is None:
+                        continue
 
-            # InstallAssistants.pkgs (macOS Installers) will have the following keys:
-            if self.ia_only:
-                if "ExtendedMetaInfo" not in catalog["Products"][product]:
-                    continue
-                if "InstallAssistantPackageIdentifiers" not in catalog["Products"][product]["ExtendedMetaInfo"]:
-                    continue
-                if "SharedSupport" not in catalog["Products"][product]["ExtendedMetaInfo"]["InstallAssistantPackageIdentifiers"]:
-                    continue
+                    try:
+                        plist_contents = plistlib.loads(contents)
+                    except plistlib.InvalidFileException:
+                        continue
 
-            _product_map = {
-                "ProductID": product,
-                "PostDate":  catalog["Products"][product]["PostDate"],
-                "Title":     None,
-                "Build":     None,
-                "Version":   None,
-                "Catalog":   None,
-
-                # Optional keys if not InstallAssistant only:
-                # "Packages": None,
-
-                # Optional keys if InstallAssistant found:
-                # "InstallAssistant": {
-                #     "URL":       None,
-                #     "Size":      None,
-                #     "XNUMajor":  None,
-                #     "IntegrityDataURL":  None,
-                #     "IntegrityDataSize": None
-                # },
-            }
+                    if plist_contents:
+                        if Path(package["URL"]).name == "Info.plist":
+                            result = self._legacy_parse_info_plist(plist_contents)
+                        else:
+                            result = self._parse_mobile_asset_plist(plist_contents)
 
-            # InstallAssistant logic
-            if "Packages" in catalog["Products"][product]:
-                # Add packages to product map if not InstallAssistant only
-                if self.ia_only is False:
-                    _product_map["Packages"] = catalog["Products"][product]["Packages"]
-                for package in catalog["Products"][product]["Packages"]:
-                    if "URL" in package:
-                        if Path(package["URL"]).name == "InstallAssistant.pkg":
-                            _product_map["InstallAssistant"] = {
-                                "URL":               package["URL"],
-                                "Size":              package["Size"],
-                                "IntegrityDataURL":  package["IntegrityDataURL"],
-                                "IntegrityDataSize": package["IntegrityDataSize"]
-                            }
-
-                        if Path(package["URL"]).name not in ["Info.plist", "com_apple_MobileAsset_MacSoftwareUpdate.plist"]:
-                            continue
-
-                        net_obj = network_handler.NetworkUtilities().get(package["URL"])
-                        if net_obj is None:
-                            continue
-
-                        contents = net_obj.content
-                        try:
-                            plist_contents = plistlib.loads(contents)
-                        except plistlib.InvalidFileException:
-                            continue
-
-                        if plist_contents:
-                            if Path(package["URL"]).name == "Info.plist":
-                                result = self._legacy_parse_info_plist(plist_contents)
-                            else:
-                                result = self._parse_mobile_asset_plist(plist_contents)
-
-                            if result == {"Missing VMM Support": True}:
-                                _product_map = {}
-                                break
-
-                            _product_map.update(result)
-
-            if _product_map == {}:
-                continue
+                        if result == {"Missing VMM Support": True}:
+                            self._excluded[product] = entry["PostDate"]
+                            return None
+
+                        _product_map.update(result)
+
+        if _product_map["Version"] is not None:
+            _product_map["Title"] = self._build_installer_name(_product_map["Version"], _product_map["Catalog"])
+
+        # Fall back to English distribution if no version is found
+        if _product_map["Version"] is None:
+            url = None
+            if "Distributions" in entry:
+                if "English" in entry["Distributions"]:
+                    url = entry["Distributions"]["English"]
+                elif "en" in entry["Distributions"]:
+                    url = entry["Distributions"]["en"]
+
+            if url is None:
+                return None
+
+            contents = await self._fetch(url)
+            if contents is None:
+                return None
 
-            if _product_map["Version"] is not None:
-                _product_map["Title"] = self._build_installer_name(_product_map["Version"], _product_map["Catalog"])
+            _product_map.update(self._parse_english_distributions(contents))
 
-            # Fall back to English distribution if no version is found
             if _product_map["Version"] is None:
-                url = None
-                if "Distributions" in catalog["Products"][product]:
-                    if "English" in catalog["Products"][product]["Distributions"]:
-                        url = catalog["Products"][product]["Distributions"]["English"]
-                    elif "en" in catalog["Products"][product]["Distributions"]:
-                        url = catalog["Products"][product]["Distributions"]["en"]
-
-                if url is None:
-                    continue
+                if "ServerMetadataURL" in entry:
+                    server_metadata_contents = await self._fetch(entry["ServerMetadataURL"])
+                    if server_metadata_contents is None:
+                        return None
 
-                net_obj = network_handler.NetworkUtilities().get(url)
-                if net_obj is None:
-                    continue
+                    server_metadata_plist = {}
+                    try:
+                        server_metadata_plist = plistlib.loads(server_metadata_contents)
+                    except plistlib.InvalidFileException:
+                        pass
 
-                contents = net_obj.content
+                    if "CFBundleShortVersionString" in server_metadata_plist:
+                        _product_map["Version"] = server_metadata_plist["CFBundleShortVersionString"]
 
-                _product_map.update(self._parse_english_distributions(contents))
 
-                if _product_map["Version"] is None:
-                    if "ServerMetadataURL" in catalog["Products"][product]:
-                        server_metadata_url = catalog["Products"][product]["ServerMetadataURL"]
+        if _product_map["Version"] is not None:
+            # Check if version is newer than the max version
+            if self.ia_only:
+                try:
+                    if packaging.version.parse(_product_map["Version"]) > self.max_ia_version:
+                        self._excluded[product] = entry["PostDate"]
+                        return None
+                except packaging.version.InvalidVersion:
+                    pass
 
-                        net_obj = network_handler.NetworkUtilities().get(server_metadata_url)
-                        if net_obj is None:
-                            continue
+        if _product_map["Build"] is not None:
+            if "InstallAssistant" in _product_map:
+                try:
+                    # Grab first 2 characters of build
+                    _product_map["InstallAssistant"]["XNUMajor"] = int(_product_map["Build"][:2])
+                except ValueError:
+                    pass
 
-                        server_metadata_contents = net_obj.content
+        # If version is still None, set to 0.0.0
+        if _product_map["Version"] is None:
+            _product_map["Version"] = "0.0.0"
 
-                        try:
-                            server_metadata_plist = plistlib.loads(server_metadata_contents)
-                        except plistlib.InvalidFileException:
-                            pass
+        return _product_map
 
-                        if "CFBundleShortVersionString" in server_metadata_plist:
-                            _product_map["Version"] = server_metadata_plist["CFBundleShortVersionString"]
 
+    @cached_property
+    def products(self) -> None:
+        """
+        Returns a list of products from the sucatalog
 
-            if _product_map["Version"] is not None:
-                # Check if version is newer than the max version
-                if self.ia_only:
-                    try:
-                        if packaging.version.parse(_product_map["Version"]) > self.max_ia_version:
-                            continue
-                    except packaging.version.InvalidVersion:
-                        pass
+        Product metadata is fetched concurrently, bounded by async_network_handler's
+        per-host connection limit, and assembled in catalog order
 
-            if _product_map["Build"] is not None:
-                if "InstallAssistant" in _product_map:
-                    try:
-                        # Grab first 2 characters of build
-                        _product_map["InstallAssistant"]["XNUMajor"] = int(_product_map["Build"][:2])
-                    except ValueError:
-                        pass
+        With the persistent products cache, only new or changed (PostDate) products are fetched
+        """
 
-            # If version is still None, set to 0.0.0
-            if _product_map["Version"] is None:
-                _product_map["Version"] = "0.0.0"
+        if self._cache:
+            _products = self._cache.catalog_products(self.catalog_validator)
+            if _products is not None:
+                logging.info(f"- Loaded {len(_products)} products from cache")
+                return _products
 
-            _products.append(_product_map)
+        catalog = self.catalog
+
+        async def _parse(product: str, entry: dict) -> dict:
+            if self._cache:
+                hit, result = self._cache.product(product, entry["PostDate"])
+                if hit:
+                    if result is None:
+                        self._excluded[product] = entry["PostDate"]
+                    return result
+            return await self._parse_product(product, entry)
+
+        async def _parse_products() -> list:
+            return await asyncio.gather(*[_parse(product, entry) for product, entry in catalog["Products"].items()])
+
+        _products = [product for product in async_network_handler.run(_parse_products()) if product is not None]
 
         _products = sorted(_products, key=lambda x: x["Version"])
 
+        if self._cache:
+            # Products that failed to fetch are retried next time, even if the catalog is unchanged
+            self._cache.store(None if self._fetch_failed else self.catalog_validator, _products, self._excluded)
+
         return _products
 
 
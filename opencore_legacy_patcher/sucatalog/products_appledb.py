@@ -2,6 +2,7 @@
 products.py: Parse products from Software Update Catalog
 """
 
+import asyncio
 import datetime
 import hashlib
 import logging
@@ -14,10 +15,12 @@ from functools import cached_property
 from opencore_legacy_patcher import constants
 from opencore_legacy_patcher.datasets.os_data import os_data
 
-from ..support import network_handler
+from ..support import network_handler, async_network_handler, cache_handler
 
 
 APPLEDB_API_URL = "https://api.appledb.dev/ios/macOS/main.json"
+APPLEDB_API_CACHE_TTL = 60 * 60  # Seconds before revalidating the cached AppleDB response
+LINK_VALIDATION_CONCURRENCY = 16  # Links probed at once
 
 
 class AppleDBProducts:
@@ -35,7 +38,7 @@ class AppleDBProducts:
         try:
             self.data = (
                 network_handler.NetworkUtilities()
-                .get(APPLEDB_API_URL, headers={"User-Agent": f"OCLP/{self.constants.patcher_version}"})
+                .get(APPLEDB_API_URL, headers={"User-Agent": f"OCLP/{self.constants.patcher_version}"}, cache_ttl=APPLEDB_API_CACHE_TTL)
                 .json()
             )
         except Exception as e:
@@ -61,14 +64,56 @@ class AppleDBProducts:
         macOS versions capped at n-3 (n being the latest macOS version)
         """
 
-        supported_versions = {
-            os_data(i): [v for v in products if v["InstallAssistant"]["XNUMajor"] == i] for i in range(self.max_ia - 3, self.max_ia + 1)
-        }
+        # Single pass, keeping the first installer with the highest (stable, version) per XNU major
+        latest = {}
+        for product in products:
+            xnu_major = product["InstallAssistant"]["XNUMajor"]
+            if not self.max_ia - 3 <= xnu_major <= self.max_ia:
+                continue
+            key = (not product["Beta"], packaging.version.parse(product["RawVersion"]))
+            if xnu_major not in latest or key > latest[xnu_major][0]:
+                latest[xnu_major] = (key, product)
+
+        return [latest[xnu_major][1] for xnu_major in range(self.max_ia - 3, self.max_ia + 1) if xnu_major in latest]
+
+    async def _first_alive_links(self, candidates: list, link_cache: cache_handler.LinkCache) -> list:
+        """
+        Find each firmware's first live link, validating concurrently
 
-        for versions in supported_versions.values():
-            versions.sort(key=lambda v: (not v["Beta"], packaging.version.parse(v["RawVersion"])), reverse=True)
+        A firmware's links are queued together, but its remaining probes are cancelled
+        as soon as its most preferred live link is known. Results are cached on disk.
+
+        Parameters:
+            candidates (list): Per firmware, (source, link) pairs in order of preference
+            link_cache (LinkCache): Cached validation results
+
+        Returns:
+            list: Per firmware, index of the first live candidate, None if all are dead
+        """
 
-        return [next(iter(versions)) for versions in supported_versions.values() if versions]
+        semaphore = asyncio.Semaphore(LINK_VALIDATION_CONCURRENCY)
+
+        async def _validate(url: str) -> bool:
+            valid = link_cache.lookup(url)
+            if valid is not None:
+                return valid
+            async with semaphore:
+                valid = await async_network_handler.AsyncNetworkUtilities(url).validate_link()
+            link_cache.record(url, valid)
+            return valid
+
+        async def _first_alive(links: list) -> int:
+            tasks = [asyncio.ensure_future(_validate(link["url"])) for _, link in links]
+            try:
+                for index, task in enumerate(tasks):
+                    if await task:
+                        return index
+                return None
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+        return await asyncio.gather(*[_first_alive(links) for links in candidates])
 
     @cached_property
     def products(self) -> None:
@@ -77,6 +122,7 @@ class AppleDBProducts:
         """
 
         _products = []
+        _pending = []  # (details, candidate links) awaiting link validation
 
         for firmware in self.data:
             if firmware.get("internal") or firmware.get("sdk") or firmware.get("rsr"):
@@ -111,35 +157,36 @@ class AppleDBProducts:
             if xnu_major > self.max_ia:
                 continue
 
-            for source in firmware.get("sources", []):
-                if source["type"] != "installassistant":
-                    continue
-
-                if "MacPro7,1" not in source["deviceMap"]:
-                    continue
-
-                for link in source["links"]:
-                    if not link["active"]:
-                        continue
-
-                    if not network_handler.NetworkUtilities(link["url"]).validate_link():
-                        continue
+            # Active links of applicable InstallAssistants, in order of preference
+            candidates = [
+                (source, link)
+                for source in firmware.get("sources", [])
+                if source["type"] == "installassistant" and "MacPro7,1" in source["deviceMap"]
+                for link in source["links"]
+                if link["active"]
+            ]
+            if not candidates:
+                # No applicable InstallAssistants, or no active sources
+                continue
 
-                    details["InstallAssistant"] |= {
-                        "URL": link["url"],
-                        "Size": source.get("size", 0),
-                        "Checksum": source.get("hashes"),
-                    }
-                    break
-                else:
-                    continue
+            _pending.append((details, candidates))
 
-                break
+        link_cache = cache_handler.LinkCache()
+        _alive = async_network_handler.run(self._first_alive_links([candidates for _, candidates in _pending], link_cache))
+        link_cache.save()
 
-            else:
-                # No applicable InstallAssistants, or no active sources
+        for (details, candidates), alive in zip(_pending, _alive):
+            if alive is None:
                 continue
 
+            source, link = candidates[alive]
+            details["InstallAssistant"] |= {
+                "URL": link["url"],
+                "Size": source.get("size", 0),
+                "Checksum": source.get("hashes"),
+                # Remaining active links, raced and used for failover by DownloadObject
+                "Mirrors": [link["url"]] + [other["url"] for other in source["links"] if other["active"] and other["url"] != link["url"]],
+            }
             _products.append(details)
 
         _products = sorted(_products, key=lambda x: x["Beta"])
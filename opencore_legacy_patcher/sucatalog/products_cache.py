@@ -0,0 +1,162 @@
+"""
+products_cache.py: Persistent cache of parsed CatalogProducts results
+
+Layout:
+    <cache>/sucatalog/<sha256 of catalog URL and options>.plist
+
+Each file records the catalog's validator (ETag) alongside every product's map and
+PostDate. An unchanged catalog is listed straight from the cache, while a changed
+one only fetches metadata for products that are new or whose PostDate moved.
+"""
+
+import os
+import hashlib
+import logging
+import plistlib
+import threading
+
+from pathlib import Path
+
+from .constants import SeedType
+
+from ..support import cache_handler
+
+
+PRODUCTS_CACHE_VERSION: int = 1  # Bump when the product map changes shape
+
+_WRITE_LOCK: threading.Lock = threading.Lock()
+
+
+class ProductsCache:
+    """
+    On-disk cache of CatalogProducts results for one catalog URL
+
+    Parameters:
+        catalog_url (str):  Catalog URL
+        options     (dict): CatalogProducts options affecting results (ie. install_assistants_only)
+        path        (Path): Cache folder
+    """
+
+    def __init__(self, catalog_url: str, options: dict, path: Path = cache_handler.CACHE_FOLDER) -> None:
+        self.catalog_url: str  = catalog_url
+        self.options:     dict = {key: str(value) for key, value in options.items()}
+
+        self.path: Path = Path(path) / "sucatalog"
+        key = hashlib.sha256(f"{catalog_url}|{sorted(self.options.items())}".encode()).hexdigest()
+        self.file: Path = self.path / f"{key}.plist"
+
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self.available: bool = os.access(self.path, os.W_OK)
+        except Exception as e:
+            logging.info(f"Products cache unavailable ({self.path}): {e}")
+            self.available: bool = False
+
+        self._entry: dict = self._load()
+
+
+    def _load(self) -> dict:
+        if self.available is False or not self.file.exists():
+            return {}
+
+        try:
+            entry = plistlib.load(self.file.open("rb"))
+        except Exception as e:
+            logging.info(f"Unable to read products cache, ignoring: {e}")
+            return {}
+
+        if any([
+            entry.get("Version")    != PRODUCTS_CACHE_VERSION,
+            entry.get("CatalogURL") != self.catalog_url,
+            entry.get("Options")    != self.options,
+        ]):
+            return {}
+
+        return entry
+
+
+    @staticmethod
+    def _encode(product: dict) -> dict:
+        # plist has no null, drop unset keys
+        return {key: value for key, value in product.items() if value is not None}
+
+
+    @staticmethod
+    def _decode(product: dict) -> dict:
+        result = {"Title": None, "Build": None, "Version": None, "Catalog": None}
+        result.update(product)
+        if result["Catalog"] is not None:
+            result["Catalog"] = SeedType(result["Catalog"])
+        return result
+
+
+    def catalog_products(self, validator: str) -> list:
+        """
+        Products of an unchanged catalog
+
+        Parameters:
+            validator (str): Catalog's current ETag (or Last-Modified)
+
+        Returns:
+            list: Product maps in listing order, None if the catalog changed or isn't cached
+        """
+
+        if not validator or self._entry.get("Validator") != validator:
+            return None
+
+        products = self._entry.get("Products", {})
+        return [self._decode(products[product_id]) for product_id in self._entry.get("Order", []) if product_id in products]
+
+
+    def product(self, product_id: str, post_date) -> tuple:
+        """
+        Look up a product's cached result
+
+        Parameters:
+            product_id (str):      Product ID
+            post_date  (datetime): Product's PostDate in the current catalog
+
+        Returns:
+            tuple: (hit, product map). A hit may hold None for products excluded from the listing
+        """
+
+        entry = self._entry.get("Products", {}).get(product_id)
+        if entry is None or entry.get("PostDate") != post_date:
+            entry = self._entry.get("Excluded", {}).get(product_id)
+            if entry is None or entry != post_date:
+                return False, None
+            return True, None
+
+        return True, self._decode(entry)
+
+
+    def store(self, validator: str, products: list, excluded: dict) -> None:
+        """
+        Replace the cached results
+
+        Parameters:
+            validator (str):  Catalog's ETag (or Last-Modified), None if the listing is incomplete
+            products  (list): Product maps in listing order
+            excluded  (dict): Product ID -> PostDate of products deliberately left out of the listing
+        """
+
+        if self.available is False:
+            return
+
+        self._entry = {
+            "Version":    PRODUCTS_CACHE_VERSION,
+            "CatalogURL": self.catalog_url,
+            "Options":    self.options,
+            "Validator":  validator or "",
+            "Order":      [product["ProductID"] for product in products],
+            "Products":   {product["ProductID"]: self._encode(product) for product in products},
+            "Excluded":   excluded,
+        }
+
+        try:
+            with _WRITE_LOCK:
+                temp_path = self.file.with_name(f"{self.file.name}.tmp")
+                plistlib.dump(self._entry, temp_path.open("wb"))
+                temp_path.replace(self.file)
+        except Exception as e:
+            logging.info(f"Unable to save products cache: {e}")
@@ -10,6 +10,7 @@ https://swscan.apple.com/content/catalogs/others/index-15seed-15-14-13-12-10.16-
 import logging
 import plistlib
 
+from .catalog_reader import CatalogReader, READ_SIZE
 from .constants import (
     SeedType,
     CatalogVersion,
@@ -19,6 +20,9 @@ from .constants import (
 from ..support import network_handler
 
 
+CATALOG_CACHE_TTL: int = 60 * 30  # Seconds before revalidating the cached catalog
+
+
 class CatalogURL:
     """
     Provides URL generation for Software Update Catalog
@@ -169,7 +173,28 @@ class CatalogURL:
         Return URL contents
         """
         try:
-            return plistlib.loads(network_handler.NetworkUtilities().get(self.url).content)
+            return plistlib.loads(network_handler.NetworkUtilities().get(self.url, cache_ttl=CATALOG_CACHE_TTL).content)
+        except Exception as e:
+            logging.error(f"Failed to fetch URL contents: {e}")
+            return None
+
+
+    @property
+    def install_assistants(self) -> dict:
+        """
+        Return URL contents, limited to InstallAssistant products
+
+        The catalog is parsed as it downloads, rather than loaded whole
+
+        Returns:
+            dict: Catalog with a 'Products' dictionary, accepted by CatalogProducts
+        """
+        try:
+            response = network_handler.NetworkUtilities().get(self.url, stream=True, timeout=10)
+            if response.status_code != 200:
+                raise Exception(f"Status code {response.status_code}")
+            with response:
+                return CatalogReader().parse(response.iter_content(READ_SIZE))
         except Exception as e:
             logging.error(f"Failed to fetch URL contents: {e}")
             return None
@@ -0,0 +1,847 @@
+"""
+async_network_handler.py: asyncio network layer, alongside network_handler
+
+Provides an HTTP/1.1 client with keep-alive connection pooling, a global connection
+limit and per-host limits, allowing fan-out work (catalog metadata, link validation)
+to run hundreds of requests concurrently on a single thread.
+
+Responses are returned as requests.Response objects, so results can be handled
+identically to network_handler.NetworkUtilities'. Proxies are resolved the same
+way as requests (environment and system settings), only HTTP proxies are supported.
+
+Usage:
+    >>> async def fetch(urls):
+    ...     return await asyncio.gather(*[AsyncNetworkUtilities().get(url) for url in urls])
+
+    >>> # Sync shim, runs on a shared background event loop
+    >>> responses = run(fetch(urls))
+    >>> responses = get_many(urls)
+    >>> alive = validate_links(urls)
+
+    >>> download_obj = AsyncDownloadObject(url, path)
+    >>> download_obj.download_sync()
+"""
+
+import ssl
+import json
+import base64
+import socket
+import time
+import zlib
+import asyncio
+import hashlib
+import logging
+import weakref
+import threading
+import urllib.parse
+
+import requests
+
+from typing  import Optional, Union
+from pathlib import Path
+
+from . import (
+    utilities,
+    cache_handler,
+    network_handler
+)
+
+
+DEFAULT_TIMEOUT:      float = 10.0
+MAX_CONNECTIONS:      int   = 100              # Open connections across all hosts
+MAX_HOST_CONNECTIONS: int   = 8                # Open connections per host
+MAX_REDIRECTS:        int   = 10
+READ_SIZE:            int   = 1024 * 64
+WRITE_SIZE:           int   = 1024 * 1024 * 4  # Bytes buffered by AsyncDownloadObject before writing
+
+REDIRECT_CODES: list = [301, 302, 303, 307, 308]
+
+
+class _Connection:
+    """
+    Pooled connection to a single host, keyed by (scheme, host, port, proxy)
+    """
+
+    def __init__(self, key: tuple, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, reused: bool) -> None:
+        self.key:    tuple                = key
+        self.reader: asyncio.StreamReader = reader
+        self.writer: asyncio.StreamWriter = writer
+        self.reused: bool                 = reused
+
+
+    def close(self) -> None:
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+
+
+class AsyncResponse:
+    """
+    Response whose body hasn't been read yet
+
+    The connection returns to the pool once the body is fully read, or is closed by close()
+    """
+
+    def __init__(self, client: "AsyncHTTPClient", connection: _Connection, method: str, url: str, status_code: int, reason: str, headers: requests.structures.CaseInsensitiveDict, keep_alive: bool, timeout: float) -> None:
+        self.url:         str = url
+        self.status_code: int = status_code
+        self.reason:      str = reason
+        self.headers:     requests.structures.CaseInsensitiveDict = headers
+
+        self._client:     "AsyncHTTPClient" = client
+        self._connection: _Connection = connection
+        self._method:     str   = method
+        self._keep_alive: bool  = keep_alive
+        self._timeout:    float = timeout
+        self._finished:   bool  = False
+
+
+    def _has_body(self) -> bool:
+        return not (self._method == "HEAD" or self.status_code in [204, 304] or 100 <= self.status_code < 200)
+
+
+    async def iter_raw(self, chunk_size: int = READ_SIZE):
+        """
+        Yield the body as received, without content decoding
+        """
+
+        reader = self._connection.reader
+        reusable = self._keep_alive
+
+        try:
+            if not self._has_body():
+                pass
+
+            elif self.headers.get("Transfer-Encoding", "").lower().endswith("chunked"):
+                while True:
+                    size_line = await asyncio.wait_for(reader.readline(), self._timeout)
+                    size = int(size_line.split(b";")[0].strip() or b"0", 16)
+                    if size == 0:
+                        # Skip trailers
+                        while (await asyncio.wait_for(reader.readline(), self._timeout)) not in [b"\r\n", b"\n", b""]:
+                            pass
+                        break
+                    yield await asyncio.wait_for(reader.readexactly(size), self._timeout)
+                    await asyncio.wait_for(reader.readexactly(2), self._timeout)
+
+            elif "Content-Length" in self.headers:
+                remaining = int(self.headers["Content-Length"])
+                while remaining > 0:
+                    data = await asyncio.wait_for(reader.read(min(chunk_size, remaining)), self._timeout)
+                    if not data:
+                        raise ConnectionError(f"Connection closed with {remaining} bytes outstanding")
+                    remaining -= len(data)
+                    yield data
+
+            else:
+                # Body delimited by the server closing the connection
+                reusable = False
+                while data := await asyncio.wait_for(reader.read(chunk_size), self._timeout):
+                    yield data
+
+        except BaseException:
+            self.close()
+            raise
+
+        self._finish(reusable)
+
+
+    async def iter_content(self, chunk_size: int = READ_SIZE):
+        """
+        Yield the body, decoding gzip/deflate content encoding
+        """
+
+        decompressor = None
+        if self.headers.get("Content-Encoding", "").lower() in ["gzip", "x-gzip", "deflate"]:
+            decompressor = zlib.decompressobj(32 + zlib.MAX_WBITS)  # Auto-detect zlib or gzip header
+
+        async for data in self.iter_raw(chunk_size):
+            if decompressor:
+                data = decompressor.decompress(data)
+            if data:
+                yield data
+
+        if decompressor and (data := decompressor.flush()):
+            yield data
+
+
+    async def read(self) -> bytes:
+        return b"".join([data async for data in self.iter_content()])
+
+
+    def _finish(self, reusable: bool) -> None:
+        if self._finished:
+            return
+        self._finished = True
+        self._client._release(self._connection, reusable)
+
+
+    def close(self) -> None:
+        """
+        Abandon the response, closing its connection if the body wasn't fully read
+        """
+
+        self._finish(False)
+
+
+    def to_requests_response(self, content: bytes) -> requests.Response:
+        """
+        Build a requests.Response with the given body
+        """
+
+        response = requests.Response()
+        response.url         = self.url
+        response.status_code = self.status_code
+        response.reason      = self.reason
+        response.headers     = self.headers
+        response.encoding    = requests.utils.get_encoding_from_headers(self.headers)
+        response._content    = content
+        return response
+
+
+class AsyncHTTPClient:
+    """
+    HTTP/1.1 client with keep-alive connection pooling
+
+    Must be used from a single event loop, see get_client()
+
+    Parameters:
+        max_connections      (int):   Maximum open connections across all hosts
+        max_host_connections (int):   Maximum open connections per host
+        timeout              (float): Default connect/read timeout in seconds
+    """
+
+    def __init__(self, max_connections: int = MAX_CONNECTIONS, max_host_connections: int = MAX_HOST_CONNECTIONS, timeout: float = DEFAULT_TIMEOUT) -> None:
+        self.timeout:              float = timeout
+        self.max_host_connections: int   = max_host_connections
+
+        self._limit:       asyncio.Semaphore = asyncio.Semaphore(max_connections)
+        self._host_limits: dict = {}  # (scheme, host, port, proxy): asyncio.Semaphore
+        self._idle:        dict = {}  # (scheme, host, port, proxy): [_Connection]
+        self._proxies:     dict = {}  # (scheme, host): proxy URL or None
+
+        # Trust the same CA bundle as requests
+        self._ssl_context: ssl.SSLContext = ssl.create_default_context(cafile=requests.certs.where())
+
+
+    async def request(self, method: str, url: str, headers: dict = None, data: bytes = None, timeout: float = None, allow_redirects: bool = True) -> AsyncResponse:
+        """
+        Send a request, returning once the response headers are received
+
+        The body must be consumed with AsyncResponse.read()/iter_content(), or the response closed
+
+        Parameters:
+            method          (str):   HTTP method
+            url             (str):   URL to request
+            headers         (dict):  Additional headers, merged over network_handler.SESSION's
+            data            (bytes): Request body
+            timeout         (float): Connect/read timeout in seconds
+            allow_redirects (bool):  Follow redirects
+        """
+
+        timeout = timeout or self.timeout
+        for _ in range(MAX_REDIRECTS + 1):
+            response = await self._send(method, url, headers, data, timeout)
+            if not allow_redirects or response.status_code not in REDIRECT_CODES or "Location" not in response.headers:
+                return response
+
+            # Drain the redirect body so the connection can be reused
+            await response.read()
+            url = urllib.parse.urljoin(url, response.headers["Location"])
+            if response.status_code == 303 or (response.status_code in [301, 302] and method == "POST"):
+                method = "GET"
+                data = None
+
+        raise requests.exceptions.TooManyRedirects(f"Exceeded {MAX_REDIRECTS} redirects")
+
+
+    def _host_limit(self, key: tuple) -> asyncio.Semaphore:
+        if key not in self._host_limits:
+            self._host_limits[key] = asyncio.Semaphore(self.max_host_connections)
+        return self._host_limits[key]
+
+
+    async def _connect(self, key: tuple) -> _Connection:
+        """
+        Reuse an idle connection to the host, or open a new one
+        """
+
+        idle = self._idle.setdefault(key, [])
+        while idle:
+            connection = idle.pop()
+            if not connection.writer.is_closing() and not connection.reader.at_eof():
+                connection.reused = True
+                return connection
+            connection.close()
+
+        scheme, host, port, proxy = key
+        if proxy is None:
+            reader, writer = await asyncio.open_connection(
+                host, port,
+                ssl=self._ssl_context if scheme == "https" else None,
+                server_hostname=host if scheme == "https" else None,
+            )
+        elif scheme == "http":
+            # Plain HTTP is sent to the proxy with an absolute-form request target
+            proxy_url = urllib.parse.urlsplit(proxy)
+            reader, writer = await asyncio.open_connection(proxy_url.hostname, proxy_url.port or 80)
+        else:
+            sock = await self._tunnel(proxy, host, port)
+            reader, writer = await asyncio.open_connection(sock=sock, ssl=self._ssl_context, server_hostname=host)
+        return _Connection(key, reader, writer, reused=False)
+
+
+    async def _tunnel(self, proxy: str, host: str, port: int) -> socket.socket:
+        """
+        Open a CONNECT tunnel through an HTTP proxy
+
+        Returns:
+            socket.socket: Connected socket, ready for TLS to the target host
+        """
+
+        loop = asyncio.get_running_loop()
+        proxy_url = urllib.parse.urlsplit(proxy)
+
+        sock = None
+        error = None
+        for family, sock_type, proto, _, address in await loop.getaddrinfo(proxy_url.hostname, proxy_url.port or 80, type=socket.SOCK_STREAM):
+            sock = socket.socket(family, sock_type, proto)
+            sock.setblocking(False)
+            try:
+                await loop.sock_connect(sock, address)
+                break
+            except OSError as e:
+                sock.close()
+                sock = None
+                error = e
+        if sock is None:
+            raise error or OSError(f"Unable to connect to proxy {proxy_url.hostname}")
+
+        try:
+            request = f"CONNECT {host}:{port} HTTP/1.1\r\nHost: {host}:{port}\r\n"
+            if authorization := self._proxy_authorization(proxy):
+                request += f"Proxy-Authorization: {authorization}\r\n"
+            await loop.sock_sendall(sock, (request + "\r\n").encode("latin-1"))
+
+            # The target host doesn't send anything before the TLS handshake, so nothing past the headers is consumed
+            head = b""
+            while b"\r\n\r\n" not in head:
+                data = await loop.sock_recv(sock, 1024)
+                if not data:
+                    raise requests.exceptions.ProxyError("Proxy closed the connection")
+                head += data
+
+            status_line = head.split(b"\r\n", 1)[0].decode("latin-1").split(" ", 2)
+            if len(status_line) < 2 or status_line[1] != "200":
+                raise requests.exceptions.ProxyError(f"Proxy refused tunnel: {' '.join(status_line[1:])}")
+        except BaseException:
+            sock.close()
+            raise
+
+        return sock
+
+
+    def _proxy_for(self, url: str, scheme: str, host: str) -> Optional[str]:
+        """
+        Resolve the proxy for a host, honouring the same settings as requests
+        """
+
+        if (scheme, host) not in self._proxies:
+            proxy = requests.utils.select_proxy(url, requests.utils.get_environ_proxies(url)) or None
+            if proxy and urllib.parse.urlsplit(proxy).scheme.lower() != "http":
+                raise requests.exceptions.InvalidProxyURL(f"Unsupported proxy scheme: {urllib.parse.urlsplit(proxy).scheme}")
+            self._proxies[(scheme, host)] = proxy
+        return self._proxies[(scheme, host)]
+
+
+    def _proxy_authorization(self, proxy: str) -> Optional[str]:
+        username, password = requests.utils.get_auth_from_url(proxy)
+        if not username:
+            return None
+        return "Basic " + base64.b64encode(f"{username}:{password}".encode("latin-1")).decode("ascii")
+
+
+    def _release(self, connection: _Connection, reusable: bool) -> None:
+        if reusable:
+            self._idle.setdefault(connection.key, []).append(connection)
+        else:
+            connection.close()
+        self._limit.release()
+        self._host_limit(connection.key).release()
+
+
+    async def _send(self, method: str, url: str, headers: dict, data: bytes, timeout: float) -> AsyncResponse:
+        parsed = urllib.parse.urlsplit(url)
+        scheme = parsed.scheme.lower()
+        if scheme not in ["http", "https"]:
+            raise requests.exceptions.InvalidSchema(f"Unsupported scheme: {url}")
+
+        proxy = self._proxy_for(url, scheme, parsed.hostname)
+        key = (scheme, parsed.hostname, parsed.port or (443 if scheme == "https" else 80), proxy)
+        target = (parsed.path or "/") + (f"?{parsed.query}" if parsed.query else "")
+
+        merged = requests.structures.CaseInsensitiveDict(network_handler.SESSION.headers)
+        merged.update(headers or {})
+        merged["Host"] = parsed.netloc.rpartition("@")[2]
+        if proxy and scheme == "http":
+            target = urllib.parse.urlunsplit((scheme, merged["Host"], parsed.path or "/", parsed.query, ""))
+            merged["Proxy-Authorization"] = self._proxy_authorization(proxy)
+        if data is not None or method in ["POST", "PUT", "PATCH"]:
+            merged["Content-Length"] = str(len(data or b""))
+
+        payload = f"{method} {target} HTTP/1.1\r\n".encode("latin-1")
+        payload += "".join(f"{name}: {value}\r\n" for name, value in merged.items() if value is not None).encode("latin-1")
+        payload += b"\r\n" + (data or b"")
+
+        # Permits are handed to the AsyncResponse on success, and released here if anything fails (including cancellation)
+        acquired = []
+        try:
+            for semaphore in [self._host_limit(key), self._limit]:
+                await semaphore.acquire()
+                acquired.append(semaphore)
+
+            for attempt in range(2):
+                connection = await asyncio.wait_for(self._connect(key), timeout)
+                try:
+                    connection.writer.write(payload)
+                    await asyncio.wait_for(connection.writer.drain(), timeout)
+                    version, status_code, reason, response_headers = await asyncio.wait_for(self._read_head(connection.reader), timeout)
+                    break
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    connection.close()
+                    # Idle keep-alive connections may have been closed by the server, retry once on a fresh one
+                    if connection.reused and attempt == 0:
+                        continue
+                    raise
+                except BaseException:
+                    connection.close()
+                    raise
+        except BaseException:
+            for semaphore in acquired:
+                semaphore.release()
+            raise
+
+        connection_header = response_headers.get("Connection", "").lower()
+        keep_alive = connection_header != "close" and (version != "HTTP/1.0" or connection_header == "keep-alive")
+
+        return AsyncResponse(self, connection, method, url, status_code, reason, response_headers, keep_alive, timeout)
+
+
+    async def _read_head(self, reader: asyncio.StreamReader) -> tuple:
+        """
+        Read the status line and headers, skipping interim (1xx) responses
+
+        Returns:
+            tuple: (HTTP version, status code, reason, headers)
+        """
+
+        while True:
+            status_line = await reader.readline()
+            if not status_line:
+                raise ConnectionError("Connection closed by server")
+
+            parts = status_line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+            version, status_code, reason = parts[0], int(parts[1]), parts[2] if len(parts) > 2 else ""
+
+            headers = requests.structures.CaseInsensitiveDict()
+            while (line := await reader.readline()) not in [b"\r\n", b"\n", b""]:
+                name, _, value = line.decode("latin-1").partition(":")
+                name, value = name.strip(), value.strip()
+                headers[name] = f"{headers[name]}, {value}" if name in headers else value
+
+            if 100 <= status_code < 200 and status_code != 101:
+                continue
+
+            return version, status_code, reason, headers
+
+
+    async def close(self) -> None:
+        for connections in self._idle.values():
+            for connection in connections:
+                connection.close()
+        self._idle = {}
+
+
+_CLIENTS: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def get_client() -> AsyncHTTPClient:
+    """
+    Shared client for the running event loop
+    """
+
+    loop = asyncio.get_running_loop()
+    if loop not in _CLIENTS:
+        _CLIENTS[loop] = AsyncHTTPClient()
+    return _CLIENTS[loop]
+
+
+class AsyncNetworkUtilities:
+    """
+    asyncio equivalent of network_handler.NetworkUtilities
+
+    Errors are handled identically: failed requests return an empty requests.Response
+    """
+
+    def __init__(self, url: str = None) -> None:
+        self.url: str = url
+
+        if self.url is None:
+            self.url = "https://github.com"
+
+
+    async def verify_network_connection(self) -> bool:
+        """
+        Verifies that the network is available
+
+        Returns:
+            bool: True if network is available, False otherwise
+        """
+
+        try:
+            response = await get_client().request("HEAD", self.url, timeout=5)
+            response.close()
+            return True
+        except (requests.exceptions.RequestException, asyncio.TimeoutError, OSError, ValueError):
+            return False
+
+
+    async def validate_link(self) -> bool:
+        """
+        Check for error
+
+        Returns:
+            bool: True if link is valid, False otherwise
+        """
+
+        try:
+            response = await get_client().request("HEAD", self.url, timeout=5)
+            await response.read()
+        except (requests.exceptions.RequestException, asyncio.TimeoutError, OSError, ValueError):
+            return False
+
+        return response.status_code < 400
+
+
+    async def _request(self, method: str, url: str, params: dict = None, headers: dict = None, data: Union[dict, str, bytes] = None, timeout: Union[float, tuple] = None, allow_redirects: bool = True, **kwargs) -> requests.Response:
+        """
+        Send a request, reading the full body
+
+        Accepts the commonly used subset of requests' arguments
+        """
+
+        headers = dict(headers or {})
+        if params:
+            url += ("&" if urllib.parse.urlsplit(url).query else "?") + urllib.parse.urlencode(params, doseq=True)
+        if kwargs.get("json") is not None:
+            data = json.dumps(kwargs["json"]).encode()
+            headers.setdefault("Content-Type", "application/json")
+        elif isinstance(data, dict):
+            data = urllib.parse.urlencode(data, doseq=True).encode()
+            headers.setdefault("Content-Type", "application/x-www-form-urlencoded")
+        elif isinstance(data, str):
+            data = data.encode()
+        if isinstance(timeout, tuple):
+            timeout = max(value for value in timeout if value is not None)
+
+        response = await get_client().request(method, url, headers=headers, data=data, timeout=timeout, allow_redirects=allow_redirects)
+        return response.to_requests_response(await response.read())
+
+
+    async def get(self, url: str, cache_ttl: int = None, **kwargs) -> requests.Response:
+        """
+        asyncio equivalent of NetworkUtilities.get()
+
+        Parameters:
+            url (str): URL to get
+            cache_ttl (int): If set, cache the response on disk, see NetworkUtilities.get()
+            **kwargs: params, headers, timeout, allow_redirects
+
+        Returns:
+            requests.Response: Response object, empty on error
+        """
+
+        kwargs.pop("stream", None)
+        if cache_ttl is not None:
+            return await self._get_cached(url, cache_ttl, **kwargs)
+
+        try:
+            return await self._request("GET", url, **kwargs)
+        except (requests.exceptions.RequestException, asyncio.TimeoutError, OSError, ValueError) as error:
+            logging.warn(f"Error calling async get: {error}")
+            # Return empty response object
+            return requests.Response()
+
+
+    async def _get_cached(self, url: str, cache_ttl: int, **kwargs) -> requests.Response:
+        """
+        Conditional GET backed by cache_handler.ResponseCache, see NetworkUtilities._get_cached()
+        """
+
+        cache = cache_handler.ResponseCache()
+        entry = cache.load(url)
+
+        if entry and time.time() - entry["Timestamp"] < cache_ttl:
+            return network_handler.NetworkUtilities()._response_from_cache(url, entry)
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if entry:
+            if entry["ETag"]:
+                headers["If-None-Match"] = entry["ETag"]
+            if entry["Last-Modified"]:
+                headers["If-Modified-Since"] = entry["Last-Modified"]
+
+        try:
+            result = await self._request("GET", url, headers=headers, **kwargs)
+        except (requests.exceptions.RequestException, asyncio.TimeoutError, OSError, ValueError) as error:
+            logging.warn(f"Error calling async get: {error}")
+            if entry:
+                logging.info(f"- Serving stale cached response for {url}")
+                return network_handler.NetworkUtilities()._response_from_cache(url, entry)
+            return requests.Response()
+
+        if result.status_code == 304 and entry:
+            cache.touch(url)
+            return network_handler.NetworkUtilities()._response_from_cache(url, entry)
+
+        if result.status_code == 200:
+            cache.store(
+                url,
+                result.content,
+                etag=result.headers.get("ETag", ""),
+                last_modified=result.headers.get("Last-Modified", ""),
+                content_type=result.headers.get("Content-Type", "")
+            )
+
+        return result
+
+
+    async def post(self, url: str, **kwargs) -> requests.Response:
+        """
+        asyncio equivalent of NetworkUtilities.post()
+
+        Parameters:
+            url (str): URL to post
+            **kwargs: params, headers, data, json, timeout, allow_redirects
+
+        Returns:
+            requests.Response: Response object, empty on error
+        """
+
+        try:
+            return await self._request("POST", url, **kwargs)
+        except (requests.exceptions.RequestException, asyncio.TimeoutError, OSError, ValueError) as error:
+            logging.warn(f"Error calling async post: {error}")
+            return requests.Response()
+
+
+class AsyncDownloadObject:
+    """
+    asyncio equivalent of network_handler.DownloadObject
+
+    Streams a single connection into '<file>.part', renamed once complete.
+    Segmenting, resuming, caching and mirrors remain DownloadObject features.
+
+    Usage:
+        >>> download_obj = AsyncDownloadObject(url, path)
+        >>> await download_obj.download()
+        >>> download_obj.download_complete
+
+        >>> # From synchronous code
+        >>> download_obj.download_sync()
+    """
+
+    def __init__(self, url: str, path: str, checksum_algo: Optional["hashlib._Hash"] = None) -> None:
+        self.url:       str = url
+        self.status:    str = network_handler.DownloadStatus.INACTIVE
+        self.error_msg: str = ""
+        self.filename:  str = Path(url).name
+
+        self.filepath:  Path = Path(path)
+        self.part_path: Path = self.filepath.with_name(f"{self.filepath.name}.part")
+
+        self.total_file_size:      float = 0.0
+        self.downloaded_file_size: float = 0.0
+        self.start_time:           float = time.time()
+
+        self.error:             bool = False
+        self.should_stop:       bool = False
+        self.download_complete: bool = False
+
+        self.checksum = None
+        self._checksum_storage: Optional[hashlib._Hash] = checksum_algo
+
+
+    def _write(self, file, data: bytes) -> None:
+        file.write(data)
+        if self._checksum_storage:
+            self._checksum_storage.update(data)
+
+
+    async def download(self) -> bool:
+        """
+        Download the file
+
+        Returns:
+            bool: True if the download completed
+        """
+
+        self.status = network_handler.DownloadStatus.DOWNLOADING
+        self.start_time = time.time()
+        logging.info(f"Starting download: {self.filename}")
+
+        response = None
+        try:
+            response = await get_client().request("GET", self.url)
+            if response.status_code != 200:
+                raise Exception(f"Unexpected status code: {response.status_code}")
+
+            self.total_file_size = float(response.headers.get("Content-Length", 0))
+            self.filepath.parent.mkdir(parents=True, exist_ok=True)
+            if self.total_file_size and utilities.get_free_space(self.filepath.parent) < self.total_file_size:
+                raise Exception(f"Not enough free space to download {self.filename}, need {utilities.human_fmt(self.total_file_size)}")
+
+            loop = asyncio.get_running_loop()
+            with self.part_path.open("wb") as file:
+                buffer = bytearray()
+                async for data in response.iter_content():
+                    if self.should_stop:
+                        raise Exception("Download stopped")
+                    buffer += data
+                    self.downloaded_file_size += len(data)
+                    if len(buffer) >= WRITE_SIZE:
+                        # Keep disk I/O and hashing off the event loop
+                        await loop.run_in_executor(None, self._write, file, bytes(buffer))
+                        buffer.clear()
+                if buffer:
+                    await loop.run_in_executor(None, self._write, file, bytes(buffer))
+
+            self.part_path.replace(self.filepath)
+            if self._checksum_storage:
+                self.checksum = self._checksum_storage.hexdigest()
+
+            self.download_complete = True
+            logging.info(f"Download complete: {self.filename}")
+            logging.info("Stats:")
+            logging.info(f"- Downloaded size: {utilities.human_fmt(self.downloaded_file_size)}")
+            logging.info(f"- Time elapsed: {(time.time() - self.start_time):.2f} seconds")
+            logging.info(f"- Speed: {utilities.human_fmt(self.get_speed())}/s")
+            logging.info(f"- Location: {self.filepath}")
+        except Exception as e:
+            self.error = True
+            self.error_msg = str(e)
+            logging.error(f"Error downloading {self.url}: {self.error_msg}")
+            if response:
+                response.close()
+            if self.part_path.exists():
+                self.part_path.unlink()
+
+        self.status = network_handler.DownloadStatus.COMPLETE
+        return self.download_complete
+
+
+    def download_sync(self) -> bool:
+        """
+        Download from synchronous code, on the shared background event loop
+        """
+
+        return run(self.download())
+
+
+    def get_percent(self) -> float:
+        if self.total_file_size == 0.0:
+            return -1
+        return self.downloaded_file_size / self.total_file_size * 100
+
+
+    def get_speed(self) -> float:
+        return self.downloaded_file_size / max(time.time() - self.start_time, 0.001)
+
+
+    def get_time_remaining(self) -> float:
+        if self.total_file_size == 0.0:
+            return -1
+        speed = self.get_speed()
+        if speed <= 0:
+            return -1
+        return (self.total_file_size - self.downloaded_file_size) / speed
+
+
+    def is_active(self) -> bool:
+        return self.status == network_handler.DownloadStatus.DOWNLOADING
+
+
+    def stop(self) -> None:
+        self.should_stop = True
+
+
+_LOOP:      asyncio.AbstractEventLoop = None
+_LOOP_LOCK: threading.Lock = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    """
+    Shared event loop for the sync shim, kept running so pooled connections are reused across calls
+    """
+
+    global _LOOP
+    with _LOOP_LOCK:
+        if _LOOP is None:
+            _LOOP = asyncio.new_event_loop()
+            threading.Thread(target=_LOOP.run_forever, name="async_network_handler", daemon=True).start()
+    return _LOOP
+
+
+def run(coroutine):
+    """
+    Run a coroutine on the shared background event loop, blocking until complete
+
+    Parameters:
+        coroutine: Coroutine to run
+
+    Returns:
+        The coroutine's result
+    """
+
+    loop = _background_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        raise RuntimeError("run() called from the network event loop, await the coroutine instead")
+
+    return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+
+def get_many(urls: list, **kwargs) -> list:
+    """
+    Fetch many URLs concurrently from synchronous code
+
+    Parameters:
+        urls (list): URLs to get
+        **kwargs: Arguments for AsyncNetworkUtilities.get()
+
+    Returns:
+        list: requests.Response objects, in the order of urls
+    """
+
+    async def _get_many() -> list:
+        return await asyncio.gather(*[AsyncNetworkUtilities().get(url, **kwargs) for url in urls])
+
+    return run(_get_many())
+
+
+def validate_links(urls: list) -> list:
+    """
+    Validate many links concurrently from synchronous code
+
+    Returns:
+        list: bool per URL, in the order of urls
+    """
+
+    async def _validate_links() -> list:
+        return await asyncio.gather(*[AsyncNetworkUtilities(url).validate_link() for url in urls])
+
+    return run(_validate_links())
@@ -0,0 +1,877 @@
+"""
+cache_handler.py: Local caches for network resources
+
+ArtifactCache: Content-addressed cache for downloaded artifacts
+    Artifacts (KDKs, Metal libraries, Universal-Binaries.dmg, InstallAssistant.pkg, etc.)
+    are stored once by SHA-256 and indexed by both URL + validator (ETag/Last-Modified)
+    and by SHA-256. Requests are satisfied with a hardlink or APFS clone of the cached
+    object, avoiding a network fetch entirely.
+
+ResponseCache: Conditional-GET cache for API responses (JSON/plist endpoints)
+    Stores response bodies alongside their ETag/Last-Modified validators, see
+    network_handler.NetworkUtilities.get()'s 'cache_ttl' parameter.
+
+LinkCache: Link validation results with a TTL
+    Lets repeated catalog loads skip re-probing installer links (ie. AppleDB sources).
+
+PayloadStore: Pre-extracted payload archives
+    Kext, OpenCore and OpenCanopy archives are extracted once by SHA-256, builds
+    hardlink their contents into the EFI instead of unzipping them. Entries are
+    verified against their file hashes before use.
+
+Usage:
+    >>> cache = ArtifactCache()
+    >>> if cache.retrieve(destination, url, etag) is False:
+    ...     # Download the file, then
+    ...     cache.store(destination, url, etag, sha256)
+
+    >>> entry = ResponseCache().load(url)
+    >>> if entry:
+    ...     print(entry["ETag"], len(entry["Content"]))
+
+    >>> links = LinkCache()
+    >>> if links.lookup(url) is None:
+    ...     links.record(url, NetworkUtilities(url).validate_link())
+    >>> links.save()
+
+    >>> PayloadStore().materialise(constants.lilu_path, constants.kexts_path)
+"""
+
+import os
+import sys
+import stat
+import time
+import shutil
+import logging
+import hashlib
+import zipfile
+import plistlib
+import threading
+import subprocess
+
+from typing  import Optional
+from pathlib import Path
+
+
+CACHE_FOLDER:  str = "/Users/Shared/.com.dortania.opencore-legacy-patcher.cache"
+CACHE_QUOTA:   int = 1024 * 1024 * 1024 * 50  # 50 GB
+CACHE_INDEX:   str = "index.plist"
+
+LINK_CACHE_TTL:         int = 60 * 60 * 6  # Seconds a live link is trusted without re-probing
+LINK_CACHE_FAILURE_TTL: int = 60 * 10      # Seconds a dead link is skipped before re-probing
+
+PAYLOAD_STORE_TTL: int = 60 * 60 * 24 * 30  # Seconds an extracted archive no longer shipped is kept
+PAYLOAD_MANIFEST:  str = ".manifest.plist"
+
+_INDEX_LOCK = threading.Lock()
+_LINKS_LOCK = threading.Lock()
+
+_ARCHIVE_HASHES: dict = {}  # (path, size, modification date) -> SHA-256, archives are hashed once per session
+_VERIFIED_ENTRIES: dict = {}  # Payload store entry -> file stats when last verified, entries are hashed once per session unless modified
+
+
+def _is_trusted(path: Path, st: os.stat_result = None) -> bool:
+    """
+    Whether only the current user (or root) can have written to path
+
+    The cache folder is shared between users, anything failing this is never used
+    """
+
+    try:
+        st = st or os.lstat(path)
+    except OSError:
+        return False
+
+    if not (stat.S_ISREG(st.st_mode) or stat.S_ISDIR(st.st_mode)):
+        return False
+    if st.st_uid not in [os.geteuid(), 0]:
+        return False
+    return st.st_mode & (stat.S_IWGRP | stat.S_IWOTH) == 0
+
+
+def _prepare_folders(*folders: Path) -> bool:
+    """
+    Create cache folders if missing, writable only by the current user
+
+    Parameters:
+        folders (Path): Folders to create, parents first
+
+    Returns:
+        bool: True if every folder is trusted and writable
+    """
+
+    for folder in folders:
+        try:
+            Path(folder).mkdir(mode=0o755, parents=True, exist_ok=True)
+        except Exception as e:
+            logging.info(f"Cache folder unavailable ({folder}): {e}")
+            return False
+
+        if not _is_trusted(folder):
+            logging.info(f"Cache folder {folder} is writable by other users, ignoring")
+            return False
+        if not os.access(folder, os.W_OK):
+            return False
+
+    return True
+
+
+def _write_file(path: Path, data: bytes) -> None:
+    """
+    Atomically write a cache file, writable only by the current user
+    """
+
+    temp_path = Path(path).with_name(f"{Path(path).name}.tmp")
+    temp_path.write_bytes(data)
+    os.chmod(temp_path, 0o644)
+    temp_path.replace(path)
+
+
+class ArtifactCache:
+    """
+    Content-addressed artifact cache with size quota and LRU eviction
+
+    The cache folder is shared, so it's only used if the cache folder, objects folder and
+    index are owned by the current user (or root) and not writable by anyone else
+
+    Layout:
+        <cache>/objects/<sha256>  - Cached artifacts, re-verified on retrieval
+        <cache>/index.plist       - URL and object index
+
+    Parameters:
+        path  (Path): Cache folder
+        quota  (int): Maximum size of cached objects in bytes
+    """
+
+    def __init__(self, path: Path = CACHE_FOLDER, quota: int = CACHE_QUOTA) -> None:
+        self.path:         Path = Path(path)
+        self.objects_path: Path = self.path / "objects"
+        self.index_path:   Path = self.path / CACHE_INDEX
+        self.quota:         int = quota
+
+        self.available: bool = self._prepare_cache_folder()
+
+
+    def _prepare_cache_folder(self) -> bool:
+        """
+        Create the cache folder if missing
+
+        Returns:
+            bool: True if the cache is usable, False otherwise
+        """
+
+        return _prepare_folders(self.path, self.objects_path)
+
+
+    def _load_index(self) -> dict:
+        """
+        Load the cache index, returning an empty index if missing, corrupt or
+        writable by other users
+        """
+
+        index = {"URLs": {}, "Objects": {}}
+        if not self.index_path.exists():
+            return index
+
+        # Another user's index could map a known URL to an object of their choosing
+        if not _is_trusted(self.index_path):
+            logging.info("- Artifact cache index is writable by other users, ignoring")
+            return index
+
+        try:
+            index.update(plistlib.load(self.index_path.open("rb")))
+        except Exception as e:
+            logging.info(f"Unable to read artifact cache index, resetting: {e}")
+
+        return index
+
+
+    def _save_index(self, index: dict) -> None:
+        """
+        Atomically write the cache index
+        """
+
+        try:
+            _write_file(self.index_path, plistlib.dumps(index))
+        except Exception as e:
+            logging.info(f"Unable to write artifact cache index: {e}")
+
+
+    @staticmethod
+    def url_key(url: str, validator: str) -> str:
+        """
+        Build the URL index key
+
+        Parameters:
+            url       (str): Artifact URL
+            validator (str): ETag or Last-Modified header value
+        """
+
+        return f"{url}|{validator}"
+
+
+    def _object_path(self, sha256: str) -> Path:
+        return self.objects_path / sha256.lower()
+
+
+    def lookup(self, url: str = None, validator: str = None, sha256: str = None) -> Optional[Path]:
+        """
+        Find a cached object by URL + validator, or by SHA-256
+
+        Parameters:
+            url       (str): Artifact URL
+            validator (str): ETag or Last-Modified header value
+            sha256    (str): Expected SHA-256 of the artifact
+
+        Returns:
+            Path: Path to the cached object, None if not cached
+        """
+
+        if self.available is False:
+            return None
+
+        with _INDEX_LOCK:
+            index = self._load_index()
+
+            if sha256 is None and url and validator:
+                sha256 = index["URLs"].get(self.url_key(url, validator))
+            if sha256 is None:
+                return None
+
+            sha256 = sha256.lower()
+            if sha256 not in index["Objects"] or not self._object_path(sha256).exists():
+                return None
+
+            index["Objects"][sha256]["LastAccess"] = time.time()
+            self._save_index(index)
+
+        return self._object_path(sha256)
+
+
+    def checksum_for(self, object_path: Path) -> str:
+        """
+        Return the SHA-256 of a cached object, derived from its name
+
+        Note: Only trust the result once retrieve() has verified the object's contents
+        """
+
+        return Path(object_path).name
+
+
+    def retrieve(self, destination: Path, url: str = None, validator: str = None, sha256: str = None) -> bool:
+        """
+        Satisfy a download from the cache
+
+        Parameters:
+            destination (Path): Where the artifact should be placed
+            url          (str): Artifact URL
+            validator    (str): ETag or Last-Modified header value
+            sha256       (str): Expected SHA-256 of the artifact
+
+        Returns:
+            bool: True if the destination was populated from the cache
+        """
+
+        object_path = self.lookup(url, validator, sha256)
+        if object_path is None:
+            return False
+
+        destination = Path(destination)
+        if destination.exists():
+            destination.unlink()
+
+        # The cache folder is shared, only hardlink objects no other user can modify afterwards
+        if _is_trusted(object_path):
+            if self._link(object_path, destination, allow_copy=True) is False:
+                return False
+        else:
+            try:
+                shutil.copyfile(object_path, destination)
+            except Exception as e:
+                logging.info(f"Unable to copy {object_path} to {destination}: {e}")
+                return False
+
+        # Names aren't proof of contents, verify what was placed before it's used
+        if self._hash_file(destination) != self.checksum_for(object_path):
+            logging.info(f"- Cached {destination.name} failed verification, evicting from artifact cache")
+            destination.unlink()
+            with _INDEX_LOCK:
+                index = self._load_index()
+                self._remove_object(index, self.checksum_for(object_path))
+                self._save_index(index)
+            return False
+
+        logging.info(f"- Retrieved {destination.name} from artifact cache")
+        return True
+
+
+    def store(self, file: Path, url: str = None, validator: str = None, sha256: str = None) -> bool:
+        """
+        Add a downloaded file to the cache
+
+        Only stored when a hardlink or clone is possible, so caching never costs a full copy
+
+        Parameters:
+            file      (Path): Downloaded file
+            url        (str): Artifact URL
+            validator  (str): ETag or Last-Modified header value
+            sha256     (str): SHA-256 of the file, calculated if not provided
+
+        Returns:
+            bool: True if stored
+        """
+
+        if self.available is False:
+            return False
+
+        file = Path(file)
+        if not file.is_file():
+            return False
+
+        if sha256 is None:
+            sha256 = self._hash_file(file)
+        sha256 = sha256.lower()
+
+        object_path = self._object_path(sha256)
+        if not object_path.exists():
+            if self._link(file, object_path, allow_copy=False) is False:
+                logging.info(f"- Unable to link {file.name} into artifact cache, skipping")
+                return False
+            # Guard clones against in-place modification
+            # Hardlinks share the downloaded file's mode, changes to it are caught by retrieve()
+            if object_path.stat().st_ino != file.stat().st_ino:
+                os.chmod(object_path, 0o444)
+
+        with _INDEX_LOCK:
+            index = self._load_index()
+            index["Objects"][sha256] = {
+                "Size":       object_path.stat().st_size,
+                "LastAccess": time.time(),
+                "Name":       file.name,
+            }
+            if url and validator:
+                index["URLs"][self.url_key(url, validator)] = sha256
+            self._evict(index)
+            self._save_index(index)
+
+        logging.info(f"- Stored {file.name} in artifact cache")
+        return True
+
+
+    def _evict(self, index: dict) -> None:
+        """
+        Evict least recently used objects until the cache fits its quota
+
+        Parameters:
+            index (dict): Loaded index, modified in place
+        """
+
+        total_size = sum(entry["Size"] for entry in index["Objects"].values())
+        if total_size <= self.quota:
+            return
+
+        for sha256, entry in sorted(index["Objects"].items(), key=lambda item: item[1]["LastAccess"]):
+            if total_size <= self.quota:
+                break
+
+            logging.info(f"- Evicting {entry.get('Name', sha256)} from artifact cache")
+            total_size -= entry["Size"]
+            self._remove_object(index, sha256)
+
+
+    def _remove_object(self, index: dict, sha256: str) -> None:
+        """
+        Delete a cached object and its index entries
+
+        Parameters:
+            index  (dict): Loaded index, modified in place
+            sha256  (str): Object to remove
+        """
+
+        try:
+            self._object_path(sha256).unlink()
+        except FileNotFoundError:
+            pass
+
+        index["Objects"].pop(sha256, None)
+        for key in [key for key, value in index["URLs"].items() if value == sha256]:
+            del index["URLs"][key]
+
+
+    def _link(self, source: Path, destination: Path, allow_copy: bool) -> bool:
+        """
+        Materialise source at destination via hardlink, falling back to an APFS clone
+
+        Parameters:
+            source      (Path): Existing file
+            destination (Path): Path to create
+            allow_copy  (bool): Fall back to a full copy if neither is possible
+        """
+
+        try:
+            os.link(source, destination)
+            return True
+        except OSError:
+            pass
+
+        if sys.platform == "darwin":
+            from ..volume import can_copy_on_write
+            try:
+                if can_copy_on_write(str(source), str(destination)):
+                    result = subprocess.run(["/bin/cp", "-c", source, destination], stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+                    if result.returncode == 0:
+                        return True
+            except Exception:
+                pass
+
+        if allow_copy is False:
+            return False
+
+        try:
+            shutil.copyfile(source, destination)
+        except Exception as e:
+            logging.info(f"Unable to copy {source} to {destination}: {e}")
+            return False
+
+        return True
+
+
+    @staticmethod
+    def _hash_file(file: Path) -> str:
+        """
+        Calculate the SHA-256 of a file
+        """
+
+        hash_obj = hashlib.sha256()
+        with Path(file).open("rb") as f:
+            while chunk := f.read(1024 * 1024 * 4):
+                hash_obj.update(chunk)
+        return hash_obj.hexdigest()
+
+
+class ResponseCache:
+    """
+    On-disk cache of HTTP response bodies and their validators
+
+    The cache folder is shared, so responses are only used if the folder and both files
+    are owned by the current user (or root) and not writable by anyone else
+
+    Layout:
+        <cache>/responses/<sha256 of URL>.plist - URL, validators, timestamp
+        <cache>/responses/<sha256 of URL>.body  - Raw response body
+
+    Parameters:
+        path (Path): Cache folder
+    """
+
+    def __init__(self, path: Path = CACHE_FOLDER) -> None:
+        self.path: Path = Path(path) / "responses"
+
+        self.available: bool = _prepare_folders(Path(path), self.path)
+
+
+    def _paths(self, url: str) -> tuple:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return self.path / f"{key}.plist", self.path / f"{key}.body"
+
+
+    def load(self, url: str) -> Optional[dict]:
+        """
+        Load a cached response
+
+        Parameters:
+            url (str): Requested URL
+
+        Returns:
+            dict: Cached entry with 'Content' holding the body, None if not cached
+        """
+
+        if self.available is False:
+            return None
+
+        meta_path, body_path = self._paths(url)
+        if not meta_path.exists() or not body_path.exists():
+            return None
+
+        # Cached bodies are served without asking the server (ie. update links), never use another user's
+        if not (_is_trusted(meta_path) and _is_trusted(body_path)):
+            logging.info(f"- Cached response for {url} is writable by other users, ignoring")
+            return None
+
+        try:
+            entry = plistlib.load(meta_path.open("rb"))
+            if entry.get("URL") != url:
+                return None
+            entry["Content"] = body_path.read_bytes()
+        except Exception as e:
+            logging.info(f"Unable to read cached response for {url}: {e}")
+            return None
+
+        return entry
+
+
+    def store(self, url: str, content: bytes, etag: str = "", last_modified: str = "", content_type: str = "") -> None:
+        """
+        Store a response body and its validators
+
+        Parameters:
+            url           (str):   Requested URL
+            content       (bytes): Response body
+            etag          (str):   ETag header value
+            last_modified (str):   Last-Modified header value
+            content_type  (str):   Content-Type header value
+        """
+
+        if self.available is False:
+            return
+
+        meta_path, body_path = self._paths(url)
+        entry = {
+            "URL":           url,
+            "ETag":          etag or "",
+            "Last-Modified": last_modified or "",
+            "Content-Type":  content_type or "",
+            "Timestamp":     time.time(),
+        }
+
+        try:
+            _write_file(body_path, content)
+            _write_file(meta_path, plistlib.dumps(entry))
+        except Exception as e:
+            logging.info(f"Unable to cache response for {url}: {e}")
+
+
+    def touch(self, url: str) -> None:
+        """
+        Mark a cached response as freshly validated (ie. after a 304)
+
+        Parameters:
+            url (str): Requested URL
+        """
+
+        entry = self.load(url)
+        if entry is None:
+            return
+
+        self.store(url, entry["Content"], entry["ETag"], entry["Last-Modified"], entry.get("Content-Type", ""))
+
+
+class LinkCache:
+    """
+    On-disk cache of link validation results
+
+    Dead links expire sooner than live ones, so a recovered mirror is picked up quickly
+
+    The cache folder is shared, so results are only used if the folder and links.plist are
+    owned by the current user (or root) and not writable by anyone else
+
+    Layout:
+        <cache>/links.plist - URL -> validity and timestamp
+
+    Parameters:
+        path        (Path): Cache folder
+        ttl         (int):  Seconds a live link is trusted
+        failure_ttl (int):  Seconds a dead link is trusted
+    """
+
+    def __init__(self, path: Path = CACHE_FOLDER, ttl: int = LINK_CACHE_TTL, failure_ttl: int = LINK_CACHE_FAILURE_TTL) -> None:
+        self.path:        Path = Path(path)
+        self.file:        Path = self.path / "links.plist"
+        self.ttl:         int  = ttl
+        self.failure_ttl: int  = failure_ttl
+
+        self.available: bool = _prepare_folders(self.path)
+
+        self._entries: dict = self._load()
+        self._updated: dict = {}
+
+
+    def _load(self) -> dict:
+        if self.available is False or not self.file.exists():
+            return {}
+
+        # Another user's results could steer installer links to other mirrors
+        if not _is_trusted(self.file):
+            logging.info("- Link cache is writable by other users, ignoring")
+            return {}
+
+        try:
+            return plistlib.load(self.file.open("rb"))
+        except Exception as e:
+            logging.info(f"Unable to read link cache, ignoring: {e}")
+            return {}
+
+
+    def _is_fresh(self, entry: dict) -> bool:
+        age = time.time() - entry.get("Timestamp", 0)
+        return 0 <= age < (self.ttl if entry.get("Valid") else self.failure_ttl)
+
+
+    def lookup(self, url: str) -> Optional[bool]:
+        """
+        Look up a link's cached validity
+
+        Parameters:
+            url (str): Link
+
+        Returns:
+            bool: Cached validity, None if not cached or expired
+        """
+
+        entry = self._updated.get(url) or self._entries.get(url)
+        if entry is None or not self._is_fresh(entry):
+            return None
+        return entry["Valid"]
+
+
+    def record(self, url: str, valid: bool) -> None:
+        """
+        Record a link's validity, persisted on save()
+        """
+
+        self._updated[url] = {"Valid": bool(valid), "Timestamp": time.time()}
+
+
+    def save(self) -> None:
+        """
+        Merge recorded results into the on-disk cache, dropping expired entries
+        """
+
+        if self.available is False or not self._updated:
+            return
+
+        try:
+            with _LINKS_LOCK:
+                entries = self._load()
+                entries.update(self._updated)
+                entries = {url: entry for url, entry in entries.items() if self._is_fresh(entry)}
+
+                _write_file(self.file, plistlib.dumps(entries))
+
+            self._entries = entries
+            self._updated = {}
+        except Exception as e:
+            logging.info(f"Unable to save link cache: {e}")
+
+
+class PayloadStore:
+    """
+    Extracted payload archives, shared between builds
+
+    Materialised files are hardlinks into the store, so they must be replaced rather than
+    modified in place (see BuildSupport.sign_files())
+
+    The cache folder is shared, so an entry is only used if the store, the entry and its
+    files are owned by the current user (or root) and not writable by anyone else, and its
+    files match the SHA-256 manifest written on extraction. Entries failing verification
+    are re-extracted, or the archive is extracted directly if that isn't possible.
+
+    Layout:
+        <cache>/payloads/<sha256>/                - Archive contents, without __MACOSX
+        <cache>/payloads/<sha256>/.manifest.plist - SHA-256 of every file in the entry
+
+    Parameters:
+        path (Path): Cache folder
+    """
+
+    def __init__(self, path: Path = CACHE_FOLDER) -> None:
+        self.path: Path = Path(path) / "payloads"
+
+        self.available: bool = _prepare_folders(Path(path), self.path)
+
+
+    @staticmethod
+    def _archive_hash(archive: Path) -> str:
+        stat = os.stat(archive)
+        key = (str(archive), stat.st_size, stat.st_mtime_ns)
+        if key not in _ARCHIVE_HASHES:
+            _ARCHIVE_HASHES[key] = ArtifactCache._hash_file(archive)
+        return _ARCHIVE_HASHES[key]
+
+
+    @staticmethod
+    def _extract(archive: Path, destination: Path) -> None:
+        with zipfile.ZipFile(archive) as zip_file:
+            for member in zip_file.infolist():
+                if "__MACOSX" in member.filename.split("/"):
+                    continue
+                zip_file.extract(member, destination)
+
+
+    def _write_manifest(self, entry_path: Path) -> None:
+        """
+        Record every file's SHA-256, and drop group/other write access
+        """
+
+        files = {}
+        for root, folders, filenames in os.walk(entry_path):
+            for name in folders + filenames:
+                path = Path(root, name)
+                os.chmod(path, os.lstat(path).st_mode & ~(stat.S_IWGRP | stat.S_IWOTH))
+            for filename in filenames:
+                path = Path(root, filename)
+                files[path.relative_to(entry_path).as_posix()] = ArtifactCache._hash_file(path)
+        os.chmod(entry_path, os.lstat(entry_path).st_mode & ~(stat.S_IWGRP | stat.S_IWOTH))
+
+        (entry_path / PAYLOAD_MANIFEST).write_bytes(plistlib.dumps({"Files": files}, fmt=plistlib.FMT_BINARY))
+        os.chmod(entry_path / PAYLOAD_MANIFEST, 0o644)
+
+
+    def _verify(self, entry_path: Path) -> bool:
+        """
+        Check an entry's ownership and contents against its manifest
+
+        Returns:
+            bool: True if the entry can be used
+        """
+
+        if not (_is_trusted(self.path.parent) and _is_trusted(self.path) and _is_trusted(entry_path)):
+            return False
+
+        stats = {}
+        for root, folders, filenames in os.walk(entry_path):
+            for name in folders + filenames:
+                path = Path(root, name)
+                st = os.lstat(path)
+                if not _is_trusted(path, st):
+                    return False
+                if name in filenames:
+                    stats[path.relative_to(entry_path).as_posix()] = (st.st_ino, st.st_size, st.st_mtime_ns)
+
+        # Only trusted users can write to the entry, so unchanged files (ie. edited through an EFI hardlink) don't need hashing again.
+        # ctime isn't usable here, as hardlinking into the EFI changes it
+        if _VERIFIED_ENTRIES.get(entry_path) == stats:
+            return True
+
+        try:
+            manifest = plistlib.loads((entry_path / PAYLOAD_MANIFEST).read_bytes())["Files"]
+        except Exception:
+            return False
+
+        if set(manifest) != set(stats) - {PAYLOAD_MANIFEST}:
+            return False
+        for relative_path, sha256 in manifest.items():
+            if ArtifactCache._hash_file(entry_path / relative_path) != sha256:
+                return False
+
+        _VERIFIED_ENTRIES[entry_path] = stats
+        return True
+
+
+    def entry(self, archive: Path) -> Optional[Path]:
+        """
+        Extract an archive into the store, if not already present
+
+        Parameters:
+            archive (Path): Zip archive
+
+        Returns:
+            Path: Folder holding the archive's contents, None if the store is unavailable
+        """
+
+        if self.available is False:
+            return None
+
+        entry_path = self.path / self._archive_hash(archive)
+        if entry_path.exists():
+            return entry_path
+
+        # Extract aside and rename, so concurrent builds never see a partial entry
+        temp_path = self.path / f".{entry_path.name}.{os.getpid()}.{threading.get_ident()}"
+        try:
+            self._extract(archive, temp_path)
+            self._write_manifest(temp_path)
+            temp_path.rename(entry_path)
+        except Exception as e:
+            if not entry_path.exists():
+                logging.info(f"Unable to add {Path(archive).name} to payload store: {e}")
+        finally:
+            shutil.rmtree(temp_path, ignore_errors=True)
+
+        return entry_path if entry_path.exists() else None
+
+
+    def materialise(self, archive: Path, destination: Path) -> list:
+        """
+        Place an archive's contents in destination, as extracting it would
+
+        Files already hardlinked from the entry (ie. kept from a previous build) are left as-is
+
+        Parameters:
+            archive     (Path): Zip archive
+            destination (Path): Folder to populate
+
+        Returns:
+            list: Files and folders placed from the store, empty if the archive was extracted directly
+        """
+
+        entry_path = self.entry(archive)
+        if entry_path is not None and self._verify(entry_path) is False:
+            logging.info(f"- Payload store entry for {Path(archive).name} failed verification, replacing")
+            _VERIFIED_ENTRIES.pop(entry_path, None)
+            shutil.rmtree(entry_path, ignore_errors=True)
+            entry_path = self.entry(archive)
+            if entry_path is not None and self._verify(entry_path) is False:
+                entry_path = None
+
+        if entry_path is None:
+            self._extract(archive, destination)
+            return []
+
+        # Keep in use entries from expiring
+        os.utime(entry_path)
+
+        placed = []
+        can_link = True
+        for root, _, files in os.walk(entry_path):
+            target_root = Path(destination, os.path.relpath(root, entry_path))
+            target_root.mkdir(parents=True, exist_ok=True)
+            placed.append(target_root)
+            for file in files:
+                if root == str(entry_path) and file == PAYLOAD_MANIFEST:
+                    continue
+                source = Path(root, file)
+                target = target_root / file
+                if target.exists():
+                    if os.path.samefile(source, target):
+                        placed.append(target)
+                        continue
+                    target.unlink()
+                if can_link is True:
+                    try:
+                        os.link(source, target)
+                        placed.append(target)
+                        continue
+                    except OSError:
+                        # ie. destination on another volume
+                        can_link = False
+                shutil.copyfile(source, target)
+
+        return placed
+
+
+    def prepare(self, folders: list) -> None:
+        """
+        Extract every archive in folders ahead of building, and drop
+        entries for archives no longer shipped after PAYLOAD_STORE_TTL
+
+        Parameters:
+            folders (list): Folders to search for zip archives
+        """
+
+        if self.available is False:
+            return
+
+        current = set()
+        for folder in folders:
+            for archive in Path(folder).rglob("*.zip"):
+                entry_path = self.entry(archive)
+                if entry_path is not None:
+                    current.add(entry_path.name)
+
+        for entry_path in self.path.iterdir():
+            if entry_path.name in current:
+                continue
+            if time.time() - entry_path.stat().st_mtime > PAYLOAD_STORE_TTL:
+                logging.info(f"- Removing {entry_path.name} from payload store")
+                shutil.rmtree(entry_path, ignore_errors=True)
@@ -0,0 +1,395 @@
+"""
+download_handler.py: Central scheduler for network_handler.DownloadObject downloads
+
+Downloads are queued by priority and share an optional bandwidth cap.
+At most max_active downloads run at once, interactive downloads are scheduled
+ahead of background ones. Background downloads only start while no interactive
+download is running or waiting. Active resumable background downloads yield to
+interactive ones by closing their connections and returning to the queue, to
+be resumed from their .part file once rescheduled.
+
+Usage:
+    >>> from .download_handler import MANAGER, DownloadPriority
+    >>> download_obj = network_handler.DownloadObject(url, path, priority=DownloadPriority.BACKGROUND)
+    >>> download_obj.download()  # Queued through MANAGER
+
+    >>> MANAGER.set_bandwidth_limit(1024 * 1024 * 5)  # 5 MB/s across all downloads
+    >>> MANAGER.pause()
+    >>> MANAGER.resume()
+
+    >>> print(f"{MANAGER.get_percent():.2f}% of {MANAGER.active_count()} active downloads")
+"""
+
+import time
+import enum
+import heapq
+import logging
+import itertools
+import threading
+
+
+MAX_ACTIVE_DOWNLOADS: int = 2  # Each download may open several connections of its own
+
+
+class DownloadPriority(enum.Enum):
+    """
+    Download priority, lower values are scheduled first
+
+    INTERACTIVE: User is waiting on the download
+    BACKGROUND:  Prefetching, yields to interactive downloads
+    """
+    INTERACTIVE = 0
+    BACKGROUND  = 1
+
+
+class DownloadYielded(Exception):
+    """
+    Raised through a background download's transfer so it can be requeued
+    """
+
+
+class _DownloadJob:
+    """
+    Queue entry for a single DownloadObject
+    """
+
+    def __init__(self, download_obj, priority: DownloadPriority, display_progress: bool, spawn_thread: bool, sequence: int, nested: bool = False) -> None:
+        self.download_obj     = download_obj
+        self.priority:         DownloadPriority = priority
+        self.display_progress: bool = display_progress
+        self.spawn_thread:     bool = spawn_thread
+        self.sequence:         int  = sequence
+        self.nested:           bool = nested  # Run from another job's thread, using its slot
+
+        self.started: threading.Event = threading.Event()
+
+
+    def __lt__(self, other: "_DownloadJob") -> bool:
+        return (self.priority.value, self.sequence) < (other.priority.value, other.sequence)
+
+
+class DownloadManager:
+    """
+    Download queue with priorities, a concurrency limit, bandwidth cap and pause/resume
+
+    Parameters:
+        max_active      (int): Maximum concurrent downloads
+        bandwidth_limit (int): Combined bytes per second cap, 0 for unlimited
+    """
+
+    def __init__(self, max_active: int = MAX_ACTIVE_DOWNLOADS, bandwidth_limit: int = 0) -> None:
+        self.max_active:      int = max(1, max_active)
+        self.bandwidth_limit: int = bandwidth_limit
+
+        self._condition: threading.Condition = threading.Condition()
+        self._sequence = itertools.count()
+
+        self._queue:  list = []  # heap of _DownloadJob
+        self._active: list = []  # _DownloadJob currently downloading
+        self._jobs:   list = []  # Every job since the manager was last idle, for aggregate progress
+
+        self._paused: bool = False
+        self._local = threading.local()  # Job running on the current thread
+
+        self._tokens:      float = 0.0
+        self._last_refill: float = time.time()
+
+
+    def submit(self, download_obj, priority: DownloadPriority = DownloadPriority.INTERACTIVE, display_progress: bool = False) -> None:
+        """
+        Queue a download, spawning its thread once scheduled
+
+        Parameters:
+            download_obj     (DownloadObject):   Download to queue
+            priority         (DownloadPriority): Scheduling priority
+            display_progress (bool):             Display progress in console
+        """
+
+        self._enqueue(download_obj, priority, display_progress, spawn_thread=True)
+
+
+    def run(self, download_obj, priority: DownloadPriority = DownloadPriority.INTERACTIVE, display_progress: bool = False) -> None:
+        """
+        Queue a download and run it in the current thread once scheduled
+
+        Blocks until the download finishes. Called from another download's thread,
+        the download runs immediately in that download's slot, as waiting for a
+        slot could deadlock
+
+        Parameters:
+            download_obj     (DownloadObject):   Download to run
+            priority         (DownloadPriority): Scheduling priority
+            display_progress (bool):             Display progress in console
+        """
+
+        job = self._enqueue(download_obj, priority, display_progress, spawn_thread=False, nested=getattr(self._local, "job", None) is not None)
+        while True:
+            job.started.wait()
+            if job not in self._active:
+                # Cancelled
+                return
+            if self._run_job(job) is True:
+                return
+
+
+    def cancel(self, download_obj) -> bool:
+        """
+        Remove a download from the queue if it hasn't started
+
+        Returns:
+            bool: True if the download was dequeued
+        """
+
+        with self._condition:
+            for job in self._queue:
+                if job.download_obj is download_obj:
+                    self._queue.remove(job)
+                    heapq.heapify(self._queue)
+                    self._jobs.remove(job)
+                    job.started.set()
+                    logging.info(f"- Removed {download_obj.filename} from download queue")
+                    return True
+        return False
+
+
+    def pause(self) -> None:
+        """
+        Pause all active downloads, queued downloads stay queued
+        """
+
+        with self._condition:
+            self._paused = True
+        logging.info("Pausing downloads")
+
+
+    def resume(self) -> None:
+        """
+        Resume paused downloads
+        """
+
+        with self._condition:
+            self._paused = False
+            self._condition.notify_all()
+        logging.info("Resuming downloads")
+
+
+    def is_paused(self) -> bool:
+        return self._paused
+
+
+    def set_bandwidth_limit(self, bytes_per_second: int) -> None:
+        """
+        Set the combined bandwidth cap
+
+        Parameters:
+            bytes_per_second (int): Cap in bytes per second, 0 for unlimited
+        """
+
+        with self._condition:
+            self.bandwidth_limit = max(0, int(bytes_per_second))
+            self._tokens = 0.0
+            self._last_refill = time.time()
+
+
+    def set_max_active(self, max_active: int) -> None:
+        """
+        Set the maximum number of concurrent downloads
+        """
+
+        with self._condition:
+            self.max_active = max(1, max_active)
+            self._schedule()
+
+
+    def throttle(self, download_obj, size: int) -> bool:
+        """
+        Called by downloads after writing each chunk
+
+        Blocks while paused, or until the bandwidth cap allows 'size' more bytes.
+        Raises DownloadYielded if a resumable background download should make
+        way for interactive ones, the download is requeued by the manager
+
+        Parameters:
+            download_obj (DownloadObject): Calling download
+            size         (int):            Bytes just received
+
+        Returns:
+            bool: True if the download was held (paused)
+        """
+
+        held = False
+        with self._condition:
+            if download_obj.should_stop is False and self._should_yield(download_obj):
+                raise DownloadYielded(download_obj.filename)
+
+            while download_obj.should_stop is False and self._paused:
+                held = True
+                self._condition.wait(0.5)
+
+            if self.bandwidth_limit <= 0:
+                return held
+
+            # Token bucket holding at most one second of bandwidth
+            now = time.time()
+            self._tokens = min(self.bandwidth_limit, self._tokens + (now - self._last_refill) * self.bandwidth_limit)
+            self._last_refill = now
+            self._tokens -= size
+            delay = -self._tokens / self.bandwidth_limit if self._tokens < 0 else 0
+
+        if delay > 0:
+            time.sleep(delay)
+
+        return held
+
+
+    def active_count(self) -> int:
+        return len(self._active)
+
+
+    def queued_count(self) -> int:
+        return len(self._queue)
+
+
+    def get_total_size(self) -> float:
+        """
+        Combined size of all current jobs, 0.0 if any size is unknown
+        """
+
+        with self._condition:
+            jobs = list(self._jobs)
+        if any(job.download_obj.total_file_size == 0.0 for job in jobs):
+            return 0.0
+        return sum(job.download_obj.total_file_size for job in jobs)
+
+
+    def get_downloaded_size(self) -> float:
+        with self._condition:
+            jobs = list(self._jobs)
+        return sum(job.download_obj.downloaded_file_size for job in jobs)
+
+
+    def get_percent(self) -> float:
+        """
+        Query the combined download percent of all current jobs
+
+        Returns:
+            float: The download percent, or -1 if unknown
+        """
+
+        total = self.get_total_size()
+        if total == 0.0:
+            return -1
+        return self.get_downloaded_size() / total * 100
+
+
+    def get_speed(self) -> float:
+        """
+        Combined speed of active downloads in bytes per second
+        """
+
+        with self._condition:
+            active = list(self._active)
+        return sum(job.download_obj.get_speed() for job in active)
+
+
+    def _enqueue(self, download_obj, priority: DownloadPriority, display_progress: bool, spawn_thread: bool, nested: bool = False) -> _DownloadJob:
+        job = _DownloadJob(download_obj, priority, display_progress, spawn_thread, next(self._sequence), nested)
+        with self._condition:
+            self._jobs.append(job)
+            if nested is True:
+                self._active.append(job)
+                job.started.set()
+                return job
+
+            heapq.heappush(self._queue, job)
+            self._schedule()
+            if not job.started.is_set():
+                logging.info(f"- Queued {download_obj.filename} ({priority.name.lower()} priority, {len(self._queue)} waiting)")
+        return job
+
+
+    def _interactive_pending(self) -> bool:
+        """
+        Whether an interactive job is running or waiting (lock held)
+        """
+
+        return any(job.priority == DownloadPriority.INTERACTIVE for job in self._active + self._queue)
+
+
+    def _should_yield(self, download_obj) -> bool:
+        """
+        Determine whether an active download should make way for interactive ones (lock held)
+
+        Only downloads that can resume from their .part file yield, others keep
+        their slot until they finish, as yielding would discard their progress
+        """
+
+        if getattr(download_obj, "priority", DownloadPriority.INTERACTIVE) != DownloadPriority.BACKGROUND:
+            return False
+        if any(job.nested for job in self._active if job.download_obj is download_obj):
+            return False
+        if not self._interactive_pending():
+            return False
+        return download_obj._can_resume()
+
+
+    def _can_start(self, job: _DownloadJob) -> bool:
+        """
+        Jobs start once a slot is free, background jobs also wait for all
+        interactive jobs to finish (lock held)
+        """
+
+        if len(self._active) >= self.max_active:
+            return False
+        if job.priority == DownloadPriority.BACKGROUND and self._interactive_pending():
+            return False
+        return True
+
+
+    def _schedule(self) -> None:
+        """
+        Start queued jobs while slots are available (lock held)
+        """
+
+        while self._queue and self._can_start(self._queue[0]):
+            job = heapq.heappop(self._queue)
+            self._active.append(job)
+            job.started.set()
+
+            if job.spawn_thread:
+                thread = threading.Thread(target=self._run_job, args=(job,))
+                job.download_obj.active_thread = thread
+                thread.start()
+
+
+    def _run_job(self, job: _DownloadJob) -> bool:
+        """
+        Run a scheduled job, requeueing it if it yielded
+
+        Returns:
+            bool: True if the job finished, False if it was requeued
+        """
+
+        yielded = False
+        parent_job = getattr(self._local, "job", None)
+        self._local.job = job
+        try:
+            job.download_obj._download(job.display_progress)
+        except DownloadYielded:
+            yielded = True
+        finally:
+            self._local.job = parent_job
+            with self._condition:
+                self._active.remove(job)
+                if yielded is True:
+                    job.started.clear()
+                    heapq.heappush(self._queue, job)
+                elif not self._active and not self._queue:
+                    self._jobs = []
+                self._schedule()
+                self._condition.notify_all()
+
+        return not yielded
+
+
+MANAGER = DownloadManager()
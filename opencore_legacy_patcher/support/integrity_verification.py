@@ -5,7 +5,10 @@ Based off of chunklist.py:
 - https://gist.github.com/dhinakg/cbe30edf31ddc153fd0b0c0570c9b041
 """
 
+import os
 import enum
+import mmap
+import bisect
 import hashlib
 import logging
 import binascii
@@ -13,9 +16,13 @@ import threading
 
 from typing import Union
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 CHUNK_LENGTH = 4 + 32
 
+REPAIR_ATTEMPTS:  int = 3
+REPAIR_MAX_RANGE: int = 1024 * 1024 * 64  # Largest byte range requested at once when repairing
+
 
 class ChunklistStatus(enum.Enum):
     """
@@ -26,6 +33,17 @@ class ChunklistStatus(enum.Enum):
     FAILURE     = 2
 
 
+class ChunklistEngine(enum.Enum):
+    """
+    Chunklist validation engine
+
+    SEQUENTIAL: Read and hash one chunk at a time
+    PARALLEL:   Memory-map the file and hash chunks on a worker pool
+    """
+    SEQUENTIAL = 0
+    PARALLEL   = 1
+
+
 class ChunklistVerification:
     """
     Library to validate Apple's files against their chunklist format
@@ -33,8 +51,10 @@ class ChunklistVerification:
     - Ref: https://github.com/apple-oss-distributions/xnu/blob/xnu-8020.101.4/bsd/kern/chunklist.h
 
     Parameters:
-        file_path      (Path): Path to the file to validate
-        chunklist_path (Path): Path to the chunklist file
+        file_path      (Path):            Path to the file to validate
+        chunklist_path (Path):            Path to the chunklist file
+        engine         (ChunklistEngine): Validation engine to use
+        workers        (int):             Worker count for the parallel engine, defaults to CPU count
 
     Usage:
         >>> chunk_obj = ChunklistVerification("InstallAssistant.pkg", "InstallAssistant.pkg.integrityDataV1")
@@ -44,9 +64,12 @@ class ChunklistVerification:
 
         >>> if chunk_obj.status == ChunklistStatus.FAILURE:
         ...     print(chunk_obj.error_msg)
+
+        >>> # Hash chunks across all cores
+        >>> chunk_obj = ChunklistVerification("InstallAssistant.pkg", "InstallAssistant.pkg.integrityDataV1", engine=ChunklistEngine.PARALLEL)
     """
 
-    def __init__(self, file_path: Path, chunklist_path: Union[Path, bytes]) -> None:
+    def __init__(self, file_path: Path, chunklist_path: Union[Path, bytes], engine: ChunklistEngine = ChunklistEngine.SEQUENTIAL, workers: int = None) -> None:
         if isinstance(chunklist_path, bytes):
             self.chunklist_path: bytes = chunklist_path
         else:
@@ -55,6 +78,9 @@ class ChunklistVerification:
 
         self.chunks: dict = self._generate_chunks(self.chunklist_path)
 
+        self.engine:  ChunklistEngine = engine
+        self.workers: int             = workers or os.cpu_count() or 1
+
         self.error_msg:     str = ""
         self.current_chunk: int = 0
         self.total_chunks:  int = len(self.chunks)
@@ -90,6 +116,12 @@ class ChunklistVerification:
         all_chunks = chunklist[header["chunkOffset"]:header["chunkOffset"]+header["chunkCount"]*CHUNK_LENGTH]
         chunks = [{"length": int.from_bytes(all_chunks[i:i+4], "little"), "checksum": all_chunks[i+4:i+CHUNK_LENGTH]} for i in range(0, len(all_chunks), CHUNK_LENGTH)]
 
+        # Resolve each chunk's byte offset within the file
+        offset = 0
+        for chunk in chunks:
+            chunk["offset"] = offset
+            offset += chunk["length"]
+
         return chunks
 
 
@@ -114,21 +146,476 @@ class ChunklistVerification:
             logging.info(self.error_msg)
             return
 
+        for index, status in self._iter_digests():
+            self.current_chunk += 1
+            if status != self.chunks[index]["checksum"]:
+                self._report_failure(self.chunks[index], status)
+                return
+
+        self.status = ChunklistStatus.SUCCESS
+
+
+    def _report_failure(self, chunk: dict, status: bytes) -> None:
+        """
+        Report the current chunk as failed
+        """
+
+        self.error_msg = f"Chunk {self.current_chunk} checksum status FAIL: chunk sum {binascii.hexlify(chunk['checksum']).decode()}, calculated sum {binascii.hexlify(status).decode()}"
+        self.status = ChunklistStatus.FAILURE
+        logging.info(self.error_msg)
+
+
+    def _iter_digests(self, indices: list = None):
+        """
+        Calculate chunk digests in order, using the configured engine
+
+        Parameters:
+            indices (list): Chunk indices to hash, defaults to all chunks
+
+        Yields:
+            tuple: (chunk index, calculated SHA-256 digest)
+        """
+
+        if indices is None:
+            indices = range(self.total_chunks)
+
+        if self.engine == ChunklistEngine.PARALLEL and self.file_path.stat().st_size > 0:
+            yield from self._iter_digests_parallel(indices)
+        else:
+            yield from self._iter_digests_sequential(indices)
+
+
+    def _iter_digests_sequential(self, indices: list):
+        """
+        Hash chunks one at a time
+        """
+
         with self.file_path.open("rb") as f:
-            for chunk in self.chunks:
+            for index in indices:
+                chunk = self.chunks[index]
+                if f.tell() != chunk["offset"]:
+                    f.seek(chunk["offset"])
+                yield index, hashlib.sha256(f.read(chunk["length"])).digest()
+
+
+    def _iter_digests_parallel(self, indices: list):
+        """
+        Hash chunks concurrently from a memory-mapped file
+
+        hashlib releases the GIL while hashing, so disjoint memoryview slices
+        can be hashed on a thread pool without copying.
+        Results are yielded in order, so progress and the first failing chunk
+        are reported identically to the sequential engine.
+        """
+
+        with self.file_path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            executor = ThreadPoolExecutor(max_workers=self.workers)
+            try:
+                def _hash_chunk(index: int) -> bytes:
+                    chunk = self.chunks[index]
+                    return hashlib.sha256(view[chunk["offset"]:chunk["offset"] + chunk["length"]]).digest()
+
+                for index, status in zip(indices, executor.map(_hash_chunk, indices)):
+                    yield index, status
+            finally:
+                # Stop hashing if the consumer bailed early (ie. on the first failure)
+                executor.shutdown(wait=True, cancel_futures=True)
+                view.release()
+
+
+    def find_failed_chunks(self) -> list:
+        """
+        Validate every chunk without stopping at the first failure
+
+        Chunks past the end of a truncated file are reported as failed
+
+        Returns:
+            list: Indices of chunks failing validation, None if the chunklist or file is invalid
+        """
+
+        if self.chunks is None or not Path(self.file_path).is_file():
+            return None
+
+        return [index for index, status in self._iter_digests() if status != self.chunks[index]["checksum"]]
+
+
+    def validate(self) -> None:
+        """
+        Spawns _validate() thread
+        """
+        threading.Thread(target=self._validate).start()
+
+
+
+class StreamingChunklistVerification(ChunklistVerification):
+    """
+    Validate a file against its chunklist while it's being downloaded
+
+    Bytes are fed through cursors as they arrive, each chunk is checked the moment
+    its last byte is received. Multiple cursors may feed disjoint, chunk-aligned
+    ranges concurrently (ie. segmented downloads).
+
+    Parameters:
+        file_path      (Path): Path to the file being written
+        chunklist_path (Path): Path to the chunklist file, or the chunklist itself
+
+    Usage:
+        >>> verifier = StreamingChunklistVerification("InstallAssistant.pkg.part", integrity_data)
+        >>> cursor = verifier.cursor(0)
+        >>> for data in response.iter_content():
+        ...     if cursor.update(data) is False:
+        ...         print(verifier.error_msg)
+        ...         break
+
+        >>> # Chunks not fully streamed (ie. resumed downloads) are read back from disk
+        >>> verifier.verify_remaining()
+        >>> verifier.status == ChunklistStatus.SUCCESS
+    """
+
+    def __init__(self, file_path: Path, chunklist_path: Union[Path, bytes]) -> None:
+        super().__init__(file_path, chunklist_path)
+
+        self._lock: threading.Lock = threading.Lock()
+
+        self.expected_size: int  = 0
+        self.verified:      list = []
+        self.failed_chunk:  int  = None
+        self._offsets:      list = []
+
+        if self.chunks is None:
+            self.error_msg = "Invalid chunklist"
+            self.status = ChunklistStatus.FAILURE
+            return
+
+        self.verified = [False] * self.total_chunks
+        self._offsets = [chunk["offset"] for chunk in self.chunks]
+        self.expected_size = sum(chunk["length"] for chunk in self.chunks)
+
+
+    def chunk_index(self, offset: int) -> int:
+        """
+        Index of the chunk containing the given byte offset
+        """
+
+        return bisect.bisect_right(self._offsets, offset) - 1
+
+
+    def align(self, offset: int) -> int:
+        """
+        Round a byte offset down to the start of its chunk
+        """
+
+        if offset >= self.expected_size:
+            return self.expected_size
+        return self.chunks[self.chunk_index(offset)]["offset"]
+
+
+    def cursor(self, offset: int = 0) -> "_ChunklistCursor":
+        """
+        Create a cursor to feed sequential bytes starting at the given offset
+        """
+
+        return _ChunklistCursor(self, offset)
+
+
+    def _record(self, index: int, digest: bytes) -> bool:
+        """
+        Record a calculated chunk digest
+
+        Returns:
+            bool: False if the chunk failed validation
+        """
+
+        chunk = self.chunks[index]
+        with self._lock:
+            if self.status == ChunklistStatus.FAILURE:
+                return False
+
+            if digest != chunk["checksum"]:
+                self.error_msg = f"Chunk {index + 1} checksum status FAIL: chunk sum {binascii.hexlify(chunk['checksum']).decode()}, calculated sum {binascii.hexlify(digest).decode()}"
+                self.status = ChunklistStatus.FAILURE
+                self.failed_chunk = index
+                logging.info(self.error_msg)
+                return False
+
+            if self.verified[index] is False:
+                self.verified[index] = True
                 self.current_chunk += 1
-                status = hashlib.sha256(f.read(chunk["length"])).digest()
-                if status != chunk["checksum"]:
-                    self.error_msg = f"Chunk {self.current_chunk} checksum status FAIL: chunk sum {binascii.hexlify(chunk['checksum']).decode()}, calculated sum {binascii.hexlify(status).decode()}"
+
+            if self.current_chunk == self.total_chunks:
+                self.status = ChunklistStatus.SUCCESS
+
+        return True
+
+
+    def reset(self) -> None:
+        """
+        Forget all recorded chunks, ie. after the file was repaired
+        """
+
+        with self._lock:
+            self.error_msg     = ""
+            self.status        = ChunklistStatus.IN_PROGRESS
+            self.failed_chunk  = None
+            self.current_chunk = 0
+            self.verified      = [False] * self.total_chunks
+
+
+    def _fail(self, error_msg: str) -> None:
+        with self._lock:
+            self.error_msg = error_msg
+            self.status = ChunklistStatus.FAILURE
+        logging.info(error_msg)
+
+
+    def verify_remaining(self) -> None:
+        """
+        Read back and validate chunks that weren't fully streamed
+        """
+
+        if self.status != ChunklistStatus.IN_PROGRESS:
+            return
+
+        if not Path(self.file_path).is_file():
+            self._fail(f"File {self.file_path} does not exist")
+            return
+
+        with self.file_path.open("rb") as f:
+            for index, chunk in enumerate(self.chunks):
+                if self.verified[index]:
+                    continue
+                f.seek(chunk["offset"])
+                if self._record(index, hashlib.sha256(f.read(chunk["length"])).digest()) is False:
+                    return
+
+
+class _ChunklistCursor:
+    """
+    Sequential feeder for StreamingChunklistVerification
+
+    If started mid-chunk, bytes up to the next chunk boundary are skipped,
+    leaving that chunk to StreamingChunklistVerification.verify_remaining()
+    """
+
+    def __init__(self, verifier: StreamingChunklistVerification, offset: int) -> None:
+        self.verifier: StreamingChunklistVerification = verifier
+
+        self.position: int = offset
+        self.index:    int = verifier.chunk_index(offset) if offset < verifier.expected_size else verifier.total_chunks
+        self.skipping: bool = self.index < verifier.total_chunks and verifier.chunks[self.index]["offset"] != offset
+
+        self._hash = hashlib.sha256()
+
+
+    def update(self, data: bytes) -> bool:
+        """
+        Feed the next bytes of the stream
+
+        Returns:
+            bool: False once any chunk has failed validation
+        """
+
+        verifier = self.verifier
+        view = memoryview(data)
+
+        while len(view) > 0:
+            if verifier.status == ChunklistStatus.FAILURE:
+                return False
+
+            if self.index >= verifier.total_chunks:
+                verifier._fail(f"File exceeds chunklist size of {verifier.expected_size} bytes")
+                return False
+
+            chunk = verifier.chunks[self.index]
+            chunk_end = chunk["offset"] + chunk["length"]
+            take = min(len(view), chunk_end - self.position)
+
+            if not self.skipping:
+                self._hash.update(view[:take])
+
+            self.position += take
+            view = view[take:]
+
+            if self.position == chunk_end:
+                if not self.skipping and verifier._record(self.index, self._hash.digest()) is False:
+                    return False
+                self.skipping = False
+                self._hash = hashlib.sha256()
+                self.index += 1
+
+        return verifier.status != ChunklistStatus.FAILURE
+
+
+class ChunklistRepair(ChunklistVerification):
+    """
+    Repair a corrupted file by refetching only the chunks failing validation
+
+    Failing chunks are mapped to their byte offsets and refetched with HTTP Range
+    requests. Refetched data is checked against the chunklist before being patched
+    into place, afterwards only the repaired chunks are re-verified from disk.
+
+    Parameters:
+        file_path      (Path):            Path to the file to repair
+        chunklist_path (Path):            Path to the chunklist file, or the chunklist itself
+        url            (str):             URL the file was downloaded from
+        engine         (ChunklistEngine): Engine used to scan for failing chunks
+        workers        (int):             Worker count for the parallel engine, defaults to CPU count
+
+    Usage:
+        >>> repair_obj = ChunklistRepair("InstallAssistant.pkg", "InstallAssistant.pkg.integrityDataV1", url)
+        >>> repair_obj.repair()
+        >>> while repair_obj.status == ChunklistStatus.IN_PROGRESS:
+        ...     print(f"Repaired {repair_obj.current_chunk} of {repair_obj.total_chunks} chunks")
+
+        >>> if repair_obj.status == ChunklistStatus.FAILURE:
+        ...     print(repair_obj.error_msg)
+    """
+
+    def __init__(self, file_path: Path, chunklist_path: Union[Path, bytes], url: str, engine: ChunklistEngine = ChunklistEngine.SEQUENTIAL, workers: int = None) -> None:
+        super().__init__(file_path, chunklist_path, engine, workers)
+
+        self.url: str = url
+
+        self.failed_chunks:  list = []
+        self.repaired_bytes: int  = 0
+
+
+    def _group_chunks(self, indices: list) -> list:
+        """
+        Group adjacent failing chunks into contiguous byte ranges
+
+        Parameters:
+            indices (list): Sorted failing chunk indices
+
+        Returns:
+            list: List of (start, stop, indices) tuples, stop being exclusive
+        """
+
+        groups = []
+        for index in indices:
+            chunk = self.chunks[index]
+            if groups and groups[-1][2][-1] == index - 1 and groups[-1][1] - groups[-1][0] < REPAIR_MAX_RANGE:
+                groups[-1][1] = chunk["offset"] + chunk["length"]
+                groups[-1][2].append(index)
+                continue
+            groups.append([chunk["offset"], chunk["offset"] + chunk["length"], [index]])
+
+        return [tuple(group) for group in groups]
+
+
+    def _fetch_range(self, start: int, stop: int, indices: list) -> bytes:
+        """
+        Fetch a byte range and verify it against the chunklist
+
+        Parameters:
+            start   (int):  First byte of the range
+            stop    (int):  End of the range (exclusive)
+            indices (list): Chunk indices covered by the range
+
+        Returns:
+            bytes: Verified data, None if all attempts failed
+        """
+
+        from . import network_handler
+
+        for attempt in range(1, REPAIR_ATTEMPTS + 1):
+            try:
+                response = network_handler.SESSION.get(self.url, headers={"Range": f"bytes={start}-{stop - 1}"}, timeout=10)
+            except Exception as e:
+                logging.info(f"- Attempt {attempt}: unable to fetch bytes {start}-{stop - 1}: {e}")
+                continue
+
+            if response.status_code != 206:
+                # Server doesn't support ranges, retrying won't help
+                logging.info(f"- Server did not honour range request (status code: {response.status_code})")
+                return None
+
+            data = response.content
+            if len(data) != stop - start:
+                logging.info(f"- Attempt {attempt}: expected {stop - start} bytes, received {len(data)}")
+                continue
+
+            view = memoryview(data)
+            for index in indices:
+                chunk = self.chunks[index]
+                relative = chunk["offset"] - start
+                if hashlib.sha256(view[relative:relative + chunk["length"]]).digest() != chunk["checksum"]:
+                    logging.info(f"- Attempt {attempt}: refetched chunk {index + 1} failed validation")
+                    break
+            else:
+                return data
+
+        return None
+
+
+    def _repair(self) -> None:
+        """
+        Scan, refetch and re-verify failing chunks
+        """
+
+        if self.chunks is None:
+            self.error_msg = "Invalid chunklist"
+            self.status = ChunklistStatus.FAILURE
+            logging.info(self.error_msg)
+            return
+
+        if not Path(self.file_path).is_file():
+            self.error_msg = f"File {self.file_path} does not exist"
+            self.status = ChunklistStatus.FAILURE
+            logging.info(self.error_msg)
+            return
+
+        logging.info(f"Scanning {self.file_path.name} for corrupted chunks")
+        self.failed_chunks = self.find_failed_chunks()
+
+        expected_size = sum(chunk["length"] for chunk in self.chunks)
+        if self.file_path.stat().st_size > expected_size:
+            logging.info(f"- Truncating {self.file_path.name} to {expected_size} bytes")
+            os.truncate(self.file_path, expected_size)
+
+        if not self.failed_chunks:
+            logging.info("- No corrupted chunks found")
+            self.status = ChunklistStatus.SUCCESS
+            return
+
+        self.current_chunk = 0
+        self.total_chunks  = len(self.failed_chunks)
+        logging.info(f"- Found {self.total_chunks} corrupted chunks, refetching")
+
+        with self.file_path.open("r+b") as f:
+            for start, stop, indices in self._group_chunks(self.failed_chunks):
+                data = self._fetch_range(start, stop, indices)
+                if data is None:
+                    self.error_msg = f"Unable to refetch chunks {indices[0] + 1}-{indices[-1] + 1} from {self.url}"
                     self.status = ChunklistStatus.FAILURE
                     logging.info(self.error_msg)
                     return
 
+                f.seek(start)
+                f.write(data)
+                self.repaired_bytes += len(data)
+                self.current_chunk  += len(indices)
+
+        # Only the patched chunks need re-verifying
+        for index, status in self._iter_digests(self.failed_chunks):
+            if status != self.chunks[index]["checksum"]:
+                self.current_chunk = index + 1
+                self._report_failure(self.chunks[index], status)
+                return
+
+        logging.info(f"- Repaired {self.total_chunks} chunks ({self.repaired_bytes} bytes)")
         self.status = ChunklistStatus.SUCCESS
 
 
-    def validate(self) -> None:
+    def repair(self, spawn_thread: bool = True) -> None:
         """
-        Spawns _validate() thread
+        Spawns _repair() thread
+
+        Parameters:
+            spawn_thread (bool): Repair in a background thread, otherwise block until done
         """
-        threading.Thread(target=self._validate).start()
+        if spawn_thread is False:
+            self._repair()
+            return
+        threading.Thread(target=self._repair).start()
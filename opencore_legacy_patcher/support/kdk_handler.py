@@ -19,12 +19,14 @@ from ..volume   import generate_copy_arguments
 
 from . import (
     network_handler,
+    download_handler,
     subprocess_wrapper
 )
 
 KDK_INSTALL_PATH: str  = "/Library/Developer/KDKs"
 KDK_INFO_PLIST:   str  = "KDKInfo.plist"
 KDK_API_LINK:     str  = "https://dortania.github.io/KdkSupportPkg/manifest.json"
+KDK_API_CACHE_TTL: int = 60 * 60  # Seconds before revalidating the cached KDK list
 
 KDK_ASSET_LIST:   list = None
 
@@ -114,7 +116,8 @@ class KernelDebugKitObject:
                 headers={
                     "User-Agent": f"OCLP/{self.constants.patcher_version}"
                 },
-                timeout=5
+                timeout=5,
+                cache_ttl=KDK_API_CACHE_TTL
             )
         except (requests.exceptions.Timeout, requests.exceptions.TooManyRedirects, requests.exceptions.ConnectionError):
             logging.info("Could not contact KDK API")
@@ -251,12 +254,13 @@ class KernelDebugKitObject:
         self.success = True
 
 
-    def retrieve_download(self, override_path: str = "") -> network_handler.DownloadObject:
+    def retrieve_download(self, override_path: str = "", priority: download_handler.DownloadPriority = download_handler.DownloadPriority.INTERACTIVE) -> network_handler.DownloadObject:
         """
         Returns a DownloadObject for the KDK
 
         Parameters:
-            override_path (str): Override the default download path
+            override_path (str):              Override the default download path
+            priority      (DownloadPriority): Scheduling priority, BACKGROUND for prefetches
 
         Returns:
             DownloadObject: DownloadObject for the KDK, None if no download required
@@ -282,7 +286,7 @@ class KernelDebugKitObject:
         kdk_plist_path = Path(f"{kdk_download_path.parent}/{KDK_INFO_PLIST}") if override_path == "" else Path(f"{Path(override_path).parent}/{KDK_INFO_PLIST}")
 
         self._generate_kdk_info_plist(kdk_plist_path)
-        return network_handler.DownloadObject(self.kdk_url, kdk_download_path)
+        return network_handler.DownloadObject(self.kdk_url, kdk_download_path, connections=4, priority=priority)
 
 
     def _generate_kdk_info_plist(self, plist_path: str) -> None:
@@ -18,7 +18,8 @@ from .. import constants
 
 from . import (
     analytics_handler,
-    global_settings
+    global_settings,
+    telemetry_handler
 )
 
 
@@ -117,6 +118,10 @@ class InitializeLoggingSupport:
         for log in logs[9:]:
             try:
                 log.unlink()
+                # Download metrics written alongside the log, see telemetry_handler
+                metrics = log.with_suffix(telemetry_handler.METRICS_SUFFIX)
+                if metrics.exists():
+                    metrics.unlink()
             except Exception as e:
                 logging.error(f"Failed to delete log file: {e}")
 
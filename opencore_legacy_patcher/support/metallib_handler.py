@@ -10,7 +10,7 @@ import packaging.version
 from typing  import cast
 from pathlib import Path
 
-from .  import network_handler, subprocess_wrapper
+from .  import network_handler, download_handler, subprocess_wrapper
 from .. import constants
 
 from ..datasets import os_data
@@ -18,6 +18,7 @@ from ..datasets import os_data
 
 METALLIB_INSTALL_PATH: str  = "/Library/Application Support/Dortania/MetallibSupportPkg"
 METALLIB_API_LINK:     str  = "https://dortania.github.io/MetallibSupportPkg/manifest.json"
+METALLIB_API_CACHE_TTL: int = 60 * 60  # Seconds before revalidating the cached metallib list
 
 METALLIB_ASSET_LIST:   list = None
 
@@ -75,7 +76,8 @@ class MetalLibraryObject:
                 headers={
                     "User-Agent": f"OCLP/{self.constants.patcher_version}"
                 },
-                timeout=5
+                timeout=5,
+                cache_ttl=METALLIB_API_CACHE_TTL
             )
         except (requests.exceptions.Timeout, requests.exceptions.TooManyRedirects, requests.exceptions.ConnectionError):
             logging.info("Could not contact MetallibSupportPkg API")
@@ -226,9 +228,13 @@ class MetalLibraryObject:
         return None
 
 
-    def retrieve_download(self, override_path: str = "") -> network_handler.DownloadObject:
+    def retrieve_download(self, override_path: str = "", priority: download_handler.DownloadPriority = download_handler.DownloadPriority.INTERACTIVE) -> network_handler.DownloadObject:
         """
         Retrieve MetallibSupportPkg PKG download object
+
+        Parameters:
+            override_path (str):              Override the default download path
+            priority      (DownloadPriority): Scheduling priority, BACKGROUND for prefetches
         """
 
         self.success = False
@@ -248,7 +254,7 @@ class MetalLibraryObject:
         self.success = True
 
         metallib_download_path = self.constants.metallib_download_path if override_path == "" else Path(override_path)
-        return network_handler.DownloadObject(self.metallib_url, metallib_download_path)
+        return network_handler.DownloadObject(self.metallib_url, metallib_download_path, priority=priority)
 
 
     def install_metallib(self, metallib: str = None) -> None:
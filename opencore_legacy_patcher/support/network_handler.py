@@ -5,21 +5,63 @@ Primarily based around the DownloadObject class, which provides a simple
 object for libraries to query download progress and status
 """
 
+import os
+import sys
 import time
+import errno
+import struct
 import requests
 import threading
 import logging
 import enum
 import hashlib
+import queue
 import atexit
+import plistlib
+import collections
 
-from typing import Optional, Union
+if sys.platform == "darwin":
+    import fcntl
+
+from typing import Optional, Union, Callable
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
-from . import utilities
+from . import (
+    utilities,
+    cache_handler,
+    download_handler,
+    telemetry_handler,
+    integrity_verification
+)
 
 SESSION = requests.Session()
 
+MAX_CONNECTIONS:      int = 8                  # Matches requests' default connection pool size (10) with headroom
+MIN_SEGMENT_SIZE:     int = 1024 * 1024 * 16   # Smaller files aren't worth splitting
+DOWNLOAD_CHUNK_SIZE:  int = 1024 * 1024 * 4
+PARTIAL_STATE_SAVE_INTERVAL: float = 5.0   # Seconds between partial-state sidecar writes
+PIPELINE_DEPTH:       int = 4                  # Buffers in flight per stream between network, disk and digest
+PIPELINE_READ_INTERVAL: float = 0.25           # Target seconds per network read, reads are sized to the observed throughput
+PIPELINE_MIN_READ_SIZE: int   = 1024 * 64
+
+# fcntl(2) preallocation on macOS, which lacks posix_fallocate
+F_PREALLOCATE:    int = 42
+F_ALLOCATECONTIG: int = 0x2
+F_ALLOCATEALL:    int = 0x4
+F_PEOFPOSMODE:    int = 3
+
+MIRROR_PROBE_SIZE:        int   = 1024 * 256   # Bytes sampled from each mirror when racing
+MIRROR_PROBE_TIMEOUT:     float = 5.0
+MIRROR_MIN_THROUGHPUT:    int   = 1024 * 512   # Bytes per second, below which the next mirror is tried
+MIRROR_THROUGHPUT_WINDOW: float = 15.0         # Seconds of throughput considered before switching
+
+
+class _MirrorStalled(Exception):
+    """
+    Raised mid-transfer when the current mirror's throughput drops below MIRROR_MIN_THROUGHPUT
+    """
+
 
 class DownloadStatus(enum.Enum):
     """
@@ -27,6 +69,7 @@ class DownloadStatus(enum.Enum):
     """
 
     INACTIVE:    str = "Inactive"
+    QUEUED:      str = "Queued"
     DOWNLOADING: str = "Downloading"
     ERROR:       str = "Error"
     COMPLETE:    str = "Complete"
@@ -83,19 +126,25 @@ class NetworkUtilities:
             return False
 
 
-    def get(self, url: str, **kwargs) -> requests.Response:
+    def get(self, url: str, cache_ttl: int = None, **kwargs) -> requests.Response:
         """
         Wrapper for requests's get method
         Implement additional error handling
 
         Parameters:
             url (str): URL to get
+            cache_ttl (int): If set, cache the response on disk and serve it without
+                             revalidation for this many seconds. Once expired, the request
+                             is revalidated with If-None-Match/If-Modified-Since
             **kwargs: Additional parameters for requests.get
 
         Returns:
             requests.Response: Response object from requests.get
         """
 
+        if cache_ttl is not None and not kwargs.get("stream", False):
+            return self._get_cached(url, cache_ttl, **kwargs)
+
         result: requests.Response = None
 
         try:
@@ -112,6 +161,85 @@ class NetworkUtilities:
 
         return result
 
+    def _get_cached(self, url: str, cache_ttl: int, **kwargs) -> requests.Response:
+        """
+        Conditional GET backed by cache_handler.ResponseCache
+
+        - Fresh entries (younger than cache_ttl) are served from disk
+        - Stale entries are revalidated, 304s are served from disk
+        - On network errors, stale entries are served rather than failing
+
+        Parameters:
+            url (str): URL to get
+            cache_ttl (int): Seconds a cached response is served without revalidation
+            **kwargs: Additional parameters for requests.get
+
+        Returns:
+            requests.Response: Response object, synthesised from disk if cached
+        """
+
+        cache = cache_handler.ResponseCache()
+        entry = cache.load(url)
+
+        if entry and time.time() - entry["Timestamp"] < cache_ttl:
+            return self._response_from_cache(url, entry)
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if entry:
+            if entry["ETag"]:
+                headers["If-None-Match"] = entry["ETag"]
+            if entry["Last-Modified"]:
+                headers["If-Modified-Since"] = entry["Last-Modified"]
+
+        try:
+            result = SESSION.get(url, headers=headers, **kwargs)
+        except (
+            requests.exceptions.Timeout,
+            requests.exceptions.TooManyRedirects,
+            requests.exceptions.ConnectionError,
+            requests.exceptions.HTTPError
+        ) as error:
+            logging.warn(f"Error calling requests.get: {error}")
+            if entry:
+                logging.info(f"- Serving stale cached response for {url}")
+                return self._response_from_cache(url, entry)
+            # Return empty response object
+            return requests.Response()
+
+        if result.status_code == 304 and entry:
+            cache.touch(url)
+            return self._response_from_cache(url, entry)
+
+        if result.status_code == 200:
+            cache.store(
+                url,
+                result.content,
+                etag=result.headers.get("ETag", ""),
+                last_modified=result.headers.get("Last-Modified", ""),
+                content_type=result.headers.get("Content-Type", "")
+            )
+
+        return result
+
+
+    def _response_from_cache(self, url: str, entry: dict) -> requests.Response:
+        """
+        Build a requests.Response from a cached entry
+        """
+
+        response = requests.Response()
+        response.url = url
+        response.status_code = 200
+        response.reason = "OK (cached)"
+        response._content = entry["Content"]
+        response.headers = requests.structures.CaseInsensitiveDict({
+            "ETag":          entry["ETag"],
+            "Last-Modified": entry["Last-Modified"],
+            "Content-Type":  entry.get("Content-Type", ""),
+        })
+        return response
+
+
     def post(self, url: str, **kwargs) -> requests.Response:
         """
         Wrapper for requests's post method
@@ -158,30 +286,104 @@ class DownloadObject:
 
         >>> print("Download complete"")
 
+        >>> # Segmented download, splitting the file into 4 concurrent byte ranges
+        >>> # Falls back to a single stream if the server doesn't support ranges
+        >>> download_object = DownloadObject(url, path, connections=4)
+
+    Interrupted downloads are kept as '<file>.part' alongside a '<file>.part.plist'
+    sidecar recording the URL, validators, expected size and completed ranges.
+    The next attempt resumes with HTTP Range requests if the validators still match.
+
+    Completed downloads are shared through cache_handler.ArtifactCache, so a later request
+    for the same URL + ETag (or the same SHA-256) is satisfied with a hardlink or clone.
+
+        >>> # Validate against Apple's chunklist while downloading, aborting on the first corrupt chunk
+        >>> download_object = DownloadObject(url, path, chunklist=integrity_data_bytes)
+        >>> download_object.download()
+        >>> download_object.chunklist_verification.status
+
+    Resumed data failing the chunklist is repaired in place with integrity_verification.ChunklistRepair,
+    refetching only the corrupt chunks.
+
+    Downloads are scheduled through download_handler.MANAGER, which enforces a global
+    concurrency limit and bandwidth cap, and lets interactive downloads take precedence.
+
+        >>> download_object = DownloadObject(url, path, priority=download_handler.DownloadPriority.BACKGROUND)
+
+    A list of mirrors may be passed instead of a single URL. Mirrors are raced (first-byte
+    latency plus a short throughput sample) and the fastest is used. If it fails or its
+    throughput drops below MIRROR_MIN_THROUGHPUT, the transfer continues from the next
+    mirror with HTTP Range requests.
+
+        >>> download_object = DownloadObject([primary_url, mirror_url], path)
+
+    Transfer metrics (connection timings, throughput, retries, cache and network bytes,
+    hashing time) are recorded in download_object.telemetry, see telemetry_handler.
+
     """
 
-    def __init__(self, url: str, path: str, checksum_algo: Optional["hashlib._Hash"] = None) -> None:
-        self.url:       str = url
+    def __init__(self, url: Union[str, list], path: str, checksum_algo: Optional["hashlib._Hash"] = None, connections: int = 1, use_cache: bool = True, expected_sha256: str = None, chunklist: Union[Path, bytes] = None, priority: download_handler.DownloadPriority = download_handler.DownloadPriority.INTERACTIVE) -> None:
+        self.mirrors:   list = [url] if isinstance(url, str) else list(url)
+        self.url:       str  = self.mirrors[0]
+        self._mirror_queue: list = self.mirrors[1:]  # Fallback mirrors, fastest first
+
+        if len(self.mirrors) > 1:
+            self._probe_mirrors()
+
         self.status:    str = DownloadStatus.INACTIVE
         self.error_msg: str = ""
         self.filename:  str = self._get_filename()
 
         self.filepath:  Path = Path(path)
+        self.part_path:  Path = self.filepath.with_name(f"{self.filepath.name}.part")
+        self.state_path: Path = self.filepath.with_name(f"{self.filepath.name}.part.plist")
 
         self.total_file_size:      float = 0.0
         self.downloaded_file_size: float = 0.0
         self.start_time:           float = time.time()
 
+        self.priority: download_handler.DownloadPriority = priority
+
+        self.connections:     int  = max(1, min(connections, MAX_CONNECTIONS))
+        self.supports_ranges: bool = False
+
+        self.etag:          str = ""
+        self.last_modified: str = ""
+        self.resumed_size:  int = 0
+
         self.error:             bool = False
         self.should_stop:       bool = False
+        self._abort_transfer:   bool = False  # Internal stop, ie. a failed segment or mirror switch
         self.download_complete: bool = False
         self.has_network:       bool = NetworkUtilities(self.url).verify_network_connection()
 
         self.active_thread: threading.Thread = None
+        self._progress_lock: threading.Lock  = threading.Lock()
+
+        self._completed_ranges: list  = []  # [start, stop) pairs written to the .part file
+        self._last_state_save:  float = 0.0
+
+        self._stage_times: dict = {"Network": 0.0, "Disk": 0.0, "Digest": 0.0}  # Busy time per pipeline stage
+
+        self._throughput_samples: collections.deque = collections.deque()  # (time, downloaded bytes) for mirror switching
+
+        self.telemetry: telemetry_handler.DownloadTelemetry = telemetry_handler.DownloadTelemetry(self.url, self.filename)
 
         self.checksum = None
         self._checksum_storage: Optional[hashlib._Hash] = checksum_algo
 
+        self.use_cache:       bool = use_cache
+        self.expected_sha256: str  = expected_sha256
+        self.from_cache:      bool = False
+        self._cache_digest: Optional[hashlib._Hash] = None  # SHA-256 for cache indexing, when checksum_algo isn't already SHA-256
+
+        self.chunklist_verification: Optional[integrity_verification.StreamingChunklistVerification] = None
+        if chunklist is not None:
+            self.chunklist_verification = integrity_verification.StreamingChunklistVerification(self.part_path, chunklist)
+            if self.chunklist_verification.status == integrity_verification.ChunklistStatus.FAILURE:
+                logging.info(f"Ignoring chunklist for {self.filename}: {self.chunklist_verification.error_msg}")
+                self.chunklist_verification = None
+
         if self.has_network:
             self._populate_file_size()
 
@@ -197,23 +399,26 @@ class DownloadObject:
         Spawns a thread to download the file, so that the main thread can continue
         Note sleep is disabled while the download is active
 
+        The download is queued with download_handler.MANAGER, and only starts once
+        a download slot is available
+
         Parameters:
             display_progress (bool): Display progress in console
             spawn_thread (bool): Spawn a thread to download the file, otherwise download in the current thread
             verify_checksum (Optional[hashlib._Hash]): Checksum algorithm to use for verifying the download, optional
 
         """
-        self.status = DownloadStatus.DOWNLOADING
+        if self.active_thread or self.status == DownloadStatus.QUEUED:
+            logging.error("Download already in progress")
+            return
+
+        self.status = DownloadStatus.QUEUED
         logging.info(f"Starting download: {self.filename}")
         if spawn_thread:
-            if self.active_thread:
-                logging.error("Download already in progress")
-                return
-            self.active_thread = threading.Thread(target=self._download, args=(display_progress,))
-            self.active_thread.start()
+            download_handler.MANAGER.submit(self, self.priority, display_progress)
             return
 
-        self._download(display_progress)
+        download_handler.MANAGER.run(self, self.priority, display_progress)
 
 
     def download_simple(self, verify_checksum: bool = False) -> Union[str, bool]:
@@ -236,7 +441,141 @@ class DownloadObject:
         if not self.download_complete:
             return False
 
-        return self._checksum_storage.hexdigest() if self._checksum_storage else True
+        return self.checksum if self._checksum_storage else True
+
+
+    def _probe_mirror(self, url: str) -> Optional[float]:
+        """
+        Sample a mirror's first MIRROR_PROBE_SIZE bytes
+
+        Returns:
+            float: Effective throughput in bytes per second including first-byte latency, None if unreachable
+        """
+
+        start = time.perf_counter()
+        try:
+            response = SESSION.get(url, headers={"Range": f"bytes=0-{MIRROR_PROBE_SIZE - 1}"}, stream=True, timeout=MIRROR_PROBE_TIMEOUT)
+            if response.status_code not in [200, 206]:
+                logging.info(f"- Mirror {url}: status code {response.status_code}")
+                return None
+
+            received = 0
+            first_byte = None
+            for chunk in response.iter_content(1024 * 64):
+                if first_byte is None:
+                    first_byte = time.perf_counter() - start
+                received += len(chunk)
+                if received >= MIRROR_PROBE_SIZE or time.perf_counter() - start > MIRROR_PROBE_TIMEOUT:
+                    break
+            response.close()
+        except Exception as e:
+            logging.info(f"- Mirror {url}: {e}")
+            return None
+
+        if received == 0:
+            return None
+
+        throughput = received / (time.perf_counter() - start)
+        logging.info(f"- Mirror {url}: first byte {first_byte * 1000:.0f}ms, {utilities.human_fmt(throughput)}/s")
+        return throughput
+
+
+    def _probe_mirrors(self) -> None:
+        """
+        Race all mirrors concurrently, using the fastest and queueing the rest as fallbacks
+        """
+
+        logging.info(f"Probing {len(self.mirrors)} mirrors")
+        with ThreadPoolExecutor(max_workers=len(self.mirrors)) as executor:
+            results = list(zip(self.mirrors, executor.map(self._probe_mirror, self.mirrors)))
+
+        ranked = [url for url, throughput in sorted(results, key=lambda result: result[1] or 0, reverse=True) if throughput]
+        if not ranked:
+            logging.info("- No mirror responded, using primary")
+            return
+
+        self.url = ranked[0]
+        self._mirror_queue = ranked[1:]
+        logging.info(f"- Using mirror: {self.url}")
+
+
+    def _switch_mirror(self, error: Exception) -> bool:
+        """
+        Continue the transfer from the next mirror serving the same file
+
+        Parameters:
+            error (Exception): Reason the current mirror is abandoned
+
+        Returns:
+            bool: True if switched, False if no usable mirror remains
+        """
+
+        if self.should_stop or not self._mirror_queue:
+            return False
+        if self.chunklist_verification and self.chunklist_verification.status == integrity_verification.ChunklistStatus.FAILURE:
+            return False
+
+        logging.info(f"- Abandoning mirror {self.url}: {error}")
+        while self._mirror_queue:
+            mirror = self._mirror_queue.pop(0)
+            try:
+                result = SESSION.head(mirror, allow_redirects=True, timeout=5)
+            except Exception as e:
+                logging.info(f"- Mirror {mirror} unreachable: {e}")
+                continue
+
+            if result.status_code != 200 or float(result.headers.get("Content-Length", 0)) != self.total_file_size:
+                logging.info(f"- Mirror {mirror} doesn't serve the same file, skipping")
+                continue
+
+            self.url             = mirror
+            self.supports_ranges = result.headers.get("Accept-Ranges", "").lower() == "bytes"
+            self.etag            = result.headers.get("ETag", "")
+            self.last_modified   = result.headers.get("Last-Modified", "")
+            self._throughput_samples.clear()
+
+            logging.info(f"- Continuing from mirror: {mirror}")
+            return True
+
+        return False
+
+
+    def _check_throughput(self) -> None:
+        """
+        Raise _MirrorStalled if throughput over the last MIRROR_THROUGHPUT_WINDOW seconds is too low
+
+        Only applies when fallback mirrors are available and no bandwidth cap is set
+        """
+
+        if not self._mirror_queue or download_handler.MANAGER.bandwidth_limit:
+            return
+
+        now = time.time()
+        with self._progress_lock:
+            samples = self._throughput_samples
+            samples.append((now, self.downloaded_file_size))
+            # Keep a single sample older than the window as the baseline
+            while len(samples) > 1 and samples[1][0] <= now - MIRROR_THROUGHPUT_WINDOW:
+                samples.popleft()
+
+            elapsed = now - samples[0][0]
+            if elapsed < MIRROR_THROUGHPUT_WINDOW:
+                return
+            throughput = (samples[-1][1] - samples[0][1]) / elapsed
+
+        if throughput < MIRROR_MIN_THROUGHPUT:
+            raise _MirrorStalled(f"Throughput dropped to {utilities.human_fmt(throughput)}/s")
+
+
+    def _reset_digests(self) -> None:
+        """
+        Restart running digests, before rehashing from the start of the file
+        """
+
+        if self._checksum_storage:
+            self._checksum_storage = hashlib.new(self._checksum_storage.name)
+        if self._cache_digest:
+            self._cache_digest = hashlib.sha256()
 
 
     def _get_filename(self) -> str:
@@ -259,6 +598,9 @@ class DownloadObject:
 
         try:
             result = SESSION.head(self.url, allow_redirects=True, timeout=5)
+            self.supports_ranges = result.headers.get("Accept-Ranges", "").lower() == "bytes"
+            self.etag            = result.headers.get("ETag", "")
+            self.last_modified   = result.headers.get("Last-Modified", "")
             if 'Content-Length' in result.headers:
                 self.total_file_size = float(result.headers['Content-Length'])
             else:
@@ -278,6 +620,88 @@ class DownloadObject:
         """
         if self._checksum_storage:
             self._checksum_storage.update(chunk)
+        if self._cache_digest:
+            self._cache_digest.update(chunk)
+
+
+    def _has_digests(self) -> bool:
+        """
+        Query whether any running digest needs to be fed
+        """
+
+        return self._checksum_storage is not None or self._cache_digest is not None
+
+
+    def _checksum_is_sha256(self) -> bool:
+        """
+        Query whether the requested checksum algorithm is SHA-256
+        """
+
+        return self._checksum_storage is not None and self._checksum_storage.name == "sha256"
+
+
+    def _retrieve_from_cache(self) -> bool:
+        """
+        Attempt to satisfy the download from the artifact cache
+
+        Returns:
+            bool: True if the file was placed from the cache
+        """
+
+        if self.use_cache is False:
+            return False
+
+        cache = cache_handler.ArtifactCache()
+        if cache.available is False:
+            return False
+
+        if not self.filepath.parent.exists():
+            self.filepath.parent.mkdir(parents=True, exist_ok=True)
+
+        object_path = cache.lookup(self.url, self.etag or self.last_modified or None, self.expected_sha256)
+        if object_path is None:
+            return False
+
+        if cache.retrieve(self.filepath, sha256=cache.checksum_for(object_path)) is False:
+            return False
+
+        self.from_cache = True
+        self.downloaded_file_size = float(self.filepath.stat().st_size)
+        self.telemetry.cache_bytes = int(self.downloaded_file_size)
+
+        if self.chunklist_verification:
+            self.chunklist_verification.file_path = self.filepath
+            self._finalize_verification()
+        if self.total_file_size == 0.0:
+            self.total_file_size = self.downloaded_file_size
+
+        if self._checksum_is_sha256():
+            self.checksum = cache.checksum_for(object_path)
+        elif self._checksum_storage:
+            start = time.perf_counter()
+            with open(self.filepath, 'rb') as file:
+                while chunk := file.read(DOWNLOAD_CHUNK_SIZE):
+                    self._checksum_storage.update(chunk)
+            self.checksum = self._checksum_storage.hexdigest()
+            self.telemetry.checksum_time += time.perf_counter() - start
+
+        return True
+
+
+    def _store_in_cache(self) -> None:
+        """
+        Add the completed download to the artifact cache
+        """
+
+        if self.use_cache is False:
+            return
+
+        sha256 = self.checksum if self._checksum_is_sha256() else self._cache_digest.hexdigest()
+        try:
+            cache_handler.ArtifactCache().store(self.filepath, self.url, self.etag or self.last_modified or None, sha256)
+        except Exception as e:
+            # Caching is best effort, never fail the download over it
+            logging.info(f"Unable to store {self.filename} in artifact cache: {e}")
 
 
     def _prepare_working_directory(self, path: Path) -> bool:
@@ -295,18 +719,23 @@ class DownloadObject:
             if Path(path).exists():
                 logging.info(f"Deleting existing file: {path}")
                 Path(path).unlink()
-                return True
 
             if not Path(path).parent.exists():
                 logging.info(f"Creating directory: {Path(path).parent}")
                 Path(path).parent.mkdir(parents=True, exist_ok=True)
 
+            self._load_partial_state()
+
+            required_space = self.total_file_size - self.resumed_size
             available_space = utilities.get_free_space(Path(path).parent)
-            if self.total_file_size > available_space:
-                msg = f"Not enough free space to download {self.filename}, need {utilities.human_fmt(self.total_file_size)}, have {utilities.human_fmt(available_space)}"
+            if required_space > available_space:
+                msg = f"Not enough free space to download {self.filename}, need {utilities.human_fmt(required_space)}, have {utilities.human_fmt(available_space)}"
                 logging.error(msg)
                 raise Exception(msg)
 
+            # Hold the space for the whole download, rather than discovering a full disk midway
+            self._reserve_part_file()
+
         except Exception as e:
             self.error = True
             self.error_msg = str(e)
@@ -318,6 +747,526 @@ class DownloadObject:
         return True
 
 
+    def _reserve_part_file(self) -> None:
+        """
+        Create the .part file, preallocating the full download size when known
+
+        Preallocation reserves the space up front and lets the filesystem lay the
+        file out contiguously, instead of growing it with every write
+        """
+
+        with open(self.part_path, 'r+b' if self.part_path.exists() else 'wb') as file:
+            size = int(self.total_file_size)
+            if size == 0:
+                return
+            try:
+                self._preallocate(file.fileno(), size)
+            except OSError as e:
+                if e.errno == errno.ENOSPC:
+                    raise Exception(f"Not enough free space to download {self.filename}, unable to reserve {utilities.human_fmt(size)}")
+                # Unsupported by the filesystem, fall back to a sparse file
+                logging.info(f"- Unable to preallocate {self.filename}: {e}")
+            if os.fstat(file.fileno()).st_size != size:
+                file.truncate(size)
+
+
+    @staticmethod
+    def _preallocate(fd: int, size: int) -> None:
+        """
+        Allocate disk blocks for the first 'size' bytes of a file, without changing existing data
+
+        Parameters:
+            fd   (int): File descriptor
+            size (int): Bytes to allocate
+        """
+
+        if hasattr(os, "posix_fallocate"):
+            os.posix_fallocate(fd, 0, size)
+            return
+
+        if sys.platform != "darwin":
+            return
+
+        # F_PEOFPOSMODE allocates relative to the physical end of file
+        length = size - os.fstat(fd).st_blocks * 512
+        if length <= 0:
+            return
+
+        try:
+            # fstore_t: fst_flags, fst_posmode, fst_offset, fst_length, fst_bytesalloc
+            fcntl.fcntl(fd, F_PREALLOCATE, struct.pack("Iiqqq", F_ALLOCATECONTIG | F_ALLOCATEALL, F_PEOFPOSMODE, 0, length, 0))
+        except OSError:
+            # Contiguous space unavailable, accept fragments
+            fcntl.fcntl(fd, F_PREALLOCATE, struct.pack("Iiqqq", F_ALLOCATEALL, F_PEOFPOSMODE, 0, length, 0))
+
+
+    def _can_resume(self) -> bool:
+        """
+        Determine whether a partial download can be safely resumed
+
+        Requires byte range support, a known file size and at least one validator (ETag or Last-Modified)
+        """
+
+        if self.supports_ranges is False:
+            return False
+        if self.total_file_size == 0.0:
+            return False
+        if self.etag == "" and self.last_modified == "":
+            return False
+        return True
+
+
+    def _discard_partial_state(self) -> None:
+        """
+        Remove the .part file and its sidecar, resetting resume state
+        """
+
+        for file in [self.part_path, self.state_path]:
+            if file.exists():
+                file.unlink()
+
+        self._completed_ranges = []
+        self.resumed_size = 0
+
+
+    def _load_partial_state(self) -> None:
+        """
+        Load the partial-state sidecar if it matches the current remote file
+
+        If the URL, validators or expected size changed, the partial download is discarded
+        """
+
+        self._completed_ranges = []
+        self.resumed_size = 0
+
+        if not self.part_path.exists() or not self.state_path.exists():
+            self._discard_partial_state()
+            return
+
+        try:
+            state = plistlib.load(self.state_path.open("rb"))
+        except Exception as e:
+            logging.info(f"Unable to read partial download state, discarding: {e}")
+            self._discard_partial_state()
+            return
+
+        if not self._can_resume() or any([
+            state.get("URL")           != self.url,
+            state.get("ETag")          != self.etag,
+            state.get("Last-Modified") != self.last_modified,
+            state.get("Size")          != int(self.total_file_size),
+            self.part_path.stat().st_size > int(self.total_file_size),
+        ]):
+            logging.info(f"Partial download of {self.filename} is stale, discarding")
+            self._discard_partial_state()
+            return
+
+        # Ignore ranges the .part file can't actually contain
+        part_size = self.part_path.stat().st_size
+        self._completed_ranges = [[start, min(stop, part_size)] for start, stop in self._merge_ranges(state.get("Ranges", [])) if start < part_size]
+        self.resumed_size = sum(stop - start for start, stop in self._completed_ranges)
+        self.downloaded_file_size = float(self.resumed_size)
+
+        logging.info(f"- Resuming {self.filename}: {utilities.human_fmt(self.resumed_size)} of {utilities.human_fmt(self.total_file_size)} already downloaded")
+
+
+    def _save_partial_state(self, force: bool = False) -> None:
+        """
+        Write the partial-state sidecar
+
+        Throttled to once every PARTIAL_STATE_SAVE_INTERVAL seconds unless forced
+
+        Parameters:
+            force (bool): Write regardless of the last save time
+        """
+
+        if not self._can_resume():
+            return
+
+        with self._progress_lock:
+            if force is False and time.time() - self._last_state_save < PARTIAL_STATE_SAVE_INTERVAL:
+                return
+            self._last_state_save = time.time()
+            ranges = self._merge_ranges(self._completed_ranges)
+
+        state = {
+            "URL":           self.url,
+            "ETag":          self.etag,
+            "Last-Modified": self.last_modified,
+            "Size":          int(self.total_file_size),
+            "Ranges":        ranges,
+        }
+
+        try:
+            temp_path = self.state_path.with_name(f"{self.state_path.name}.tmp")
+            plistlib.dump(state, temp_path.open("wb"))
+            temp_path.replace(self.state_path)
+        except Exception as e:
+            logging.info(f"Unable to save partial download state: {e}")
+
+
+    @staticmethod
+    def _merge_ranges(ranges: list) -> list:
+        """
+        Merge overlapping or adjacent [start, stop) ranges
+
+        Parameters:
+            ranges (list): List of [start, stop) pairs
+
+        Returns:
+            list: Sorted, merged list of [start, stop) pairs
+        """
+
+        merged = []
+        for start, stop in sorted([list(r) for r in ranges if r[1] > r[0]]):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], stop)
+                continue
+            merged.append([start, stop])
+        return merged
+
+
+    def _missing_ranges(self) -> list:
+        """
+        Determine byte ranges not yet present in the .part file
+
+        Returns:
+            list: List of [start, stop) pairs still to download
+        """
+
+        missing = []
+        position = 0
+        for start, stop in self._merge_ranges(self._completed_ranges):
+            if start > position:
+                missing.append([position, start])
+            position = max(position, stop)
+        if position < int(self.total_file_size):
+            missing.append([position, int(self.total_file_size)])
+        return missing
+
+
+    def _invalidate_range(self, start: int, stop: int) -> None:
+        """
+        Remove a byte range from the completed ranges, forcing it to be refetched on resume
+
+        Parameters:
+            start (int): First byte of the range
+            stop  (int): End of the range (exclusive)
+        """
+
+        with self._progress_lock:
+            remaining = []
+            for range_start, range_stop in self._merge_ranges(self._completed_ranges):
+                if range_stop <= start or range_start >= stop:
+                    remaining.append([range_start, range_stop])
+                    continue
+                if range_start < start:
+                    remaining.append([range_start, start])
+                if range_stop > stop:
+                    remaining.append([stop, range_stop])
+            self._completed_ranges = remaining
+
+
+    def _track_range(self, start: int) -> list:
+        """
+        Register a new range being written, returning the mutable [start, stop) entry
+
+        Parameters:
+            start (int): Offset the writer starts at
+        """
+
+        entry = [start, start]
+        with self._progress_lock:
+            self._completed_ranges.append(entry)
+        return entry
+
+
+    def _stream_verify(self, cursor, chunk: bytes) -> None:
+        """
+        Feed a chunk to the streaming chunklist verifier, aborting on failure
+
+        Parameters:
+            cursor: Cursor from StreamingChunklistVerification.cursor(), or None
+            chunk (bytes): Bytes just written
+        """
+
+        if cursor is None:
+            return
+        if cursor.update(chunk) is False:
+            raise Exception(f"Chunklist verification failed: {self.chunklist_verification.error_msg}")
+
+
+    def _finalize_verification(self) -> None:
+        """
+        Validate chunks that weren't streamed (resumed ranges or cache hits)
+        """
+
+        if self.chunklist_verification is None:
+            return
+
+        start = time.perf_counter()
+        self.chunklist_verification.verify_remaining()
+        if self.chunklist_verification.status == integrity_verification.ChunklistStatus.FAILURE and self.from_cache is False:
+            # Data already on disk (ie. resumed ranges) was corrupt, refetch only the failing chunks
+            self._repair_chunks()
+        self.telemetry.verification_time += time.perf_counter() - start
+        if self.chunklist_verification.status != integrity_verification.ChunklistStatus.SUCCESS:
+            raise Exception(f"Chunklist verification failed: {self.chunklist_verification.error_msg}")
+        logging.info(f"- Chunklist verified: {self.chunklist_verification.total_chunks} chunks")
+
+
+    def _repair_chunks(self) -> None:
+        """
+        Repair the transferred file with integrity_verification.ChunklistRepair, then re-verify it
+        """
+
+        if self.supports_ranges is False or self.chunklist_verification.failed_chunk is None:
+            return
+
+        logging.info(f"- Repairing {self.filename} from {self.url}")
+        repair_obj = integrity_verification.ChunklistRepair(self.part_path, self.chunklist_verification.chunklist_path, self.url)
+        repair_obj.repair(spawn_thread=False)
+        if repair_obj.status != integrity_verification.ChunklistStatus.SUCCESS:
+            return
+
+        # Digests were fed the corrupt data, re-verify and re-hash in a single pass
+        self.chunklist_verification.reset()
+        self._reset_digests()
+        cursor = self.chunklist_verification.cursor(0)
+        with self.part_path.open("rb") as file:
+            while chunk := file.read(DOWNLOAD_CHUNK_SIZE):
+                self._update_checksum(chunk)
+                if cursor.update(chunk) is False:
+                    return
+
+
+    def _should_segment(self) -> bool:
+        """
+        Determine whether the download should be split into concurrent byte ranges
+
+        Requires the server to advertise 'Accept-Ranges: bytes' and a known file size
+
+        Returns:
+            bool: True if segmented download should be used, False otherwise
+        """
+
+        if self.connections <= 1:
+            return False
+        if self.supports_ranges is False:
+            logging.info("Server does not support byte ranges, using single stream")
+            return False
+        if self.total_file_size < MIN_SEGMENT_SIZE * 2:
+            return False
+        return True
+
+
+    def _build_segments(self) -> list:
+        """
+        Split the missing byte ranges into segments for concurrent downloading
+
+        The largest segment is halved until there is one per connection,
+        or no segment is large enough to be worth splitting
+
+        Returns:
+            list: List of (start, end) tuples, end inclusive
+        """
+
+        segments = [list(r) for r in self._missing_ranges()]
+
+        while 0 < len(segments) < self.connections:
+            largest = max(segments, key=lambda r: r[1] - r[0])
+            if largest[1] - largest[0] < MIN_SEGMENT_SIZE * 2:
+                break
+            middle = largest[0] + (largest[1] - largest[0]) // 2
+            if self.chunklist_verification:
+                # Keep segments chunk-aligned so each can be verified as it streams
+                aligned = self.chunklist_verification.align(middle)
+                if aligned > largest[0]:
+                    middle = aligned
+            segments.append([middle, largest[1]])
+            largest[1] = middle
+
+        return [(start, stop - 1) for start, stop in sorted(segments)]
+
+
+    def _report_progress(self, chunk_size: int, display_progress: bool, iteration: int) -> None:
+        """
+        Update downloaded size and optionally display progress
+
+        Parameters:
+            chunk_size        (int): Size of the chunk just written
+            display_progress (bool): Display progress in console
+            iteration         (int): Chunk index, used to throttle console output
+        """
+
+        with self._progress_lock:
+            self.downloaded_file_size += chunk_size
+        self.telemetry.record_received(chunk_size)
+
+        self._save_partial_state()
+        if download_handler.MANAGER.throttle(self, chunk_size):
+            # Time spent paused says nothing about the mirror
+            self._throughput_samples.clear()
+
+        if display_progress and iteration % 100:
+            # Don't use logging here, as we'll be spamming the log file
+            if self.total_file_size == 0.0:
+                print(f"Downloaded {utilities.human_fmt(self.downloaded_file_size)} of {self.filename}")
+            else:
+                print(f"Downloaded {self.get_percent():.2f}% of {self.filename} ({utilities.human_fmt(self.get_speed())}/s) ({self.get_time_remaining():.2f} seconds remaining)")
+
+
+    def _run_pipeline(self, response: requests.Response, file, written: list, digest: Callable, display_progress: bool) -> None:
+        """
+        Stream a response into a file through a _DownloadPipeline
+
+        Parameters:
+            response (requests.Response): Streamed response
+            file     (BinaryIO):          File positioned where the response starts
+            written  (list):              [start, stop) entry from _track_range()
+            digest   (Callable):          Called with each chunk once written, in order
+            display_progress (bool):      Display progress in console
+        """
+
+        iteration = 0
+
+        def _on_received(size: int) -> None:
+            nonlocal iteration
+            if self.should_stop or self._abort_transfer:
+                raise Exception("Download stopped")
+            self._report_progress(size, display_progress, iteration)
+            self._check_throughput()
+            iteration += 1
+
+        pipeline = _DownloadPipeline(file, written, digest)
+        try:
+            pipeline.run(response, _on_received)
+        finally:
+            with self._progress_lock:
+                for stage, duration in pipeline.stage_times.items():
+                    self._stage_times[stage] += duration
+
+
+    def _download_single(self, display_progress: bool = False) -> None:
+        """
+        Download the file over a single stream
+
+        Parameters:
+            display_progress (bool): Display progress in console
+        """
+
+        self._reset_digests()
+
+        # Only a contiguous prefix can be continued over a single stream
+        missing = self._missing_ranges()
+        has_data = len(self._merge_ranges(self._completed_ranges)) > 0
+        offset = missing[0][0] if len(missing) == 1 and has_data else 0
+        if offset == 0 and has_data:
+            self._discard_partial_state()
+            self.downloaded_file_size = 0.0
+
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        response = NetworkUtilities().get(self.url, stream=True, timeout=10, headers=headers)
+        self.telemetry.record_response(response)
+        if offset and response.status_code != 206:
+            logging.info(f"Server ignored range request (status code: {response.status_code}), restarting download")
+            self._discard_partial_state()
+            self.downloaded_file_size = 0.0
+            offset = 0
+
+        # Discarding partial state removes the reservation
+        self._reserve_part_file()
+
+        with open(self.part_path, 'r+b') as file:
+            atexit.register(self.stop)
+            if offset:
+                # Rebuild the running checksum from the existing prefix
+                if self._has_digests():
+                    while file.tell() < offset:
+                        self._update_checksum(file.read(min(DOWNLOAD_CHUNK_SIZE, offset - file.tell())))
+                file.seek(offset)
+            if self.total_file_size == 0.0:
+                # Size unknown, nothing was preallocated
+                file.truncate(offset)
+
+            written = self._track_range(offset)
+            cursor = self.chunklist_verification.cursor(offset) if self.chunklist_verification else None
+
+            def _digest(chunk: memoryview) -> None:
+                self._update_checksum(chunk)
+                self._stream_verify(cursor, chunk)
+
+            self._run_pipeline(response, file, written, _digest, display_progress)
+
+            # The preallocated tail would otherwise pass for downloaded data
+            if self.total_file_size and file.tell() != int(self.total_file_size):
+                raise Exception(f"Incomplete download, stopped at {file.tell()} of {int(self.total_file_size)} bytes")
+
+
+    def _download_segment(self, start: int, end: int, display_progress: bool = False) -> None:
+        """
+        Download a single byte range and write it at its offset
+
+        Parameters:
+            start             (int): First byte of the range
+            end               (int): Last byte of the range (inclusive)
+            display_progress (bool): Display progress in console
+        """
+
+        response = SESSION.get(self.url, headers={"Range": f"bytes={start}-{end}"}, stream=True, timeout=10)
+        self.telemetry.record_response(response)
+        if response.status_code != 206:
+            raise Exception(f"Server did not honour range request ({start}-{end}), status code: {response.status_code}")
+
+        with open(self.part_path, 'r+b') as file:
+            file.seek(start)
+            written = self._track_range(start)
+            cursor = self.chunklist_verification.cursor(start) if self.chunklist_verification else None
+            self._run_pipeline(response, file, written, lambda chunk: self._stream_verify(cursor, chunk), display_progress)
+
+            if file.tell() != end + 1:
+                raise Exception(f"Incomplete segment {start}-{end}, stopped at {file.tell()}")
+
+
+    def _download_segmented(self, display_progress: bool = False) -> None:
+        """
+        Download the file as concurrent byte ranges into a preallocated file
+
+        Only ranges missing from a resumed .part file are requested
+
+        Parameters:
+            display_progress (bool): Display progress in console
+        """
+
+        segments = self._build_segments()
+        logging.info(f"- Downloading in {len(segments)} segments")
+
+        self._reserve_part_file()
+
+        atexit.register(self.stop)
+        with ThreadPoolExecutor(max_workers=len(segments)) as executor:
+            futures = [executor.submit(self._download_segment, start, end, display_progress) for start, end in segments]
+            try:
+                for future in futures:
+                    future.result()
+            except Exception:
+                # Halt remaining segments before surfacing the error
+                self._abort_transfer = True
+                for future in futures:
+                    if isinstance(future.exception(), download_handler.DownloadYielded):
+                        raise future.exception()
+                raise
+
+        if self._has_digests():
+            # Segments arrive out of order, hash the assembled file sequentially
+            start = time.perf_counter()
+            self._reset_digests()
+            with open(self.part_path, 'rb') as file:
+                while chunk := file.read(DOWNLOAD_CHUNK_SIZE):
+                    self._update_checksum(chunk)
+            self.telemetry.checksum_time += time.perf_counter() - start
+
+
     def _download(self, display_progress: bool = False) -> None:
         """
         Download the file
@@ -328,48 +1277,95 @@ class DownloadObject:
             display_progress (bool): Display progress in console
         """
 
+        self.status = DownloadStatus.DOWNLOADING
+        self.start_time = time.time()
+        self.telemetry.start()
         utilities.disable_sleep_while_running()
 
         try:
-            if not self.has_network:
-                raise Exception("No network connection")
-
-            if self._prepare_working_directory(self.filepath) is False:
-                raise Exception(self.error_msg)
-
-            response = NetworkUtilities().get(self.url, stream=True, timeout=10)
-
-            with open(self.filepath, 'wb') as file:
-                atexit.register(self.stop)
-                for i, chunk in enumerate(response.iter_content(1024 * 1024 * 4)):
-                    if self.should_stop:
-                        raise Exception("Download stopped")
-                    if chunk:
-                        file.write(chunk)
-                        self.downloaded_file_size += len(chunk)
-                        if self._checksum_storage:
-                            self._update_checksum(chunk)
-                        if display_progress and i % 100:
-                            # Don't use logging here, as we'll be spamming the log file
-                            if self.total_file_size == 0.0:
-                                print(f"Downloaded {utilities.human_fmt(self.downloaded_file_size)} of {self.filename}")
-                            else:
-                                print(f"Downloaded {self.get_percent():.2f}% of {self.filename} ({utilities.human_fmt(self.get_speed())}/s) ({self.get_time_remaining():.2f} seconds remaining)")
-                self.download_complete = True
-                logging.info(f"Download complete: {self.filename}")
-                logging.info("Stats:")
-                logging.info(f"- Downloaded size: {utilities.human_fmt(self.downloaded_file_size)}")
-                logging.info(f"- Time elapsed: {(time.time() - self.start_time):.2f} seconds")
-                logging.info(f"- Speed: {utilities.human_fmt(self.downloaded_file_size / (time.time() - self.start_time))}/s")
-                logging.info(f"- Location: {self.filepath}")
+            if self.use_cache and not self._checksum_is_sha256():
+                self._cache_digest = hashlib.sha256()
+
+            if self._retrieve_from_cache() is False:
+                if not self.has_network:
+                    raise Exception("No network connection")
+
+                if self._prepare_working_directory(self.filepath) is False:
+                    raise Exception(self.error_msg)
+
+                self.telemetry.probe_connection()
+                while True:
+                    self._abort_transfer = False
+                    try:
+                        if self._should_segment():
+                            self._download_segmented(display_progress)
+                        else:
+                            self._download_single(display_progress)
+                        break
+                    except download_handler.DownloadYielded:
+                        raise
+                    except Exception as e:
+                        abandoned = self.url
+                        if self._switch_mirror(e) is False:
+                            raise
+                        self.telemetry.record_retry(abandoned)
+
+                self._finalize_verification()
+                self.part_path.replace(self.filepath)
+                if self.state_path.exists():
+                    self.state_path.unlink()
+
                 if self._checksum_storage:
                     self.checksum = self._checksum_storage.hexdigest()
-                    logging.info(f"Checksum: {self.checksum}")
+                self._store_in_cache()
+
+            self.download_complete = True
+            logging.info(f"Download complete: {self.filename}")
+            logging.info("Stats:")
+            logging.info(f"- Downloaded size: {utilities.human_fmt(self.downloaded_file_size)}")
+            if self.resumed_size:
+                logging.info(f"- Resumed from: {utilities.human_fmt(self.resumed_size)}")
+            logging.info(f"- Time elapsed: {(time.time() - self.start_time):.2f} seconds")
+            logging.info(f"- Speed: {utilities.human_fmt(self.get_speed())}/s")
+            if self.telemetry.summary():
+                logging.info(f"- Connection: {self.telemetry.summary()}")
+            if self._stage_times["Network"]:
+                logging.info(f"- Pipeline busy time: {', '.join(f'{stage} {duration:.2f}s' for stage, duration in self._stage_times.items())}")
+            logging.info(f"- Location: {self.filepath}")
+            if len(self.mirrors) > 1:
+                logging.info(f"- Mirror: {self.url}")
+            if self.from_cache:
+                logging.info("- Source: Artifact cache")
+            if self.checksum:
+                logging.info(f"Checksum: {self.checksum}")
+        except download_handler.DownloadYielded:
+            # Connections are closed, resumed from the .part file once rescheduled
+            logging.info(f"- Yielding {self.filename} to interactive downloads")
+            self._save_partial_state(force=True)
+            self.status = DownloadStatus.QUEUED
+            utilities.enable_sleep_after_running()
+            raise
         except Exception as e:
             self.error = True
             self.error_msg = str(e)
             self.status = DownloadStatus.ERROR
             logging.error(f"Error downloading {self.url}: {self.error_msg}")
+            if self.chunklist_verification and self.chunklist_verification.status == integrity_verification.ChunklistStatus.FAILURE:
+                failed_chunk = self.chunklist_verification.failed_chunk
+                if failed_chunk is not None and self.part_path.exists() and self._can_resume():
+                    # Only the corrupt chunk needs refetching, keep the rest for resume
+                    chunk = self.chunklist_verification.chunks[failed_chunk]
+                    logging.info(f"- Marking chunk {failed_chunk + 1} ({utilities.human_fmt(chunk['length'])}) for refetch")
+                    self._invalidate_range(chunk["offset"], chunk["offset"] + chunk["length"])
+                    self._save_partial_state(force=True)
+                else:
+                    # Don't resume from known-corrupt data
+                    self._discard_partial_state()
+            elif self.part_path.exists():
+                self._save_partial_state(force=True)
+
+        self.telemetry.finish(self.url, self.download_complete, self.error_msg, self.resumed_size, self._stage_times)
+        self.telemetry.write()
 
         self.status = DownloadStatus.COMPLETE
         utilities.enable_sleep_after_running()
@@ -396,7 +1392,8 @@ class DownloadObject:
             float: The download speed in bytes per second
         """
 
-        return self.downloaded_file_size / (time.time() - self.start_time)
+        # Exclude bytes carried over from a resumed download
+        return (self.downloaded_file_size - self.resumed_size) / (time.time() - self.start_time)
 
 
     def get_time_remaining(self) -> float:
@@ -434,7 +1431,7 @@ class DownloadObject:
             boolean: True if active, False if completed, failed, stopped, or inactive
         """
 
-        if self.status == DownloadStatus.DOWNLOADING:
+        if self.status in [DownloadStatus.QUEUED, DownloadStatus.DOWNLOADING]:
             return True
         return False
 
@@ -447,6 +1444,183 @@ class DownloadObject:
         """
 
         self.should_stop = True
+        if download_handler.MANAGER.cancel(self):
+            self.error = True
+            self.error_msg = "Download stopped"
+            self.status = DownloadStatus.COMPLETE
+            return
         if self.active_thread:
             while self.active_thread.is_alive():
-                time.sleep(1)
\ No newline at end of file
+                time.sleep(1)
+
+class _DownloadPipeline:
+    """
+    Bounded network -> disk -> digest pipeline for a single stream
+
+    The network thread reads into buffers from a fixed pool and hands them to a
+    writer thread, which passes them on to a digest thread (checksums, chunklist)
+    before they return to the pool. Slow disks or hashing no longer stall socket
+    reads, and once every buffer is in flight the network thread blocks, applying
+    backpressure rather than growing memory use.
+
+    Reads go straight from the socket into the pooled buffers, and are sized to
+    roughly PIPELINE_READ_INTERVAL seconds of the observed throughput. Slow links
+    still report progress (and honour stop requests) frequently, while fast links
+    use the full buffer.
+
+    Parameters:
+        file    (BinaryIO): File positioned where the stream starts
+        written (list):     [start, stop) entry advanced as bytes reach the disk
+        digest  (Callable): Called with each written chunk, in order
+        depth   (int):      Number of buffers in the pool
+    """
+
+    def __init__(self, file, written: list, digest: Callable = None, depth: int = PIPELINE_DEPTH, chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> None:
+        self.file    = file
+        self.written: list     = written
+        self.digest:  Callable = digest
+
+        self.error: Optional[Exception] = None
+        self.stage_times: dict = {"Network": 0.0, "Disk": 0.0, "Digest": 0.0}
+
+        self.chunk_size: int = chunk_size
+        self.read_size:  int = min(chunk_size, PIPELINE_MIN_READ_SIZE * 16)  # Adapted per read
+
+        self._pool:         queue.Queue = queue.Queue()
+        self._write_queue:  queue.Queue = queue.Queue()
+        self._digest_queue: queue.Queue = queue.Queue()
+        for _ in range(max(1, depth)):
+            self._pool.put(bytearray(chunk_size))
+
+
+    def run(self, response: requests.Response, on_received: Callable) -> None:
+        """
+        Read the response to completion, blocking until all stages have drained
+
+        Parameters:
+            response    (requests.Response): Streamed response
+            on_received (Callable):          Called with the size of each read on the network thread,
+                                             raising aborts the pipeline
+        """
+
+        threads = [
+            threading.Thread(target=self._writer),
+            threading.Thread(target=self._digester),
+        ]
+        for thread in threads:
+            thread.start()
+
+        read = self._reader(response)
+        try:
+            while True:
+                buffer = self._acquire()
+
+                start = time.perf_counter()
+                size = read(memoryview(buffer)[:self.read_size])
+                elapsed = time.perf_counter() - start
+                self.stage_times["Network"] += elapsed
+
+                if size == 0:
+                    self._pool.put(buffer)
+                    break
+
+                self._write_queue.put((buffer, size))
+                self._adapt_read_size(size, elapsed)
+                on_received(size)
+        finally:
+            self._write_queue.put(None)
+            for thread in threads:
+                thread.join()
+            # The socket was read beneath urllib3, don't hand the connection back to the pool
+            response.close()
+
+        if self.error:
+            raise self.error
+
+
+    def _adapt_read_size(self, size: int, elapsed: float) -> None:
+        """
+        Size the next read to PIPELINE_READ_INTERVAL seconds at the throughput just observed
+        """
+
+        if size < self.read_size and elapsed < PIPELINE_READ_INTERVAL:
+            # Short read at EOF, says nothing about throughput
+            return
+
+        target = size / max(elapsed, 0.001) * PIPELINE_READ_INTERVAL
+        # Move halfway towards the target to smooth out bursts, in 64 KB steps
+        target = (self.read_size + target) / 2 // PIPELINE_MIN_READ_SIZE * PIPELINE_MIN_READ_SIZE
+        self.read_size = int(max(PIPELINE_MIN_READ_SIZE, min(self.chunk_size, target)))
+
+
+    @staticmethod
+    def _reader(response: requests.Response) -> Callable:
+        """
+        Build a function filling a buffer from the response, returning the size read (0 at EOF)
+        """
+
+        if response.headers.get("Content-Encoding", "identity") == "identity":
+            # Nothing to decode, read straight into the pooled buffer
+            # urllib3's readinto() copies through an intermediate bytes object, http.client's doesn't
+            raw = response.raw
+            fp = getattr(raw, "_fp", None)
+            if fp is not None and hasattr(fp, "readinto"):
+                return lambda buffer: fp.readinto(buffer)
+            return lambda buffer: raw.readinto(buffer)
+
+        chunks = response.iter_content(DOWNLOAD_CHUNK_SIZE)
+        pending = b""
+
+        def _read(buffer: memoryview) -> int:
+            nonlocal pending
+            if not pending:
+                pending = next(chunks, b"")
+            size = min(len(buffer), len(pending))
+            buffer[:size] = pending[:size]
+            pending = pending[size:]
+            return size
+
+        return _read
+
+
+    def _acquire(self) -> bytearray:
+        """
+        Take a free buffer from the pool, surfacing errors from the other stages
+        """
+
+        while True:
+            if self.error:
+                raise self.error
+            try:
+                return self._pool.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+
+    def _writer(self) -> None:
+        while (item := self._write_queue.get()) is not None:
+            buffer, size = item
+            if self.error is None:
+                start = time.perf_counter()
+                try:
+                    self.file.write(memoryview(buffer)[:size])
+                    self.written[1] += size
+                except Exception as e:
+                    self.error = e
+                self.stage_times["Disk"] += time.perf_counter() - start
+            self._digest_queue.put(item)
+
+        self._digest_queue.put(None)
+
+
+    def _digester(self) -> None:
+        while (item := self._digest_queue.get()) is not None:
+            buffer, size = item
+            if self.error is None and self.digest:
+                start = time.perf_counter()
+                try:
+                    self.digest(memoryview(buffer)[:size])
+                except Exception as e:
+                    self.error = e
+                self.stage_times["Digest"] += time.perf_counter() - start
+            self._pool.put(buffer)
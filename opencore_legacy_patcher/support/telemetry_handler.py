@@ -0,0 +1,263 @@
+"""
+telemetry_handler.py: Per-download transfer metrics
+
+Each network_handler.DownloadObject records a DownloadTelemetry, separating
+CDN behaviour (time to first byte, throughput, probed DNS/connect/TLS timings)
+from local bottlenecks (disk writes, hashing, chunklist verification).
+
+When logging to file, completed downloads are appended as JSON lines to a
+metrics file next to the log:
+    ~/Library/Logs/Dortania/OpenCore-Patcher_<version>_<time>.downloads.jsonl
+
+Usage:
+    >>> download_obj = network_handler.DownloadObject(url, path)
+    >>> download_obj.download(spawn_thread=False)
+    >>> download_obj.telemetry.to_dict()
+"""
+
+import ssl
+import json
+import time
+import socket
+import logging
+import threading
+import urllib.parse
+
+import requests
+
+from typing  import Optional
+from pathlib import Path
+
+
+TELEMETRY_SAMPLE_INTERVAL: float = 1.0            # Seconds between throughput samples
+METRICS_SUFFIX:            str   = ".downloads.jsonl"
+PROBE_TIMEOUT:             float = 5.0
+
+_WRITE_LOCK: threading.Lock = threading.Lock()
+
+
+def metrics_path() -> Optional[Path]:
+    """
+    Metrics file next to the active log file
+
+    Returns:
+        Path: Metrics file path, or None if not logging to file
+    """
+
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.FileHandler):
+            return Path(handler.baseFilename).with_suffix(METRICS_SUFFIX)
+    return None
+
+
+class DownloadTelemetry:
+    """
+    Structured metrics for a single download
+
+    Connection timings (DNS, connect, TLS) are measured on a separate probe
+    connection to the same host while the download runs, as requests' connection
+    pool doesn't expose them, and are recorded as probe timings. They describe the
+    host, not the download's own connection, which may have been reused. Time to
+    first byte is taken from the download's first response.
+
+    Parameters:
+        url      (str): URL being downloaded
+        filename (str): Name of the downloaded file
+    """
+
+    def __init__(self, url: str, filename: str) -> None:
+        self.url:      str = url
+        self.filename: str = filename
+
+        self.started:  float = time.time()
+        self.duration: float = 0.0
+
+        self.probe_dns_time:     Optional[float] = None  # Seconds, measured on the probe connection
+        self.probe_connect_time: Optional[float] = None
+        self.probe_tls_time:     Optional[float] = None
+        self.ttfb:               Optional[float] = None  # Seconds, measured on the download's connection
+
+        self.throughput: list = []  # [seconds since start, bytes per second]
+
+        self.retries:         int  = 0
+        self.mirror_switches: list = []  # Mirrors abandoned, in order
+
+        self.network_bytes: int = 0
+        self.cache_bytes:   int = 0
+        self.resumed_bytes: int = 0
+
+        self.checksum_time:     float = 0.0  # Hashing outside the pipeline (cache hits, reassembled segments)
+        self.verification_time: float = 0.0  # Chunklist verification of ranges that weren't streamed
+        self.stage_times:       dict  = {}   # Pipeline busy time per stage
+
+        self.complete:  bool = False
+        self.error_msg: str  = ""
+
+        self._lock:         threading.Lock   = threading.Lock()
+        self._probe_thread: threading.Thread = None
+        self._sample_time:  float = time.perf_counter()
+        self._sample_bytes: int   = 0
+
+
+    def start(self) -> None:
+        """
+        Reset the clock, called when the download leaves the queue
+        """
+
+        self.started = time.time()
+        self._sample_time = time.perf_counter()
+        self._sample_bytes = self.network_bytes
+
+
+    def probe_connection(self) -> None:
+        """
+        Measure DNS, connect and TLS handshake times to the download's host on a separate probe connection in the background
+        """
+
+        if self._probe_thread is not None:
+            return
+        self._probe_thread = threading.Thread(target=self._probe_connection, args=(self.url,), daemon=True)
+        self._probe_thread.start()
+
+
+    def _probe_connection(self, url: str) -> None:
+        parsed = urllib.parse.urlsplit(url)
+        https = parsed.scheme == "https"
+        port = parsed.port or (443 if https else 80)
+
+        connection = None
+        try:
+            start = time.perf_counter()
+            family, sock_type, proto, _, address = socket.getaddrinfo(parsed.hostname, port, type=socket.SOCK_STREAM)[0]
+            self.probe_dns_time = time.perf_counter() - start
+
+            connection = socket.socket(family, sock_type, proto)
+            connection.settimeout(PROBE_TIMEOUT)
+            start = time.perf_counter()
+            connection.connect(address)
+            self.probe_connect_time = time.perf_counter() - start
+
+            if https:
+                context = ssl.create_default_context(cafile=requests.certs.where())
+                start = time.perf_counter()
+                connection = context.wrap_socket(connection, server_hostname=parsed.hostname)
+                self.probe_tls_time = time.perf_counter() - start
+        except Exception as e:
+            logging.info(f"- Unable to measure connection timings for {parsed.hostname}: {e}")
+        finally:
+            if connection:
+                connection.close()
+
+
+    def record_response(self, response: requests.Response) -> None:
+        """
+        Record time to first byte from the first response received
+        """
+
+        if self.ttfb is None and response.elapsed:
+            self.ttfb = response.elapsed.total_seconds()
+
+
+    def record_received(self, size: int) -> None:
+        """
+        Count bytes received from the network, sampling throughput every TELEMETRY_SAMPLE_INTERVAL
+        """
+
+        with self._lock:
+            self.network_bytes += size
+            now = time.perf_counter()
+            elapsed = now - self._sample_time
+            if elapsed < TELEMETRY_SAMPLE_INTERVAL:
+                return
+            self.throughput.append([round(time.time() - self.started, 2), round((self.network_bytes - self._sample_bytes) / elapsed)])
+            self._sample_time = now
+            self._sample_bytes = self.network_bytes
+
+
+    def record_retry(self, abandoned_mirror: str = None) -> None:
+        with self._lock:
+            self.retries += 1
+            if abandoned_mirror:
+                self.mirror_switches.append(abandoned_mirror)
+
+
+    def finish(self, url: str, complete: bool, error_msg: str, resumed_bytes: int, stage_times: dict) -> None:
+        """
+        Finalise metrics once the download completes or fails
+        """
+
+        self.url           = url
+        self.complete      = complete
+        self.error_msg     = error_msg
+        self.resumed_bytes = int(resumed_bytes)
+        self.stage_times   = dict(stage_times)
+        self.duration      = time.time() - self.started
+        self._wait_for_probe()
+
+
+    def _wait_for_probe(self) -> None:
+        if self._probe_thread:
+            self._probe_thread.join(PROBE_TIMEOUT)
+
+
+    def summary(self) -> str:
+        """
+        Single line summary of connection timings, for logging
+        """
+
+        self._wait_for_probe()
+
+        timings = {"First byte": self.ttfb, "Probe DNS": self.probe_dns_time, "Probe connect": self.probe_connect_time, "Probe TLS": self.probe_tls_time}
+        return ", ".join(f"{name} {value * 1000:.0f}ms" for name, value in timings.items() if value is not None)
+
+
+    def to_dict(self) -> dict:
+        def _milliseconds(value: Optional[float]) -> Optional[float]:
+            return round(value * 1000, 2) if value is not None else None
+
+        return {
+            "URL":       self.url,
+            "Filename":  self.filename,
+            "Started":   time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "Duration":  round(self.duration, 3),
+            "Complete":  self.complete,
+            "Error":     self.error_msg,
+            "Timings": {
+                "FirstByte": _milliseconds(self.ttfb),
+            },
+            "ProbeTimings": {
+                "DNS":     _milliseconds(self.probe_dns_time),
+                "Connect": _milliseconds(self.probe_connect_time),
+                "TLS":     _milliseconds(self.probe_tls_time),
+            },
+            "Bytes": {
+                "Network": self.network_bytes,
+                "Cache":   self.cache_bytes,
+                "Resumed": self.resumed_bytes,
+            },
+            "Throughput":     self.throughput,
+            "Retries":        self.retries,
+            "MirrorSwitches": self.mirror_switches,
+            "ChecksumTime":     round(self.checksum_time, 3),
+            "VerificationTime": round(self.verification_time, 3),
+            "StageTimes":     {stage: round(duration, 3) for stage, duration in self.stage_times.items()},
+        }
+
+
+    def write(self, path: Path = None) -> None:
+        """
+        Append metrics as a JSON line
+
+        Parameters:
+            path (Path): Metrics file, defaults to metrics_path(). Nothing is written if unavailable.
+        """
+
+        path = path or metrics_path()
+        if path is None:
+            return
+
+        try:
+            with _WRITE_LOCK, open(path, "a") as file:
+                file.write(json.dumps(self.to_dict()) + "\n")
+        except Exception as e:
+            logging.info(f"- Unable to write download metrics: {e}")
@@ -16,6 +16,7 @@ from .. import constants
 
 
 REPO_LATEST_RELEASE_URL: str = "https://api.github.com/repos/dortania/OpenCore-Legacy-Patcher/releases/latest"
+REPO_LATEST_RELEASE_CACHE_TTL: int = 60 * 15  # Seconds before revalidating, conditional requests don't count against GitHub's rate limit
 
 
 class CheckBinaryUpdates:
@@ -95,10 +96,10 @@ class CheckBinaryUpdates:
             # We already checked
             return self.latest_details
 
-        if not network_handler.NetworkUtilities(REPO_LATEST_RELEASE_URL).verify_network_connection():
+        response = network_handler.NetworkUtilities().get(REPO_LATEST_RELEASE_URL, cache_ttl=REPO_LATEST_RELEASE_CACHE_TTL)
+        if response.status_code != 200:
             return None
 
-        response = network_handler.NetworkUtilities().get(REPO_LATEST_RELEASE_URL)
         data_set = response.json()
 
         if "tag_name" not in data_set:
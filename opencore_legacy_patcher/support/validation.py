@@ -2,8 +2,11 @@
 validation.py: Validation class for the patcher
 """
 
+import copy
 import atexit
+import shutil
 import logging
+import tempfile
 import subprocess
 
 from pathlib import Path
@@ -13,7 +16,8 @@ from . import network_handler
 from .. import constants
 
 from ..sys_patch import sys_patch_helpers
-from ..efi_builder import build
+from ..efi_builder import batch as batch_build
+from ..efi_builder import build, incremental
 from ..support import subprocess_wrapper
 
 from ..datasets import (
@@ -73,46 +77,28 @@ class PatcherValidation:
         ]
 
         self._validate_configs()
+        self._validate_incremental_builds()
         self._validate_sys_patch()
 
 
-    def _build_prebuilt(self) -> None:
+    def _build_prebuilt(self, batch: batch_build.BatchBuild, label: str) -> None:
         """
-        Generate a build for each predefined model
-        Then validate against ocvalidate
+        Queue a build for each predefined model
+        Validated against validator.ConfigValidator
         """
 
         for model in model_array.SupportedSMBIOS:
-            logging.info(f"Validating predefined model: {model}")
-            self.constants.custom_model = model
-            build.BuildOpenCore(self.constants.custom_model, self.constants)
-            result = subprocess.run([self.constants.ocvalidate_path, f"{self.constants.opencore_release_folder}/EFI/OC/config.plist"], stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-            if result.returncode != 0:
-                logging.info("Error on build!")
-                subprocess_wrapper.log(result)
-                raise Exception(f"Validation failed for predefined model: {model}")
-            else:
-                logging.info(f"Validation succeeded for predefined model: {model}")
-
-
-    def _build_dumps(self) -> None:
+            batch.add(f"{label}/{model}", model)
+
+
+    def _build_dumps(self, batch: batch_build.BatchBuild, label: str) -> None:
         """
-        Generate a build for each predefined model
-        Then validate against ocvalidate
+        Queue a build for each dumped model
+        Validated against validator.ConfigValidator
         """
 
-        for model in self.valid_dumps:
-            self.constants.computer = model
-            self.constants.custom_model = ""
-            logging.info(f"Validating dumped model: {self.constants.computer.real_model}")
-            build.BuildOpenCore(self.constants.computer.real_model, self.constants)
-            result = subprocess.run([self.constants.ocvalidate_path, f"{self.constants.opencore_release_folder}/EFI/OC/config.plist"], stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-            if result.returncode != 0:
-                logging.info("Error on build!")
-                subprocess_wrapper.log(result)
-                raise Exception(f"Validation failed for predefined model: {self.constants.computer.real_model}")
-            else:
-                logging.info(f"Validation succeeded for predefined model: {self.constants.computer.real_model}")
+        for index, model in enumerate(self.valid_dumps):
+            batch.add(f"{label}/{model.real_model}-{index}", model.real_model, computer=model)
 
 
     def _validate_root_patch_files(self, major_kernel: int, minor_kernel: int) -> None:
@@ -311,14 +297,43 @@ class PatcherValidation:
                 logging.info(f"  {file}")
 
 
+    def _validate_incremental_builds(self) -> None:
+        """
+        Validates that only build settings invalidate a previous build
+        """
+
+        build_constants = copy.deepcopy(self.constants)
+        build_constants.custom_model = "MacBookPro11,1"
+        build_constants.build_path_override = Path(tempfile.mkdtemp(prefix="oclp-incremental-"))
+
+        try:
+            build.BuildOpenCore(build_constants.custom_model, build_constants)
+
+            # App settings, ie. changed from the GUI settings screen
+            build_constants.download_bandwidth_limit += 1
+            build_constants.ignore_updates = not build_constants.ignore_updates
+            build_constants.should_nuke_kdks = not build_constants.should_nuke_kdks
+            if incremental.BuildManifest(build_constants.custom_model, build_constants).is_current() is False:
+                raise Exception("Previous build invalidated by settings with no effect on the EFI")
+
+            build_constants.verbose_debug = not build_constants.verbose_debug
+            if incremental.BuildManifest(build_constants.custom_model, build_constants).is_current() is True:
+                raise Exception("Previous build reused despite a changed build setting")
+        finally:
+            shutil.rmtree(build_constants.build_path_override, ignore_errors=True)
+
+
     def _validate_configs(self) -> None:
         """
         Validates build modules
         """
 
+        # Each job snapshots the settings at the time it's queued, and builds in its own folder
+        batch = batch_build.BatchBuild(self.constants)
+
         # First run is with default settings
-        self._build_prebuilt()
-        self._build_dumps()
+        self._build_prebuilt(batch, "Default")
+        self._build_dumps(batch, "Default")
 
         # Second run, flip all settings
         self.constants.verbose_debug = True
@@ -337,7 +352,17 @@ class PatcherValidation:
         self.constants.software_demux = True
         self.constants.serial_settings = "Minimal"
 
-        self._build_prebuilt()
-        self._build_dumps()
+        self._build_prebuilt(batch, "Flipped")
+        self._build_dumps(batch, "Flipped")
+
+        report = batch.run()
+        batch.log_report(report)
+        if report["Failed"] > 0:
+            failed = [result["Name"] for result in report["Results"] if not result["Success"]]
+            raise Exception(f"Validation failed for models: {', '.join(failed)}")
+
+        # Builds no longer modify self.constants, leave it as sequential builds did for the remaining validation
+        self.constants.computer = self.valid_dumps[-1]
+        self.constants.custom_model = ""
 
         subprocess.run(["/bin/rm", "-rf", self.constants.build_path], stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
\ No newline at end of file
@@ -12,7 +12,7 @@ import threading
 from pathlib import Path
 
 from .. import constants
-from ..support import kdk_handler, utilities, metallib_handler
+from ..support import kdk_handler, utilities, metallib_handler, download_handler
 from ..wx_gui import gui_support, gui_download
 
 from ..sys_patch.patchsets import HardwarePatchsetDetection, HardwarePatchsetSettings
@@ -90,12 +90,12 @@ class OSUpdateFrame(wx.Frame):
 
         if self.kdk_obj:
             if self.kdk_obj.success is True:
-                result = self.kdk_obj.retrieve_download()
+                result = self.kdk_obj.retrieve_download(priority=download_handler.DownloadPriority.BACKGROUND)
                 if result is not None:
                     download_objects[f"KDK Build {self.kdk_obj.kdk_url_build}"] = result
         if self.metallib_obj:
             if self.metallib_obj.success is True:
-                result = self.metallib_obj.retrieve_download()
+                result = self.metallib_obj.retrieve_download(priority=download_handler.DownloadPriority.BACKGROUND)
                 if result is not None:
                     download_objects[f"Metallib Build {self.metallib_obj.metallib_url_build}"] = result
 
@@ -12,6 +12,7 @@ from ..wx_gui import gui_support
 
 from ..support import (
     network_handler,
+    download_handler,
     utilities
 )
 
@@ -65,6 +66,12 @@ class DownloadFrame(wx.Frame):
         return_button.Bind(wx.EVT_BUTTON, lambda event: self.terminate_download())
         return_button.Centre(wx.HORIZONTAL)
 
+        # Pause applies to every download scheduled through download_handler.MANAGER
+        pause_button = wx.Button(frame, label="Resume" if download_handler.MANAGER.is_paused() else "Pause", pos=(-1, return_button.GetPosition()[1]))
+        pause_button.Bind(wx.EVT_BUTTON, lambda event: self.toggle_pause(pause_button))
+        pause_button.SetPosition((return_button.GetPosition()[0] - pause_button.GetSize()[0] // 2 - 5, return_button.GetPosition()[1]))
+        return_button.SetPosition((return_button.GetPosition()[0] + return_button.GetSize()[0] // 2 + 5, return_button.GetPosition()[1]))
+
         # Set size of frame
         frame.SetSize((-1, return_button.GetPosition()[1] + return_button.GetSize()[1] + 40))
         frame.ShowWindowModal()
@@ -72,6 +79,13 @@ class DownloadFrame(wx.Frame):
         self.download_obj.download()
         while self.download_obj.is_active():
 
+            if self.download_obj.status == network_handler.DownloadStatus.QUEUED or download_handler.MANAGER.is_paused():
+                label_amount.SetLabel("Download paused" if download_handler.MANAGER.is_paused() else "Waiting for other downloads to finish")
+                label_amount.Centre(wx.HORIZONTAL)
+                wx.Yield()
+                time.sleep(self.constants.thread_sleep_interval)
+                continue
+
             percentage: int = round(self.download_obj.get_percent())
             if percentage == 0:
                 percentage = 1
@@ -96,6 +110,18 @@ class DownloadFrame(wx.Frame):
         frame.Destroy()
 
 
+    def toggle_pause(self, pause_button: wx.Button) -> None:
+        """
+        Pause or resume all downloads
+        """
+        if download_handler.MANAGER.is_paused():
+            download_handler.MANAGER.resume()
+            pause_button.SetLabel("Pause")
+        else:
+            download_handler.MANAGER.pause()
+            pause_button.SetLabel("Resume")
+
+
     def terminate_download(self) -> None:
         """
         Terminate download
@@ -47,6 +47,7 @@ class macOSInstallerDownloadFrame(wx.Frame):
         self.parent: wx.Frame = parent
 
         self.catalog_products = None
+        self.installer_index = None
         self.available_installers = None
         self.available_installers_latest = None
 
@@ -139,12 +140,20 @@ class macOSInstallerDownloadFrame(wx.Frame):
             logging.info(f"Fetching AppleDB products")
 
             self.catalog_products = sucatalog.AppleDBProducts(self.constants)
-            if self.catalog_products.data is None:
+            if not self.catalog_products.data:
                 logging.error("Failed to fetch installers from AppleDB")
                 return
 
-            self.available_installers        = self.catalog_products.products
-            self.available_installers_latest = self.catalog_products.latest_products
+            self.installer_index = sucatalog.InstallerIndex()
+            self.installer_index.add_appledb_products(self.catalog_products.products)
+
+            # Latest release per macOS version (n-3 through n), falling back to the latest beta if none is released yet
+            latest = []
+            for xnu_major in range(self.catalog_products.max_ia - 3, self.catalog_products.max_ia + 1):
+                latest += self.installer_index.query(xnu_major=xnu_major, beta=False, latest=True) or self.installer_index.query(xnu_major=xnu_major, latest=True)
+
+            self.available_installers        = self.installer_index.query()
+            self.available_installers_latest = latest
 
 
         thread = threading.Thread(target=_fetch_installers)
@@ -323,7 +332,9 @@ class macOSInstallerDownloadFrame(wx.Frame):
             expected_checksum, checksum_algo = self.catalog_products.checksum_for_product(selected_installer)
 
             download_obj = network_handler.DownloadObject(
-                selected_installer["InstallAssistant"]["URL"], self.constants.payload_path / "InstallAssistant.pkg", checksum_algo=checksum_algo
+                selected_installer["InstallAssistant"].get("Mirrors") or selected_installer["InstallAssistant"]["URL"], self.constants.payload_path / "InstallAssistant.pkg", checksum_algo=checksum_algo, connections=4,
+                expected_sha256=expected_checksum if checksum_algo is not None and checksum_algo.name == "sha256" else None,
+                chunklist=self._fetch_integrity_data(selected_installer)
             )
 
             gui_download.DownloadFrame(
@@ -342,6 +353,27 @@ class macOSInstallerDownloadFrame(wx.Frame):
             self._validate_installer(expected_checksum, download_obj.checksum)
 
 
+    def _fetch_integrity_data(self, installer: dict) -> bytes:
+        """
+        Fetch the installer's integrityDataV1 chunklist, allowing validation during download
+
+        Returns None if unavailable
+        """
+
+        url = installer["InstallAssistant"].get("IntegrityDataURL")
+        if url is None:
+            if not installer["InstallAssistant"]["URL"].endswith("InstallAssistant.pkg"):
+                return None
+            url = f"{installer['InstallAssistant']['URL']}.integrityDataV1"
+
+        result = network_handler.NetworkUtilities().get(url, timeout=10)
+        if result.status_code != 200:
+            logging.info(f"Integrity data unavailable ({url}), skipping chunklist validation")
+            return None
+
+        return result.content
+
+
     def _validate_installer(self, expected_checksum: str, calculated_checksum: str) -> None:
         """
         Validate macOS installer
@@ -25,6 +25,7 @@ from ..support import (
     macos_installer_handler,
     utilities,
     network_handler,
+    download_handler,
     kdk_handler,
     metallib_handler,
     subprocess_wrapper
@@ -427,7 +428,7 @@ class macOSInstallerFlashFrame(wx.Frame):
         else:
             path = self.constants.installer_pkg_path
 
-        autopkg_download = network_handler.DownloadObject(link, path)
+        autopkg_download = network_handler.DownloadObject(link, path, priority=download_handler.DownloadPriority.BACKGROUND)
         autopkg_download.download(spawn_thread=False)
 
         if autopkg_download.download_complete is False:
@@ -496,7 +497,7 @@ class macOSInstallerFlashFrame(wx.Frame):
             logging.info(kdk_obj.error_msg)
             return
 
-        kdk_download_obj = kdk_obj.retrieve_download(override_path=kdk_dmg_path)
+        kdk_download_obj = kdk_obj.retrieve_download(override_path=kdk_dmg_path, priority=download_handler.DownloadPriority.BACKGROUND)
         if kdk_download_obj is None:
             logging.info("Failed to retrieve KDK")
             logging.info(kdk_obj.error_msg)
@@ -567,7 +568,7 @@ class macOSInstallerFlashFrame(wx.Frame):
             logging.info(metallib_obj.error_msg)
             return
 
-        metallib_download_obj = metallib_obj.retrieve_download(override_path=metallib_pkg_path)
+        metallib_download_obj = metallib_obj.retrieve_download(override_path=metallib_pkg_path, priority=download_handler.DownloadPriority.BACKGROUND)
         if metallib_download_obj is None:
             logging.info("Failed to retrieve Metallib")
             logging.info(metallib_obj.error_msg)
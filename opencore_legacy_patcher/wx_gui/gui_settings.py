@@ -24,6 +24,7 @@ from ..support import (
     defaults,
     generate_smbios,
     network_handler,
+    download_handler,
     subprocess_wrapper
 )
 from ..datasets import (
@@ -843,6 +844,19 @@ class SettingsFrame(wx.Frame):
                     ],
                     "override_function": self._update_global_settings,
                 },
+                "Download Speed Limit": {
+                    "type": "spinctrl",
+                    "value": self.constants.download_bandwidth_limit,
+                    "variable": "download_bandwidth_limit",
+                    "description": [
+                        "Combined speed limit for all downloads",
+                        "in MB/s.",
+                        "Set to 0 for no limit.",
+                    ],
+
+                    "min": 0,
+                    "max": 100,
+                },
                 "Statistics": {
                     "type": "title",
                 },
@@ -1110,6 +1124,8 @@ Hardware Information:
         """
         value = event.GetEventObject().GetValue()
         self._update_setting(self.settings[self._find_parent_for_key(label)][label]["variable"], value)
+        if label == "Download Speed Limit":
+            download_handler.MANAGER.set_bandwidth_limit(value * 1024 * 1024)
 
 
     def _update_setting(self, variable, value):